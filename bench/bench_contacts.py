@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: the precompiled single-pass contact extractor
+(usdlf/sam_contacts.py) against the per-cell  re.findall  helpers it
+replaced, on synthetic 150-column extract rows.
+
+    python bench/bench_contacts.py --rows 200000
+
+Exits non-zero if the two ever disagree.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]  # …/usdlf
+sys.path.insert(0, str(ROOT_DIR))
+
+from usdlf.sam_contacts import EMAIL_COLUMNS, US_AREA_CODES, extract_contacts  # noqa: E402
+
+# ───────── Reference: the previous helpers, verbatim ─────────
+
+
+def is_valid_us_phone(phone_str: str, pattern: str) -> bool:
+    digits = re.sub(r"\D", "", phone_str)
+    if pattern in [
+        r"\b\d{3}-\d{3}-\d{4}\b",
+        r"\b\d{10}\b",
+        r"\b\d{3}\s+\d{3}\s+\d{4}\b",
+    ]:
+        if len(digits) != 10:
+            return False
+        return digits[:3] in US_AREA_CODES
+    return False
+
+
+def extract_phones_from_row(row):
+    patterns = [r"\b\d{3}-\d{3}-\d{4}\b", r"\b\d{10}\b", r"\b\d{3}\s+\d{3}\s+\d{4}\b"]
+    phones = []
+    for cell in row:
+        if cell and len(cell) >= 10:
+            for pat in patterns:
+                for ph in re.findall(pat, cell):
+                    if is_valid_us_phone(ph, pat):
+                        phones.append(ph)
+    return list(dict.fromkeys(phones))
+
+
+def extract_emails_from_row(row):
+    pat = r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b"
+    emails = []
+    for cell in row:
+        if cell and "@" in cell:
+            for em in re.findall(pat, cell, re.IGNORECASE):
+                el = em.lower()
+                if not any(inv in el for inv in ["@.", "..", "@-", "-@"]):
+                    emails.append(el)
+    return list(dict.fromkeys(emails))
+
+
+# ───────── Synthetic rows ─────────
+AREAS = sorted(US_AREA_CODES) + ["000", "123", "555", "999"]
+POC_COLUMNS = [c for c in EMAIL_COLUMNS if c != 26]
+
+
+def phone(rng: random.Random) -> str:
+    a, b, c = rng.choice(AREAS), rng.randint(200, 999), rng.randint(0, 9999)
+    return rng.choice(
+        [f"{a}-{b}-{c:04d}", f"{a}{b}{c:04d}", f"{a} {b} {c:04d}", f"({a}) {b}-{c:04d}"]
+    )
+
+
+def email(rng: random.Random, i: int) -> str:
+    user = rng.choice(["info", "Sales", "j.doe", "bids+gov", "a..b", "contracts"])
+    dom = rng.choice(["example.com", "Acme-Defense.US", "x.org", "-bad.com", "mail.co"])
+    return f"{user}{i % 97}@{dom}"
+
+
+def synthetic_row(rng: random.Random, i: int) -> list:
+    row = [""] * 150
+    row[0] = f"Q{i:011d}"
+    row[3] = f"{i % 99999:05d}"
+    row[5] = rng.choice("AE")
+    row[11] = f"Synthetic Vendor {i} LLC"
+    row[15] = f"{rng.randint(1, 99999)} Main St Suite {rng.randint(100, 999)}"
+    row[19] = f"{rng.randint(10000, 99999)}"
+    row[26] = rng.choice(["", "www.example.com", email(rng, i)])
+    for col in (7, 8, 9, 10):  # registration / expiration / update dates
+        row[col] = f"20{rng.randint(10, 25)}{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}"
+    row[31] = "2X~A8~27~MF"
+    row[32] = "541330"
+    row[33] = "0012"
+    row[34] = "~".join(f"{rng.randint(111111, 999999)}{rng.choice('YNE')}" for _ in range(12))
+    row[36] = "~".join(rng.choice(["R408", "J016", "AD25", "7030", "D302"]) for _ in range(8))
+    for block in range(46, 112, 11):
+        if rng.random() < 0.5:
+            row[block] = rng.choice(["Jane", "John", "Pat"])
+            row[block + 2] = rng.choice(["Smith", "Nguyen", "Garcia"])
+            row[block + 4] = f"{rng.randint(1, 9999)} Oak Ave"
+            row[block + 7] = f"{rng.randint(10000, 99999)}"
+            row[block + 8] = f"{rng.randint(0, 9999):04d}"
+    # contact details sprinkled through POC cells, several per row sometimes
+    for _ in range(rng.choice([0, 0, 1, 1, 2, 3])):
+        col = rng.choice(POC_COLUMNS)
+        row[col] = (row[col] + " " + rng.choice([phone(rng), email(rng, i)])).strip()
+    if rng.random() < 0.05:  # dashed + bare forms in one cell (order check)
+        row[60] = f"{phone(rng)} or {rng.choice(AREAS)}5550100"
+    row[149] = "!end"
+    return row
+
+
+# ───────── Main ─────────
+
+
+def timed(fn, rows):
+    t0 = time.perf_counter()
+    out = [fn(r) for r in rows]
+    return out, time.perf_counter() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark contact extraction.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    rows = [synthetic_row(rng, i) for i in range(args.rows)]
+    print(f"{len(rows):,} synthetic rows")
+
+    old, t_old = timed(
+        lambda r: (extract_emails_from_row(r), extract_phones_from_row(r)), rows
+    )
+    new, t_new = timed(extract_contacts, rows)
+
+    mismatches = sum(1 for a, b in zip(old, new) if a != b)
+    with_email = sum(1 for e, _ in new if e)
+    with_phone = sum(1 for _, p in new if p)
+    print(f"rows with e-mail / phone : {with_email:,} / {with_phone:,}")
+    print(f"per-cell helpers         : {t_old:7.2f} s  ({len(rows) / t_old:,.0f} rows/s)")
+    print(f"single-pass extractor    : {t_new:7.2f} s  ({len(rows) / t_new:,.0f} rows/s)")
+    print(f"speedup                  : {t_old / t_new:.1f}×")
+    print(f"mismatching rows         : {mismatches}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
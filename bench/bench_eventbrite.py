@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark step 5 end to end against bench/mock_eventbrite_api.py: a full
+attendee ingest, the entity match, then an incremental sync after a few
+attendees changed; exits non-zero if an all-free-mail attendee list does
+not come back unmatched.  The entity store should be a step 0 store
+formatted from bench/synth_extract.py with the same --entities rows, so the
+mock's companies exist in it:
+
+    python bench/synth_extract.py --rows 100k --out /tmp/synth
+    python -m usdlf format /tmp/synth/entity/YYYYMM/SAM_PUBLIC_…dat
+    python bench/bench_eventbrite.py --entities-store /tmp/synth/…/formatted_entities_….sqlite \\
+        --events 40 --attendees 1250 --entities 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from urllib.request import urlopen
+
+import pandas as pd
+
+ROOT_DIR = Path(__file__).resolve().parents[1]  # …/usdlf
+sys.path.insert(0, str(ROOT_DIR))
+
+from mock_eventbrite_api import add_config_args, config_from_args, start_server  # noqa: E402
+
+from usdlf.attendee_match import build_lookups, match, match_attendees  # noqa: E402
+from usdlf.eventbrite_ingest import ingest  # noqa: E402
+
+
+def free_mail_ok() -> bool:
+    """Attendees with only free-mail addresses and unknown companies: no
+    domain probe at all, so every row must simply stay unmatched."""
+    ent = pd.DataFrame(
+        {
+            "UEI": ["E00000000001"],
+            "CAGE": ["00001"],
+            "Business Name": ["Apex Defense 1 LLC"],
+            "Email Addresses": ["info@apex1.com"],
+            "Website or Email": ["www.apex1.com"],
+        }
+    )
+    att = pd.DataFrame(
+        {
+            "email": ["pat@gmail.com", "kim@yahoo.com", None],
+            "company": ["Unlisted Ventures 1", "", None],
+        }
+    )
+    return (match_attendees(att, build_lookups(ent))["Match Key"] == "").all()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark Eventbrite ingest + match.")
+    parser.add_argument("--entities-store", type=Path, required=True, help="Step 0 store")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=1000.0, help="Calls/s (mock: no cap)")
+    parser.add_argument("--touch", type=int, default=100, help="Attendees changed before re-sync")
+    add_config_args(parser)
+    args = parser.parse_args()
+    if not free_mail_ok():
+        print("all-free-mail attendees matched an entity")
+        sys.exit(1)
+
+    srv = start_server(config_from_args(args))
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Path(tmp) / "eventbrite.sqlite"
+        sync = dict(db=db, base_url=srv.base_url, workers=args.workers, rate=args.rate, token="x")
+
+        t0 = time.perf_counter()
+        first = ingest(**sync)
+        t_ingest = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        match(db=db, entities=args.entities_store, warehouse=None)
+        t_match = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        match(db=db, entities=args.entities_store, warehouse=None)  # lookup cached
+        t_rematch = time.perf_counter() - t0
+
+        urlopen(f"http://{srv.server_address[0]}:{srv.server_address[1]}/touch?count={args.touch}")
+        t0 = time.perf_counter()
+        again = ingest(**sync)
+        t_again = time.perf_counter() - t0
+    srv.shutdown()
+
+    n = first["attendees_fetched"]
+    print()
+    print(f"full ingest        : {t_ingest:7.2f} s  {n:,} attendees, {first['pages']:,} pages")
+    print(f"match (new lookup) : {t_match:7.2f} s  ({n / t_match:,.0f} attendees/s)")
+    print(f"match (cached)     : {t_rematch:7.2f} s  ({n / t_rematch:,.0f} attendees/s)")
+    print(
+        f"incremental ingest : {t_again:7.2f} s  {again['attendees_fetched']:,} attendees, "
+        f"{again['pages']:,} pages after {args.touch} changed"
+    )
+
+
+if __name__ == "__main__":
+    main()
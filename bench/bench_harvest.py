@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+End-to-end harvester benchmark against the offline SAM mock
+(bench/mock_sam_api.py) — no network, no quota.
+
+Each configuration gets a fresh mock server and a throw-away output root;
+the harvester runs unchanged as a subprocess ( python -m usdlf harvest )
+pointed at it with --base-url.  Reports notices/s, calls/s and, when the mock is told to
+start answering 429 (--quota-after), the time until the quota was hit.
+
+    python bench/bench_harvest.py --workers 1,4,8 --latency-ms 50
+    python bench/bench_harvest.py --workers 8 --rate 20 --quota-after 500
+
+Exits non-zero if a harvester run fails.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]  # …/usdlf
+
+from mock_sam_api import add_config_args, config_from_args, start_server  # noqa: E402
+
+
+def run_once(args: argparse.Namespace, workers: int) -> dict:
+    srv = start_server(config_from_args(args))
+    with tempfile.TemporaryDirectory(prefix="bench_harvest_") as out:
+        cmd = [
+            sys.executable,
+            "-m",
+            "usdlf",
+            "harvest",
+            "--base-url", srv.base_url,
+            "--output-root", out,
+            "--no-cache",
+            "--no-plan",
+            "--workers", str(workers),
+            "--rate", str(args.rate),
+            "--max-calls", str(args.max_calls),
+        ]
+        for target in args.target:
+            cmd += ["--target", target]
+        env = dict(os.environ, SAM_API_KEY=os.environ.get("SAM_API_KEY") or "mock")
+        start = time.perf_counter()
+        proc = subprocess.run(cmd, cwd=ROOT_DIR, env=env, capture_output=True, text=True)
+        wall = time.perf_counter() - start
+        srv.shutdown()
+        if proc.returncode != 0:
+            sys.stderr.write(proc.stdout + proc.stderr)
+            sys.exit(f"harvester failed with workers={workers}")
+        summary_path = next(Path(out).glob("*/*_harvest/harvest_summary.json"))
+        summary = json.loads(summary_path.read_text())
+    stats = srv.stats()
+    return {
+        "workers": workers,
+        "wall_s": wall,
+        "calls": stats["calls"],
+        "notices": summary["notices_completed"],
+        "ivl_rows": summary["ivl_rows"],
+        "time_to_quota_s": stats["time_to_quota_s"],
+        "quota_hit": summary["quota_hit"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the IVL harvester offline.")
+    parser.add_argument(
+        "--workers", default="1,4,8", help="Comma-separated --workers values to compare"
+    )
+    parser.add_argument(
+        "--rate", type=float, default=1_000.0, help="Harvester --rate (calls/s)"
+    )
+    parser.add_argument(
+        "--max-calls", type=int, default=2_000, help="Harvester --max-calls"
+    )
+    parser.add_argument(
+        "--target", action="append", default=[], help="Harvester --target, repeatable"
+    )
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    add_config_args(parser)
+    parser.set_defaults(latency_ms=40.0, notices=3_000)
+    args = parser.parse_args()
+
+    results = [run_once(args, int(w)) for w in args.workers.split(",")]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(
+        f"mock: {args.notices:,} notices/ptype, {args.latency_ms:g} ms latency, "
+        f"429 after {args.quota_after or 'never'}; harvester --rate {args.rate:g} "
+        f"--max-calls {args.max_calls}"
+    )
+    print(f"{'workers':>7} {'wall s':>8} {'calls':>6} {'notices':>7} {'notices/s':>9} "
+          f"{'calls/s':>8} {'IVL rows':>8} {'to quota s':>10}")
+    for r in results:
+        ttq = f"{r['time_to_quota_s']:.2f}" if r["time_to_quota_s"] is not None else "–"
+        print(
+            f"{r['workers']:>7} {r['wall_s']:>8.2f} {r['calls']:>6} {r['notices']:>7} "
+            f"{r['notices'] / r['wall_s']:>9.1f} {r['calls'] / r['wall_s']:>8.1f} "
+            f"{r['ivl_rows']:>8} {ttq:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark step 4 against bench/mock_icontact_api.py: a first sync of a
+curated workbook (a real step 2 output), then a re-sync that should send
+nothing.
+
+    python bench/bench_icontact.py data/harvests/YYYYMM/<run>_harvest/<tag>_curated_ivl_contacts.xlsx \\
+        --latency-ms 20 --fail-rate 0.1
+
+Exits non-zero unless every contact the mock received carries the street,
+city, state and ZIP of its workbook row, and the re-sync sends no contact.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from urllib.request import urlopen
+
+ROOT_DIR = Path(__file__).resolve().parents[1]  # …/usdlf
+sys.path.insert(0, str(ROOT_DIR))
+
+from mock_icontact_api import MockConfig, start_server  # noqa: E402
+
+from usdlf.icontact_sync import FIELDS, load_contacts, sync  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the iContact sync.")
+    parser.add_argument("workbook", type=Path, help="A *_curated_ivl_contacts.xlsx")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--rate", type=float, default=1000.0, help="Calls/s (mock: no cap)")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    srv = start_server(MockConfig(latency_ms=args.latency_ms, fail_rate=args.fail_rate))
+    for var in ("API_APP_ID", "API_USERNAME", "API_PASSWORD", "ACCOUNT_ID", "CLIENT_FOLDER_ID"):
+        os.environ.setdefault(var, "1")
+    with tempfile.TemporaryDirectory() as tmp:
+        run = dict(
+            workbooks=[args.workbook],
+            list_id="7",
+            state_path=Path(tmp) / "icontact_state.json",
+            base_url=srv.base_url,
+            batch_size=args.batch_size,
+            workers=args.workers,
+            rate=args.rate,
+        )
+        t0 = time.perf_counter()
+        sync(**run)
+        t_first = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        again = sync(**run)
+        t_again = time.perf_counter() - t0
+    host, port = srv.server_address[:2]
+    stats = json.loads(urlopen(f"http://{host}:{port}/stats").read())
+    received = {c["email"]: c for c in srv.contacts.values()}
+    srv.shutdown()
+
+    expected = load_contacts([args.workbook])
+    fields = list(FIELDS.values())
+    with_address = sum(1 for c in expected.values() if all(c.get(f) for f in fields))
+    wrong = sum(
+        1
+        for email, c in expected.items()
+        if any(received.get(email, {}).get(f) != c.get(f) for f in fields)
+    )
+    resent = again["new"] + again["changed"]
+    print()
+    print(f"first sync   : {t_first:7.2f} s  {len(received):,} contacts, calls {stats['calls']}")
+    print(f"re-sync      : {t_again:7.2f} s  {resent:,} contacts sent")
+    print(f"with address : {with_address:,} / {len(expected):,} workbook contacts")
+    print(f"wrong address: {wrong:,}")
+    if wrong or resent or not with_address:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
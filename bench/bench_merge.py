@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Benchmark: step 2's UEI→CAGE entity resolution (usdlf/entity_match.py)
+against the two-merge fallback it replaced, on synthetic data.
+
+    python bench/bench_merge.py --ivl 100000 --entities 1000000
+
+The IVL mixes rows that match by UEI, rows whose UEI is blank or unknown but
+whose CAGE matches, and rows that match nothing.  Every resolved row is
+checked against the key that should have matched; exits non-zero on any
+wrong row, or if an IVL whose keys are all blank or unknown does not come
+back unmatched, or if the warehouse NAICS rollup counts an IVL row under
+another entity row than step 2 matched (UEIs repeated in the extract).  The old code is timed too and its misaligned rows are counted.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = Path(__file__).resolve().parents[1]  # …/usdlf
+sys.path.insert(0, str(ROOT_DIR))
+
+from usdlf.entity_match import match_entities  # noqa: E402
+from usdlf.ivl_warehouse import connect, naics_rollup  # noqa: E402
+
+# ───────── Reference: the previous merge, verbatim ─────────
+
+
+def legacy_merge(ivl: pd.DataFrame, ent: pd.DataFrame) -> pd.DataFrame:
+    merged = ivl.merge(ent, left_on="ueiSAM", right_on="UEI", how="left", indicator=True)
+    needs_cage = merged["_merge"] == "left_only"
+    if needs_cage.any():
+        merged.loc[needs_cage, :] = ivl[needs_cage].merge(
+            ent, left_on="cage", right_on="CAGE", how="left"
+        )
+    merged.drop(columns="_merge", inplace=True)
+    return merged
+
+
+# ───────── Synthetic data ─────────
+
+
+def synthetic(n_ent: int, n_ivl: int, seed: int):
+    rng = np.random.default_rng(seed)
+    ids = np.arange(n_ent)
+    ent = pd.DataFrame(
+        {
+            "UEI": pd.Series(ids).map("E{:011d}".format),
+            "CAGE": pd.Series(ids).map("{:05X}".format),
+            "Business Name": pd.Series(ids).map("Synthetic Vendor {} LLC".format),
+            "Has Email": rng.choice(["Yes", "No"], n_ent),
+            "State": rng.choice(["VA", "MD", "TX", "CA"], n_ent),
+        }
+    )
+    pick = rng.integers(0, n_ent, n_ivl)
+    kind = rng.choice(["uei", "cage", "none"], n_ivl, p=[0.7, 0.2, 0.1])
+    uei = ent["UEI"].to_numpy()[pick].astype(object)
+    cage = ent["CAGE"].to_numpy()[pick].astype(object)
+    uei[kind == "cage"] = np.where(rng.random((kind == "cage").sum()) < 0.5, "", "UNKNOWN00000")
+    uei[kind == "none"] = "UNKNOWN00000"
+    cage[kind == "none"] = "ZZZZZZ"
+    ivl = pd.DataFrame(
+        {
+            "noticeId": pd.Series(rng.integers(0, 5_000, n_ivl)).map("n{:05d}".format),
+            "ueiSAM": uei,
+            "cage": cage,
+            "vendorName": "vendor",
+        }
+    )
+    expected = np.where(kind == "none", "", np.where(kind == "uei", "UEI", "CAGE"))
+    return ent, ivl, pick, expected
+
+
+def blank_keys_ok(ent: pd.DataFrame) -> bool:
+    """Rows with only blank / unknown keys (nothing to hash) stay unmatched."""
+    for uei, cage in (([""], [""]), (["UNKNOWN00000"], [""]), ([None, ""], ["", None])):
+        ivl = pd.DataFrame({"ueiSAM": uei, "cage": cage})
+        if (match_entities(ivl, ent.head(100))["Match Key"] != "").any():
+            return False
+    return True
+
+
+def rollup_agrees() -> bool:
+    """naics_rollup over an extract that repeats a UEI with different NAICS
+    counts each IVL row once, under the entity row match_entities picks."""
+    ent = pd.DataFrame(
+        {
+            "UEI": ["U1", "U1", "U1", "U2"],
+            "CAGE": ["C1", "C1", "C1", "C2"],
+            "PRIMARY_NAICS": ["541330", "336413", "336413", "541512"],
+        }
+    )
+    ivl = pd.DataFrame({"noticeId": ["n1", "n2", "n1"], "ueiSAM": ["U1", "U1", "U2"], "cage": ""})
+    expected = match_entities(ivl, ent)["PRIMARY_NAICS"].value_counts().to_dict()
+    with tempfile.TemporaryDirectory() as tmp:
+        index = Path(tmp) / "entities.sqlite"
+        with sqlite3.connect(index) as e:
+            ent.to_sql("entities", e, index=False)
+        con = connect(Path(tmp) / "warehouse.sqlite")
+        con.executemany(
+            "INSERT INTO ivl (noticeId, vendor_key, uei, first_run, last_run) "
+            "VALUES (?, ?, ?, 'r', 'r')",
+            [(n, u, u) for n, u in zip(ivl["noticeId"], ivl["ueiSAM"])],
+        )
+        con.commit()
+        got = naics_rollup(con, index).set_index("naics")["ivl_rows"].to_dict()
+        con.close()
+    return got == expected
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - start
+
+
+# ───────── Main ─────────
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark IVL → entity resolution.")
+    parser.add_argument("--ivl", type=int, default=100_000)
+    parser.add_argument("--entities", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    ent, ivl, pick, expected = synthetic(args.entities, args.ivl, args.seed)
+    print(f"{len(ivl):,} IVL rows against {len(ent):,} entities")
+
+    merged, t_new = timed(match_entities, ivl, ent)
+    matched = merged["Match Key"].to_numpy() != ""
+    wrong = (merged["Match Key"].to_numpy() != expected).sum()
+    wrong += (merged.loc[matched, "UEI"].to_numpy() != ent["UEI"].to_numpy()[pick[matched]]).sum()
+    print(f"vectorized UEI→CAGE      : {t_new:7.2f} s  ({len(ivl) / t_new:,.0f} rows/s)")
+    print(f"matched by UEI / CAGE    : {(expected == 'UEI').sum():,} / {(expected == 'CAGE').sum():,}")
+    print(f"wrong rows               : {wrong}")
+    if not blank_keys_ok(ent):
+        print("blank / unknown-key IVL  : matched something")
+        wrong += 1
+    if not rollup_agrees():
+        print("NAICS rollup             : disagrees with the UEI match on repeated UEIs")
+        wrong += 1
+
+    if not args.skip_legacy:
+        try:
+            old, t_old = timed(legacy_merge, ivl, ent)
+            ok = old["UEI"].notna() & (old.index < len(ivl))
+            misaligned = (
+                old.loc[ok, "UEI"].to_numpy() != ent["UEI"].to_numpy()[pick[old.index[ok]]]
+            ).sum() + (old["UEI"].isna().sum() - (expected == "").sum())
+            print(f"two-merge fallback (old) : {t_old:7.2f} s  ({len(ivl) / t_old:,.0f} rows/s)")
+            print(f"speedup                  : {t_old / t_new:.1f}×")
+            print(f"old rows misaligned/lost : {misaligned:,}")
+        except Exception as exc:  # the old assignment can fail outright on newer pandas
+            print(f"two-merge fallback (old) : failed — {type(exc).__name__}: {exc}")
+
+    if wrong:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Scale benchmark for steps 0 and 2 on synthetic extracts
+(bench/synth_extract.py), tracked across commits.
+
+    python bench/bench_pipeline.py --scales 10k,100k,1m
+    python bench/bench_pipeline.py --scales 2m --workers 0 --batch-size 100000
+    python bench/bench_pipeline.py --history            # trend per commit
+
+For each scale the extract and IVL are generated once under --data (and
+reused on later runs), then  python -m usdlf format  and  python -m usdlf
+merge  run unchanged as subprocesses, so every scale starts from a fresh
+interpreter and its peak RSS is its own.  The stage timings come from the
+run reports the steps already write (format_report_*.json,
+*_merge_report.json): parse, contact extraction, DataFrame / sort, index
+build, Parquet and Excel export, and the merge's entity load and match.
+Contact extraction is summed over the parser processes, so with --workers
+it can exceed the parse wall time.
+
+Every run is appended to --results (JSON lines) with the git commit, the
+options and the host, and compared with the last result of another commit
+at the same scale and options.  Exits non-zero if a step fails.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROOT_DIR = Path(__file__).resolve().parents[1]  # …/usdlf
+
+from synth_extract import add_generator_args, generate, parse_count  # noqa: E402
+
+RESULTS = ROOT_DIR / "bench" / "results" / "pipeline_history.jsonl"
+# (report, stage) pairs shown in the table, in pipeline order
+SHOWN = [
+    ("format", "parse"),
+    ("format", "contacts"),
+    ("format", "dataframe"),
+    ("format", "sort"),
+    ("format", "store"),
+    ("format", "index"),
+    ("format", "parquet"),
+    ("format", "excel"),
+    ("merge", "notices"),
+    ("merge", "load_entities"),
+    ("merge", "match"),
+    ("merge", "excel"),
+]
+
+
+# ───────── Git / host ─────────
+
+
+def git(*args: str) -> str:
+    proc = subprocess.run(["git", *args], cwd=ROOT_DIR, capture_output=True, text=True)
+    return proc.stdout.strip() if proc.returncode == 0 else ""
+
+
+def revision() -> Dict[str, object]:
+    return {
+        "commit": git("rev-parse", "--short=12", "HEAD") or "unknown",
+        "subject": git("log", "-1", "--format=%s"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no", "--", "usdlf")),
+    }
+
+
+def host() -> Dict[str, object]:
+    import pandas as pd
+    import pyarrow as pa
+
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "pyarrow": pa.__version__,
+        "cpus": os.cpu_count(),
+        "machine": platform.machine(),
+        "node": platform.node(),
+    }
+
+
+# ───────── Runs ─────────
+
+
+def run_step(cmd: List[str], verbose: bool) -> float:
+    full = [sys.executable, "-u", "-m", "usdlf", *cmd]
+    start = time.perf_counter()
+    proc = subprocess.run(full, cwd=ROOT_DIR, capture_output=not verbose, text=True)
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        if not verbose:
+            sys.stderr.write(proc.stdout + proc.stderr)
+        sys.exit(f"python -m usdlf {cmd[0]} failed (exit {proc.returncode})")
+    return wall
+
+
+def stages(report: Dict[str, object]) -> Dict[str, Dict[str, object]]:
+    """Report stages, with step 0's contact extraction split out of parse."""
+    out = dict(report["stages"])
+    parse = out.get("parse")
+    if parse and parse.get("contact_extraction_s") is not None:
+        secs = parse["contact_extraction_s"]
+        out["contacts"] = {
+            "wall_s": secs,
+            "rows": parse["rows"],
+            "rows_per_s": round(parse["rows"] / secs, 1) if secs else None,
+            "peak_rss_mb": None,
+        }
+    return out
+
+
+def bench_scale(args: argparse.Namespace, rows: int) -> Dict[str, object]:
+    out = args.data / f"rows_{rows}_seed_{args.seed}"
+    gen = generate(
+        out,
+        rows,
+        seed=args.seed,
+        email_rate=args.email_rate,
+        phone_rate=args.phone_rate,
+        date_tag=args.date,
+    )
+    dat, run_dir = gen["extract"], gen["harvest"]
+    folder = dat.parent
+
+    fmt_cmd = ["format", str(dat), "--workers", str(args.workers)]
+    if args.batch_size:
+        fmt_cmd += ["--batch-size", str(args.batch_size)]
+    if not args.no_excel:
+        fmt_cmd.append("--excel")
+    print(f"[{rows:,}] format …", flush=True)
+    fmt_wall = run_step(fmt_cmd, args.verbose)
+    fmt_report = json.loads((folder / f"format_report_{args.date}.json").read_text())
+
+    store = folder / f"formatted_entities_{args.date}.{args.store}"
+    print(f"[{rows:,}] merge …", flush=True)
+    merge_wall = run_step(
+        ["merge", "--harvest", str(run_dir), "--entities", str(store)], args.verbose
+    )
+    tag = run_dir.name.replace("_harvest", "")
+    merge_report = json.loads((run_dir / f"{tag}_merge_report.json").read_text())
+
+    return {
+        "rows": rows,
+        "ivl_rows": gen["ivl_rows"],
+        "extract_mb": round(dat.stat().st_size / 1024**2, 1),
+        "format": {
+            "wall_s": round(fmt_wall, 3),
+            "peak_rss_mb": fmt_report["peak_rss_mb"],
+            "children_peak_rss_mb": fmt_report["children_peak_rss_mb"],
+            "stages": stages(fmt_report),
+        },
+        "merge": {
+            "wall_s": round(merge_wall, 3),
+            "peak_rss_mb": merge_report["peak_rss_mb"],
+            "matched": merge_report.get("matched"),
+            "stages": stages(merge_report),
+        },
+    }
+
+
+# ───────── History ─────────
+
+
+def load_history(path: Path) -> List[Dict[str, object]]:
+    if not path.exists():
+        return []
+    lines = path.read_text(encoding="utf-8").splitlines()
+    return [json.loads(line) for line in lines if line.strip()]
+
+
+def baseline(
+    history: List[Dict[str, object]], entry: Dict[str, object]
+) -> Optional[Dict[str, object]]:
+    """Latest earlier result at the same scale and options from another commit."""
+    for old in reversed(history):
+        if (
+            old["rows"] == entry["rows"]
+            and old["options"] == entry["options"]
+            and old["host"].get("node") == entry["host"].get("node")
+            and (old["commit"], old["dirty"]) != (entry["commit"], entry["dirty"])
+        ):
+            return old
+    return None
+
+
+def delta(new: Optional[float], old: Optional[float]) -> str:
+    if not new or not old:
+        return ""
+    return f"{(new - old) / old:+.0%}"
+
+
+def print_result(entry: Dict[str, object], base: Optional[Dict[str, object]]) -> None:
+    vs = f"  vs {base['commit']}" if base else ""
+    print(
+        f"\n{entry['rows']:,} rows ({entry['extract_mb']:,} MB), {entry['ivl_rows']:,} IVL "
+        f"rows — {entry['commit']}{' (dirty)' if entry['dirty'] else ''}{vs}"
+    )
+    print(f"{'stage':<22}{'wall s':>9}{'rows/s':>12}{'RSS MB':>9}{'Δ wall':>9}")
+    for step, name in SHOWN:
+        s = entry[step]["stages"].get(name)
+        if s is None:
+            continue
+        old = base[step]["stages"].get(name) if base else None
+        rate = f"{s['rows_per_s']:,.0f}" if s.get("rows_per_s") else "–"
+        rss = f"{s['peak_rss_mb']:,.0f}" if s.get("peak_rss_mb") else "–"
+        print(
+            f"{step + ' ' + name:<22}{s['wall_s']:>9.2f}{rate:>12}{rss:>9}"
+            f"{delta(s['wall_s'], old and old['wall_s']):>9}"
+        )
+    for step in ("format", "merge"):
+        s = entry[step]
+        old = base[step]["wall_s"] if base else None
+        print(
+            f"{step + ' total':<22}{s['wall_s']:>9.2f}{'':>12}"
+            f"{s['peak_rss_mb']:>9,.0f}{delta(s['wall_s'], old):>9}"
+        )
+
+
+def short_options(o: Dict[str, object]) -> str:
+    text = f"w{o['workers']} {o['store']}"
+    if o["batch_size"]:
+        text += f" b{o['batch_size']}"
+    return text + (" xlsx" if o["excel"] else "")
+
+
+def print_history(history: List[Dict[str, object]]) -> None:
+    if not history:
+        print("(no results yet)")
+        return
+    print(
+        f"{'when':<17}{'commit':<14}{'rows':>11}  {'options':<22}"
+        f"{'parse s':>9}{'format s':>10}{'merge s':>9}{'RSS MB':>8}"
+    )
+    for e in history:
+        parse = e["format"]["stages"].get("parse", {}).get("wall_s")
+        print(
+            f"{e['when'][:16]:<17}{e['commit'] + ('*' if e['dirty'] else ''):<14}"
+            f"{e['rows']:>11,}  {short_options(e['options']):<22}{parse or 0:>9.2f}"
+            f"{e['format']['wall_s']:>10.2f}{e['merge']['wall_s']:>9.2f}"
+            f"{e['format']['peak_rss_mb']:>8,.0f}"
+        )
+
+
+# ───────── Main ─────────
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark steps 0 and 2 at several scales.")
+    parser.add_argument(
+        "--scales", default="10k,100k", help="Comma-separated extract sizes (10k … 2m)"
+    )
+    parser.add_argument("--workers", type=int, default=1, help="format --workers")
+    parser.add_argument("--batch-size", type=int, default=0, help="format --batch-size")
+    parser.add_argument("--no-excel", action="store_true", help="Skip the .xlsx export")
+    parser.add_argument(
+        "--store",
+        choices=["sqlite", "parquet"],
+        default="sqlite",
+        help="Entity store step 2 reads (default sqlite)",
+    )
+    parser.add_argument(
+        "--data",
+        type=Path,
+        default=Path(os.environ.get("TMPDIR", "/tmp")) / "usdlf_bench",
+        help="Where generated extracts are kept between runs",
+    )
+    parser.add_argument("--results", type=Path, default=RESULTS, help="JSON-lines history")
+    parser.add_argument("--no-record", action="store_true", help="Do not append to --results")
+    parser.add_argument(
+        "--history", action="store_true", help="Print the recorded results and exit"
+    )
+    parser.add_argument("--verbose", action="store_true", help="Show the steps' own output")
+    add_generator_args(parser)
+    args = parser.parse_args()
+
+    history = load_history(args.results)
+    if args.history:
+        print_history(history)
+        return
+
+    rev, machine = revision(), host()
+    options = {
+        "workers": args.workers,
+        "batch_size": args.batch_size,
+        "excel": not args.no_excel,
+        "store": args.store,
+        "email_rate": args.email_rate,
+        "phone_rate": args.phone_rate,
+        "seed": args.seed,
+    }
+    for rows in (parse_count(s) for s in args.scales.split(",")):
+        entry = {
+            "when": dt.datetime.now().isoformat(timespec="seconds"),
+            **rev,
+            "options": options,
+            "host": machine,
+            **bench_scale(args, rows),
+        }
+        print_result(entry, baseline(history, entry))
+        history.append(entry)
+        if not args.no_record:
+            args.results.parent.mkdir(parents=True, exist_ok=True)
+            with args.results.open("a", encoding="utf-8") as fh:
+                fh.write(json.dumps(entry) + "\n")
+    if not args.no_record:
+        print("\nResults appended →", args.results)
+
+
+if __name__ == "__main__":
+    main()
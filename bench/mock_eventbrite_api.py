@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Offline stand-in for the Eventbrite v3 endpoints  python -m usdlf eventbrite
+uses, so attendee ingestion and matching can be run and timed without a
+token:
+
+    GET /v3/users/me/                                  (as in eventbrite/test.py)
+    GET /v3/users/me/organizations/
+    GET /v3/organizations/<org>/events/                (continuation pages)
+    GET /v3/events/<id>/attendees/?changed_since=…     (continuation pages)
+
+Events are spread a week apart around today; attendees are synthetic but
+deterministic for a given --seed.  Their companies come from the entities
+bench/synth_extract.py generates (same --entities count), so a synthetic
+extract formatted by step 0 gives real matches: about half use a work
+address at the entity's domain, a fifth a free-mail address with the
+company name spelled differently, the rest are unknown companies.
+
+    python bench/mock_eventbrite_api.py --port 8790 --events 40 --attendees 1250
+    EVENTBRITE_TOKEN=x python -m usdlf eventbrite \\
+        --base-url http://127.0.0.1:8790/v3 --rate 1000 --workers 8
+
+GET /touch?count=N  marks N random attendees of the events of the last four
+weeks changed now (for incremental syncs); GET /stats returns call counters.
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import datetime as dt
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from synth_extract import FIRST, LAST, NAME_C, domain, entity_name
+
+EVENTS_RE = re.compile(r"^/v3/organizations/([^/]+)/events/?$")
+ATTENDEES_RE = re.compile(r"^/v3/events/([^/]+)/attendees/?$")
+ORG_ID = "100200300"
+FREE = ["gmail.com", "yahoo.com", "outlook.com", "icloud.com"]
+# how a free-mail attendee writes the entity's legal form
+SPELLING = {"LLC": ", L.L.C.", "Inc": ", Inc.", "Corp": " Corporation", "Group": " Group", "Co": ""}
+TITLES = ["BD Manager", "Capture Lead", "CEO", "Contracts Manager", "Engineer", "Program Manager"]
+PAGE_SIZE = 50
+
+
+def rng_for(seed: int, key: str) -> random.Random:
+    return random.Random(zlib.crc32(key.encode()) ^ seed)
+
+
+def stamp(t: dt.datetime) -> str:
+    return t.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def utc_now() -> dt.datetime:
+    return dt.datetime.now(dt.timezone.utc).replace(tzinfo=None)
+
+
+def token(offset: int) -> str:
+    return base64.urlsafe_b64encode(f"offset:{offset}".encode()).decode()
+
+
+def offset_of(continuation: Optional[str]) -> int:
+    if not continuation:
+        return 0
+    return int(base64.urlsafe_b64decode(continuation.encode()).decode().split(":")[1])
+
+
+class MockConfig:
+    def __init__(
+        self,
+        events: int = 40,
+        attendees: int = 1_250,
+        entities: int = 100_000,
+        latency_ms: float = 0.0,
+        fail_rate: float = 0.0,
+        seed: int = 7,
+    ):
+        self.events = events
+        self.attendees = attendees
+        self.entities = entities
+        self.latency_ms = latency_ms
+        self.fail_rate = fail_rate
+        self.seed = seed
+
+
+def event(cfg: MockConfig, e: int, now: dt.datetime) -> Dict:
+    start = (now - dt.timedelta(weeks=cfg.events // 2 - e)).replace(
+        hour=13, minute=0, second=0, microsecond=0
+    )
+    return {
+        "id": str(90_000_000 + e),
+        "name": {"text": f"Industry Day {e + 1}"},
+        "start": {"utc": stamp(start)},
+        "end": {"utc": stamp(start + dt.timedelta(hours=6))},
+        "status": "completed" if start < now else "live",
+        "changed": stamp(start - dt.timedelta(days=30)),
+        "url": f"https://www.eventbrite.com/e/{90_000_000 + e}",
+    }
+
+
+def attendee(cfg: MockConfig, ev: Dict, j: int) -> Dict:
+    rng = rng_for(cfg.seed, f"{ev['id']}-{j}")
+    first, last = rng.choice(FIRST), rng.choice(LAST)
+    k = rng.randrange(cfg.entities)
+    draw = rng.random()
+    if draw < 0.45:
+        company, email = entity_name(k), f"{first[0]}.{last}@{domain(k)}".lower()
+    elif draw < 0.65:
+        name, form = entity_name(k).rsplit(" ", 1)
+        company = name.upper() if rng.random() < 0.5 else name
+        company += SPELLING[form] if form in NAME_C else ""
+        email = f"{first}.{last}{rng.randrange(100)}@{rng.choice(FREE)}".lower()
+    else:
+        company = f"Unlisted Ventures {rng.randrange(10**6)}"
+        email = f"{first}@unlisted{rng.randrange(10**6)}.com".lower()
+    start = dt.datetime.strptime(ev["start"]["utc"], "%Y-%m-%dT%H:%M:%SZ")
+    before = dt.timedelta(minutes=rng.randrange(1, 60 * 24 * 28))
+    created = min(start, utc_now()) - before  # upcoming events: registered so far
+    return {
+        "id": f"{ev['id']}{j:06d}",
+        "event_id": ev["id"],
+        "order_id": f"{ev['id']}{j // 2:06d}",
+        "created": stamp(created),
+        "changed": stamp(created),
+        "status": "Attending",
+        "cancelled": rng.random() < 0.03,
+        "refunded": False,
+        "checked_in": rng.random() < 0.6,
+        "ticket_class_name": "General Admission",
+        "profile": {
+            "first_name": first,
+            "last_name": last,
+            "email": email,
+            "company": company,
+            "job_title": rng.choice(TITLES),
+            "work_phone": f"703555{rng.randrange(10**4):04d}",
+        },
+    }
+
+
+class MockEventbriteServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config: MockConfig):
+        super().__init__(address, MockHandler)
+        self.config = config
+        self.lock = threading.Lock()
+        self.rng = random.Random(config.seed)
+        now = utc_now()
+        self.events = [event(config, e, now) for e in range(config.events)]
+        self.attendees: Dict[str, List[Dict]] = {}
+        self.calls: Dict[str, int] = {}
+        self.failed = 0
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v3"
+
+    def roster(self, event_id: str) -> List[Dict]:
+        with self.lock:
+            if event_id not in self.attendees:
+                ev = next((e for e in self.events if e["id"] == event_id), None)
+                self.attendees[event_id] = (
+                    [attendee(self.config, ev, j) for j in range(self.config.attendees)]
+                    if ev
+                    else []
+                )
+            return self.attendees[event_id]
+
+    def touch(self, count: int) -> List[str]:
+        now = utc_now()
+        recent = stamp(now - dt.timedelta(days=28))
+        events = [e for e in self.events if e["end"]["utc"] >= recent] or self.events
+        touched = []
+        for _ in range(count):
+            ev = self.rng.choice(events)
+            a = self.rng.choice(self.roster(ev["id"]))
+            with self.lock:
+                a["changed"] = stamp(now)
+                a["checked_in"] = True
+            touched.append(a["id"])
+        return touched
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {"calls": dict(self.calls), "failed": self.failed}
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    server: MockEventbriteServer
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        srv, cfg = self.server, self.server.config
+        url = urlparse(self.path)
+        q = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if url.path == "/stats":
+            return self.reply(200, srv.stats())
+        if url.path == "/touch":
+            return self.reply(200, {"touched": srv.touch(int(q.get("count", "1")))})
+
+        if not self.headers.get("Authorization", "").startswith("Bearer "):
+            return self.reply(401, {"error": "NO_AUTH", "status_code": 401})
+        if cfg.latency_ms:
+            time.sleep(cfg.latency_ms / 1000)
+        with srv.lock:
+            fail = srv.rng.random() < cfg.fail_rate
+            if fail:
+                srv.failed += 1
+
+        if url.path.rstrip("/") == "/v3/users/me":
+            self.count("me")
+            return self.reply(200, {"id": "1", "name": "Mock User"})
+        if url.path.rstrip("/") == "/v3/users/me/organizations":
+            self.count("organizations")
+            orgs = [{"id": ORG_ID, "name": "Mock Industry Days"}]
+            return self.reply(200, {"organizations": orgs, "pagination": {"has_more_items": False}})
+        m = EVENTS_RE.match(url.path)
+        if m:
+            self.count("events")
+            if fail:
+                return self.reply(503, {"error": "SERVICE_UNAVAILABLE"})
+            items = srv.events if m.group(1) == ORG_ID else []
+            return self.page("events", items, q)
+        m = ATTENDEES_RE.match(url.path)
+        if m:
+            self.count("attendees")
+            if fail:
+                return self.reply(503, {"error": "SERVICE_UNAVAILABLE"})
+            items = srv.roster(m.group(1))
+            since = q.get("changed_since")
+            if since:
+                items = [a for a in items if a["changed"] >= since]
+            return self.page("attendees", items, q)
+        return self.reply(404, {"error": "NOT_FOUND", "status_code": 404})
+
+    def count(self, endpoint: str) -> None:
+        with self.server.lock:
+            self.server.calls[endpoint] = self.server.calls.get(endpoint, 0) + 1
+
+    def page(self, key: str, items: List[Dict], q: Dict[str, str]) -> None:
+        offset = offset_of(q.get("continuation"))
+        chunk = items[offset : offset + PAGE_SIZE]
+        more = offset + PAGE_SIZE < len(items)
+        pagination = {
+            "object_count": len(items),
+            "page_number": offset // PAGE_SIZE + 1,
+            "page_size": PAGE_SIZE,
+            "page_count": max(1, -(-len(items) // PAGE_SIZE)),
+            "has_more_items": more,
+        }
+        if more:
+            pagination["continuation"] = token(offset + PAGE_SIZE)
+        return self.reply(200, {key: chunk, "pagination": pagination})
+
+    def reply(self, status: int, obj: Dict) -> None:
+        body = json.dumps(obj).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_server(
+    config: MockConfig, host: str = "127.0.0.1", port: int = 0
+) -> MockEventbriteServer:
+    """Serve in a daemon thread; port 0 picks a free one (see .base_url)."""
+    srv = MockEventbriteServer((host, port), config)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv
+
+
+def add_config_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--events", type=int, default=40, help="Events in the organization")
+    parser.add_argument("--attendees", type=int, default=1_250, help="Attendees per event")
+    parser.add_argument(
+        "--entities",
+        type=int,
+        default=100_000,
+        help="synth_extract.py rows the companies are drawn from",
+    )
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay per response")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Share of pages → 503")
+    parser.add_argument("--seed", type=int, default=7)
+
+
+def config_from_args(args: argparse.Namespace) -> MockConfig:
+    return MockConfig(
+        events=args.events,
+        attendees=args.attendees,
+        entities=args.entities,
+        latency_ms=args.latency_ms,
+        fail_rate=args.fail_rate,
+        seed=args.seed,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a mock Eventbrite v3 API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8790)
+    add_config_args(parser)
+    args = parser.parse_args()
+
+    srv = MockEventbriteServer((args.host, args.port), config_from_args(args))
+    print("Mock Eventbrite API at", srv.base_url)
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Offline stand-in for the two iContact 2.2 endpoints  python -m usdlf icontact
+uses, so a sync can be run and timed without touching a real account:
+
+    POST /icp/a/<account>/c/<folder>/contacts        (add / update, batched)
+    POST /icp/a/<account>/c/<folder>/subscriptions   (list memberships)
+
+Contacts are kept in memory: one contactId per e-mail, updated in place when
+a batch carries the contactId or an address that already exists.  Requests
+without the Api-Version / Api-AppId / Api-Username / Api-Password headers get
+401.  --fail-rate and --throttle-rate answer a share of calls with 503 /
+429 (Retry-After: 0) to exercise the retries.
+
+    python bench/mock_icontact_api.py --port 8780 --latency-ms 30 --fail-rate 0.1
+    API_APP_ID=x API_USERNAME=x API_PASSWORD=x ACCOUNT_ID=1 CLIENT_FOLDER_ID=2 \\
+        python -m usdlf icontact --base-url http://127.0.0.1:8780/icp --list-id 7
+
+GET /stats returns call counters, the largest batch and the most requests
+that were in flight at once.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+ROUTE_RE = re.compile(r"^/icp/a/([^/]+)/c/([^/]+)/(contacts|subscriptions)/?$")
+AUTH_HEADERS = ("Api-AppId", "Api-Username", "Api-Password")
+
+
+class MockConfig:
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        fail_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        max_batch: int = 10_000,
+        seed: int = 7,
+    ):
+        self.latency_ms = latency_ms
+        self.fail_rate = fail_rate
+        self.throttle_rate = throttle_rate
+        self.max_batch = max_batch
+        self.seed = seed
+
+
+class MockIContactServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config: MockConfig):
+        super().__init__(address, MockHandler)
+        self.config = config
+        self.lock = threading.Lock()
+        self.rng = random.Random(config.seed)
+        self.calls: Dict[str, int] = {}
+        self.failed = 0
+        self.throttled = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.largest_batch = 0
+        self.by_email: Dict[str, str] = {}
+        self.contacts: Dict[str, Dict] = {}
+        self.subscriptions: Dict[str, Dict] = {}
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/icp"
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {
+                "calls": dict(self.calls),
+                "failed": self.failed,
+                "throttled": self.throttled,
+                "max_in_flight": self.max_in_flight,
+                "largest_batch": self.largest_batch,
+                "contacts": len(self.contacts),
+                "subscriptions": len(self.subscriptions),
+            }
+
+    # ───────── Endpoints ─────────
+
+    def add_contacts(self, batch: List[Dict]) -> Dict:
+        out, warnings = [], []
+        with self.lock:
+            for c in batch:
+                email = (c.get("email") or "").strip().lower()
+                if "@" not in email:
+                    warnings.append(f"Invalid email: {email!r}")
+                    continue
+                cid = str(c.get("contactId") or self.by_email.get(email) or "")
+                if cid not in self.contacts:
+                    cid = str(len(self.contacts) + 1_000_001)
+                old = self.contacts.get(cid, {})
+                if old.get("email") and old["email"] != email:
+                    self.by_email.pop(old["email"], None)
+                self.contacts[cid] = {**old, **c, "email": email, "contactId": cid}
+                self.by_email[email] = cid
+                out.append(self.contacts[cid])
+        return {"contacts": out, "warnings": warnings}
+
+    def add_subscriptions(self, batch: List[Dict]) -> Dict:
+        out, warnings = [], []
+        with self.lock:
+            for s in batch:
+                cid, list_id = str(s.get("contactId")), str(s.get("listId"))
+                if cid not in self.contacts:
+                    warnings.append(f"Unknown contactId: {cid}")
+                    continue
+                sub = {
+                    "subscriptionId": f"{list_id}_{cid}",
+                    "contactId": cid,
+                    "listId": list_id,
+                    "status": s.get("status", "normal"),
+                }
+                self.subscriptions[sub["subscriptionId"]] = sub
+                out.append(sub)
+        return {"subscriptions": out, "warnings": warnings}
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    server: MockIContactServer
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        if self.path == "/stats":
+            return self.reply(200, self.server.stats())
+        return self.reply(404, {"errors": ["unknown endpoint"]})
+
+    def do_POST(self) -> None:
+        srv, cfg = self.server, self.server.config
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        m = ROUTE_RE.match(self.path)
+        if not m:
+            return self.reply(404, {"errors": ["unknown endpoint"]})
+        endpoint = m.group(3)
+        with srv.lock:
+            srv.calls[endpoint] = srv.calls.get(endpoint, 0) + 1
+            srv.in_flight += 1
+            srv.max_in_flight = max(srv.max_in_flight, srv.in_flight)
+            draw = srv.rng.random()
+        try:
+            if cfg.latency_ms:
+                time.sleep(cfg.latency_ms / 1000)
+            if self.headers.get("Api-Version") != "2.2" or not all(
+                self.headers.get(h) for h in AUTH_HEADERS
+            ):
+                return self.reply(401, {"errors": ["Authentication failed"]})
+            if draw < cfg.throttle_rate:
+                with srv.lock:
+                    srv.throttled += 1
+                return self.reply(429, {"errors": ["Rate limit exceeded"]}, {"Retry-After": "0"})
+            if draw < cfg.throttle_rate + cfg.fail_rate:
+                with srv.lock:
+                    srv.failed += 1
+                return self.reply(503, {"errors": ["Service unavailable"]})
+            try:
+                batch = json.loads(body or b"[]")
+            except ValueError:
+                return self.reply(400, {"errors": ["Malformed JSON"]})
+            if isinstance(batch, dict):
+                batch = [batch]
+            if len(batch) > cfg.max_batch:
+                return self.reply(400, {"errors": [f"More than {cfg.max_batch} items"]})
+            with srv.lock:
+                srv.largest_batch = max(srv.largest_batch, len(batch))
+            if endpoint == "contacts":
+                return self.reply(200, srv.add_contacts(batch))
+            return self.reply(200, srv.add_subscriptions(batch))
+        finally:
+            with srv.lock:
+                srv.in_flight -= 1
+
+    def reply(self, status: int, obj: Dict, headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(obj).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_server(
+    config: MockConfig, host: str = "127.0.0.1", port: int = 0
+) -> MockIContactServer:
+    """Serve in a daemon thread; port 0 picks a free one (see .base_url)."""
+    srv = MockIContactServer((host, port), config)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a mock iContact 2.2 API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8780)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay per response")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Share of calls → 503")
+    parser.add_argument(
+        "--throttle-rate", type=float, default=0.0, help="Share of calls → 429"
+    )
+    parser.add_argument(
+        "--max-batch", type=int, default=10_000, help="Largest batch accepted (400 above)"
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    config = MockConfig(
+        latency_ms=args.latency_ms,
+        fail_rate=args.fail_rate,
+        throttle_rate=args.throttle_rate,
+        max_batch=args.max_batch,
+        seed=args.seed,
+    )
+    srv = MockIContactServer((args.host, args.port), config)
+    print("Mock iContact API at", srv.base_url)
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Offline stand-in for the two SAM.gov Opportunities endpoints the harvester
+uses, so it can be benchmarked without spending quota:
+
+    GET /opportunities/v2/search                       (paged notice search)
+    GET /opportunities/v2/opportunities/<id>/ivl       (interested vendors)
+
+Notices and rosters are synthetic but deterministic for a given --seed: the
+same notice always has the same roster, so runs are comparable.
+
+    python bench/mock_sam_api.py --port 8765 --notices 5000 --latency-ms 40 \\
+        --quota-after 1000
+    python -m usdlf harvest --base-url http://127.0.0.1:8765/opportunities/v2
+
+Any ptype / organizationCode is accepted; the ptype becomes the noticeId
+prefix so several targets never collide.  Notices are spread over the 90
+days up to today and postedFrom / postedTo are honoured.  GET /stats returns call counters.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import parse_qs, urlparse
+
+NOTICE_TYPES = {
+    "p": "Presolicitation",
+    "r": "Sources Sought",
+    "k": "Combined Synopsis/Solicitation",
+}
+SUB_TIERS = [
+    "DEPT OF THE ARMY",
+    "DEPT OF THE NAVY",
+    "DEPT OF THE AIR FORCE",
+    "DEFENSE LOGISTICS AGENCY",
+    "DEFENSE HEALTH AGENCY",
+]
+TITLE_WORDS = [
+    "repair", "aircraft", "parts", "software", "maintenance", "services",
+    "construction", "medical", "training", "radar", "vehicle", "support",
+]
+NAICS_CODES = ["336411", "336413", "541330", "541512", "561210", "238220", "339113"]
+SET_ASIDES = [
+    (None, None),
+    ("SBA", "Total Small Business Set-Aside (FAR 19.5)"),
+    ("8A", "8(a) Set-Aside (FAR 19.8)"),
+    ("SDVOSBC", "Service-Disabled Veteran-Owned Small Business (SDVOSB) Set-Aside (FAR 19.14)"),
+    ("HZC", "Historically Underutilized Business (HUBZone) Set-Aside (FAR 19.13)"),
+]
+IVL_RE = re.compile(r"/opportunities/([^/]+)/ivl$")
+
+
+class MockConfig:
+    def __init__(
+        self,
+        notices: int = 5_000,
+        page_max: int = 1_000,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        rate_403: float = 0.05,
+        rate_404: float = 0.10,
+        max_roster: int = 12,
+        quota_after: int = 0,
+        seed: int = 7,
+    ):
+        self.notices = notices
+        self.page_max = page_max
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_403 = rate_403
+        self.rate_404 = rate_404
+        self.max_roster = max_roster
+        self.quota_after = quota_after
+        self.seed = seed
+
+
+class MockSamServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config: MockConfig):
+        super().__init__(address, MockHandler)
+        self.config = config
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.search_calls = 0
+        self.ivl_calls = 0
+        self.throttled = 0
+        self.first_call_at = None
+        self.first_429_at = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/opportunities/v2"
+
+    def stats(self) -> Dict:
+        with self.lock:
+            ttq = None
+            if self.first_429_at is not None:
+                ttq = round(self.first_429_at - self.first_call_at, 3)
+            return {
+                "calls": self.calls,
+                "search_calls": self.search_calls,
+                "ivl_calls": self.ivl_calls,
+                "throttled": self.throttled,
+                "time_to_quota_s": ttq,
+            }
+
+
+def rng_for(seed: int, key: str) -> random.Random:
+    return random.Random(zlib.crc32(key.encode()) ^ seed)
+
+
+def notice(cfg: MockConfig, ptype: str, i: int, today: dt.date) -> Dict:
+    rng = rng_for(cfg.seed, f"{ptype}{i}")
+    posted = today - dt.timedelta(days=i * 90 // max(cfg.notices, 1))
+    return {
+        "noticeId": f"{ptype}{i:07d}",
+        "title": " ".join(rng.sample(TITLE_WORDS, 3)).title(),
+        "postedDate": posted.isoformat(),
+        "type": NOTICE_TYPES.get(ptype, "Special Notice"),
+        "fullParentPathName": "DEPT OF DEFENSE." + rng.choice(SUB_TIERS),
+        "responseDeadLine": (posted + dt.timedelta(days=30)).isoformat() + "T17:00:00-05:00",
+        "solicitationNumber": f"W{rng.randrange(10**5):05d}{posted:%y}R{i % 10**4:04d}",
+        "naicsCode": rng.choice(NAICS_CODES),
+        **dict(zip(("typeOfSetAside", "typeOfSetAsideDescription"), rng.choice(SET_ASIDES))),
+    }
+
+
+def in_window(posted: str, q: Dict[str, List[str]]) -> bool:
+    """postedFrom / postedTo (MM/DD/YYYY, inclusive) like the real search."""
+    for key, keep in (("postedFrom", lambda p, b: p >= b), ("postedTo", lambda p, b: p <= b)):
+        if key in q:
+            bound = dt.datetime.strptime(q[key][0], "%m/%d/%Y").date().isoformat()
+            if not keep(posted, bound):
+                return False
+    return True
+
+
+def roster(cfg: MockConfig, nid: str) -> List[Dict]:
+    rng = rng_for(cfg.seed, nid)
+    return [
+        {
+            "ueiSAM": f"MOCK{rng.randrange(10**8):08d}",
+            "cageNumber": f"{rng.randrange(36**5):05X}"[:5],
+            "name": f"Vendor {rng.randrange(10**6)} LLC",
+        }
+        for _ in range(rng.randrange(cfg.max_roster + 1))
+    ]
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    server: MockSamServer
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        srv, cfg = self.server, self.server.config
+        url = urlparse(self.path)
+        if url.path == "/stats":
+            return self.reply(200, srv.stats())
+
+        with srv.lock:
+            srv.calls += 1
+            now = time.monotonic()
+            if srv.first_call_at is None:
+                srv.first_call_at = now
+            over = cfg.quota_after and srv.calls > cfg.quota_after
+            if over:
+                srv.throttled += 1
+                if srv.first_429_at is None:
+                    srv.first_429_at = now
+        if cfg.latency_ms or cfg.jitter_ms:
+            delay = cfg.latency_ms + random.uniform(-1, 1) * cfg.jitter_ms
+            time.sleep(max(0.0, delay) / 1000)
+        if over:
+            return self.reply(429, {"error": {"code": "OVER_RATE_LIMIT"}})
+
+        if url.path.endswith("/search"):
+            with srv.lock:
+                srv.search_calls += 1
+            q = parse_qs(url.query)
+            ptype = q.get("ptype", ["p"])[0]
+            offset = int(q.get("offset", ["0"])[0])
+            limit = min(int(q.get("limit", ["1000"])[0]), cfg.page_max)
+            today = dt.date.today()
+            window = [
+                n
+                for n in (notice(cfg, ptype, i, today) for i in range(cfg.notices))
+                if in_window(n["postedDate"], q)
+            ]
+            data = window[offset : offset + limit]
+            return self.reply(200, {"totalRecords": len(window), "opportunitiesData": data})
+
+        m = IVL_RE.search(url.path)
+        if m:
+            with srv.lock:
+                srv.ivl_calls += 1
+            nid = m.group(1)
+            draw = rng_for(cfg.seed ^ 0x5A5A, nid).random()
+            if draw < cfg.rate_403:
+                return self.reply(403, {"error": "forbidden"})
+            if draw < cfg.rate_403 + cfg.rate_404:
+                return self.reply(404, {"error": "not found"})
+            return self.reply(200, {"ivl": roster(cfg, nid)})
+
+        return self.reply(404, {"error": "unknown endpoint"})
+
+    def reply(self, status: int, obj: Dict) -> None:
+        body = json.dumps(obj).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_server(config: MockConfig, host: str = "127.0.0.1", port: int = 0) -> MockSamServer:
+    """Serve in a daemon thread; port 0 picks a free one (see .base_url)."""
+    srv = MockSamServer((host, port), config)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv
+
+
+def add_config_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--notices", type=int, default=5_000, help="Notices per ptype")
+    parser.add_argument("--page-max", type=int, default=1_000, help="Largest page served")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay per response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="± random extra delay")
+    parser.add_argument(
+        "--rate-403", type=float, default=0.05, help="Share of IVLs answering 403"
+    )
+    parser.add_argument(
+        "--rate-404", type=float, default=0.10, help="Share of IVLs answering 404"
+    )
+    parser.add_argument("--max-roster", type=int, default=12, help="Largest IVL roster")
+    parser.add_argument(
+        "--quota-after", type=int, default=0, help="Answer 429 after N calls (0 = never)"
+    )
+    parser.add_argument("--seed", type=int, default=7)
+
+
+def config_from_args(args: argparse.Namespace) -> MockConfig:
+    return MockConfig(
+        notices=args.notices,
+        page_max=args.page_max,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        rate_403=args.rate_403,
+        rate_404=args.rate_404,
+        max_roster=args.max_roster,
+        quota_after=args.quota_after,
+        seed=args.seed,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a mock SAM Opportunities API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_config_args(parser)
+    args = parser.parse_args()
+
+    srv = MockSamServer((args.host, args.port), config_from_args(args))
+    print("Mock SAM API at", srv.base_url)
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Synthetic SAM monthly extract and matching IVL harvest, laid out like
+data/  so steps 0 and 2 run on it unchanged:
+
+    OUT/entity/YYYYMM/SAM_PUBLIC_UTF-8_MONTHLY_V2_YYYYMMDD.dat
+    OUT/harvests/YYYYMM/YYYYMMDD_000000_p_harvest/{ivl_hits.csv,all_notices.csv}
+
+    python bench/synth_extract.py --rows 1m --out /tmp/synth
+    python -m usdlf format /tmp/synth/entity/202507/SAM_PUBLIC_UTF-8_MONTHLY_V2_20250701.dat
+    python -m usdlf merge --harvest /tmp/synth/harvests/202507/20250701_000000_p_harvest \\
+        --entities /tmp/synth/entity/202507/formatted_entities_20250701.sqlite
+
+Rows are pipe-delimited, 150 columns ending in  !end , one per line after a
+BOF header, with every column step 0 reads (COLUMN_MAPPINGS) filled in.
+E-mail addresses sit in the website/e-mail cell or in POC cells and phone
+numbers in POC cells, on --email-rate / --phone-rate of the rows; some are
+malformed, use non-US area codes or a (ddd) ddd-dddd form the extractor does
+not read, so its rejects are exercised too (about 38% of rows end up with a
+phone at the default rate).
+
+The IVL references the extract: most rows match by UEI, some only by CAGE
+(blank or unknown UEI), some match nothing.  Output is deterministic for a
+given --seed, and entity i's UEI / CAGE / name depend only on i.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import datetime as dt
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+ROOT_DIR = Path(__file__).resolve().parents[1]  # …/usdlf
+sys.path.insert(0, str(ROOT_DIR))
+
+from usdlf.extract import COLUMN_MAPPINGS  # noqa: E402
+from usdlf.sam_contacts import US_AREA_CODES  # noqa: E402
+
+N_COLUMNS = 150
+COLUMN = {name: idx for idx, name in COLUMN_MAPPINGS.items()}
+POC_BLOCKS = range(46, 112, 11)  # six POCs × 11 fields (name … state)
+
+AREAS = sorted(US_AREA_CODES)
+BAD_AREAS = ["000", "123", "555", "999"]
+STATES = ["VA", "MD", "TX", "CA", "FL", "AL", "OH", "WA", "CO", "PA", "GA", "NC"]
+CITIES = ["Arlington", "Huntsville", "San Diego", "Dayton", "Norfolk", "Colorado Springs"]
+STRUCTURES = ["2L", "2J", "2K", "8H", "ZZ", "CY", "X6"]
+BUSINESS_TYPES = ["2X", "A8", "27", "MF", "23", "A2", "QF", "XX", "JT", "8W"]
+NAICS = ["541330", "541512", "336413", "332710", "561210", "238210", "541715", "423430"]
+SET_ASIDE = ("SBA", "Total Small Business Set-Aside (FAR 19.5)")
+PSC = ["R408", "J016", "AD25", "7030", "D302", "5340", "1560", "Y1AA"]
+FIRST = ["Jane", "John", "Pat", "Maria", "Wei", "Ahmed", "Luis", "Kim", "Sam", "Dana"]
+LAST = ["Smith", "Nguyen", "Garcia", "Johnson", "Patel", "Brown", "Lee", "Okafor"]
+NAME_A = ["Apex", "Liberty", "Summit", "Patriot", "Blue Ridge", "Delta", "Ironclad", "Vector"]
+NAME_B = ["Defense", "Aerospace", "Technologies", "Solutions", "Systems", "Logistics"]
+NAME_C = ["LLC", "Inc", "Corp", "Group", "Co"]
+MAILBOX = ["info", "sales", "contracts", "bids", "j.doe", "gov.sales", "admin"]
+TLD = ["com", "us", "net", "org", "co"]
+JUNK_EMAIL = ["a..b@example.com", "bids@-bad.com", "info@.example.com"]
+
+
+# ───────── Entity identity (a function of i only) ─────────
+
+
+def entity_uei(i: int) -> str:
+    # 7919 is coprime with 10**11, so the mapping is one-to-one
+    return f"S{(i * 7919) % 10**11:011d}"
+
+
+def entity_cage(i: int) -> str:
+    """Five base-36 characters; about one entity in ten has no CAGE."""
+    if i % 10 == 3:
+        return ""
+    n = (i * 40_503) % 36**5
+    digits = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    out = ""
+    for _ in range(5):
+        n, r = divmod(n, 36)
+        out = digits[r] + out
+    return out
+
+
+def entity_name(i: int) -> str:
+    return (
+        f"{NAME_A[i % len(NAME_A)]} {NAME_B[(i // 8) % len(NAME_B)]} "
+        f"{i} {NAME_C[(i // 48) % len(NAME_C)]}"
+    )
+
+
+def domain(i: int) -> str:
+    return f"{NAME_A[i % len(NAME_A)].lower().replace(' ', '')}{i}.{TLD[i % len(TLD)]}"
+
+
+# ───────── Extract rows ─────────
+
+
+def phone(rng: random.Random) -> str:
+    a = rng.choice(AREAS) if rng.random() < 0.95 else rng.choice(BAD_AREAS)
+    b, c = rng.randint(200, 999), rng.randint(0, 9999)
+    return rng.choice(
+        [f"{a}-{b}-{c:04d}", f"{a}{b}{c:04d}", f"{a} {b} {c:04d}", f"({a}) {b}-{c:04d}"]
+    )
+
+
+def email(rng: random.Random, i: int) -> str:
+    if rng.random() < 0.03:
+        return rng.choice(JUNK_EMAIL)
+    return f"{rng.choice(MAILBOX)}@{domain(i)}"
+
+
+def date(rng: random.Random, year0: int, year1: int) -> str:
+    return f"{rng.randint(year0, year1)}{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}"
+
+
+def extract_row(
+    rng: random.Random, i: int, email_rate: float, phone_rate: float
+) -> List[str]:
+    row = [""] * N_COLUMNS
+    state = rng.choice(STATES)
+    city = rng.choice(CITIES)
+    row[COLUMN["UEI"]] = entity_uei(i)
+    row[COLUMN["CAGE_CODE"]] = entity_cage(i)
+    row[COLUMN["SAM_STATUS"]] = "A" if rng.random() < 0.85 else "E"
+    row[COLUMN["PURPOSE_OF_REG"]] = rng.choice(["Z1", "Z2", "Z2", "Z5"])
+    for col in (7, 8, 9, 10):  # initial registration / expiration / update / activation
+        row[col] = date(rng, 2010, 2026)
+    row[COLUMN["LEGAL_NAME"]] = entity_name(i)
+    if rng.random() < 0.15:
+        row[COLUMN["DBA_NAME"]] = f"{NAME_A[(i + 3) % len(NAME_A)]} {i}"
+    row[COLUMN["STREET_ADDRESS"]] = f"{rng.randint(1, 9999)} Main St"
+    if rng.random() < 0.4:
+        row[16] = f"Suite {rng.randint(100, 999)}"
+    row[COLUMN["CITY"]] = city
+    row[COLUMN["STATE"]] = state
+    row[COLUMN["ZIP_CODE"]] = f"{rng.randint(10000, 99999)}"
+    row[20] = f"{rng.randint(0, 9999):04d}"
+    row[COLUMN["COUNTRY"]] = "USA"
+    row[COLUMN["CONGRESSIONAL_DISTRICT"]] = f"{state}{rng.randint(1, 12):02d}"
+    row[23] = date(rng, 1980, 2024)
+    row[24] = "1231"
+    row[COLUMN["WEBSITE_OR_EMAIL"]] = f"www.{domain(i)}" if rng.random() < 0.5 else ""
+    row[COLUMN["ENTITY_STRUCTURE"]] = rng.choice(STRUCTURES)
+    row[28] = state
+    row[29] = "USA"
+    types = rng.sample(BUSINESS_TYPES, rng.randint(1, 5))
+    row[COLUMN["BUSINESS_TYPE_COUNTER"]] = f"{len(types):04d}"
+    row[COLUMN["BUSINESS_TYPE_CODES"]] = "~".join(types)
+    naics = rng.sample(NAICS, rng.randint(1, 6))
+    row[COLUMN["PRIMARY_NAICS"]] = naics[0]
+    row[COLUMN["NAICS_CODE_COUNTER"]] = f"{len(naics):04d}"
+    row[COLUMN["NAICS_CODE_STRING"]] = "~".join(f"{n}{rng.choice('YNE')}" for n in naics)
+    psc = rng.sample(PSC, rng.randint(0, 5))
+    row[35] = f"{len(psc):04d}"
+    row[36] = "~".join(psc)
+    row[COLUMN["CREDIT_CARD_USAGE"]] = rng.choice("YN")
+    row[38] = rng.choice("YN")
+    row[COLUMN["MAILING_ADDRESS"]] = f"PO Box {rng.randint(1, 9999)}"
+    row[COLUMN["MAILING_CITY"]] = city
+    row[COLUMN["MAILING_ZIP"]] = row[COLUMN["ZIP_CODE"]]
+    row[44] = "USA"
+    row[COLUMN["MAILING_STATE"]] = state
+
+    filled = []
+    for block in POC_BLOCKS:
+        if block in (46, 57) or rng.random() < 0.4:  # government POCs are usually set
+            row[block] = rng.choice(FIRST)
+            if rng.random() < 0.3:
+                row[block + 1] = rng.choice("ABCDEJMR")
+            row[block + 2] = rng.choice(LAST)
+            row[block + 3] = rng.choice(["", "President", "Contracts Manager", "CEO"])
+            row[block + 4] = f"{rng.randint(1, 9999)} Oak Ave"
+            row[block + 6] = city
+            row[block + 7] = f"{rng.randint(10000, 99999)}"
+            row[block + 8] = f"{rng.randint(0, 9999):04d}"
+            row[block + 9] = "USA"
+            row[block + 10] = state
+            filled.append(block)
+
+    # contact details: the e-mail cell or free-text POC cells (title / address line 2)
+    if rng.random() < email_rate:
+        for _ in range(rng.choice([1, 1, 1, 2, 3])):
+            if not row[26] and rng.random() < 0.6:
+                row[26] = email(rng, i)
+            else:
+                col = rng.choice(filled) + rng.choice([3, 5])
+                row[col] = f"{row[col]} {email(rng, i)}".strip()
+    if rng.random() < phone_rate:
+        for _ in range(rng.choice([1, 1, 2, 2, 3])):
+            col = rng.choice(filled) + rng.choice([3, 5])
+            row[col] = f"{row[col]} Tel {phone(rng)}".strip()
+
+    if rng.random() < 0.02:
+        row[COLUMN["NAICS_EXCEPTION_COUNTER"]] = "0001"
+        row[COLUMN["NAICS_EXCEPTION_STRING"]] = f"{naics[0]}YYY"
+    row[N_COLUMNS - 1] = "!end"
+    return row
+
+
+def write_extract(
+    path: Path, rows: int, seed: int, email_rate: float, phone_rate: float, date_tag: str
+) -> None:
+    rng = random.Random(seed)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8", newline="") as fh:
+        fh.write(f"BOF PUBLIC V2 00000000 {date_tag} {rows:010d} 0000001\n")
+        for i in range(rows):
+            fh.write("|".join(extract_row(rng, i, email_rate, phone_rate)))
+            fh.write("\n")
+            if i % 100_000 == 0:
+                print(f"  wrote {i:,} rows …", end="\r", flush=True)
+    tmp.replace(path)
+    print()
+
+
+# ───────── IVL harvest ─────────
+
+
+def write_harvest(
+    run_dir: Path, entities: int, ivl_rows: int, seed: int, posted: dt.date
+) -> Dict[str, int]:
+    """ivl_hits.csv + all_notices.csv for one synthetic run; returns the key mix."""
+    rng = random.Random(seed + 1)
+    run_dir.mkdir(parents=True, exist_ok=True)
+    mix = {"uei": 0, "cage": 0, "none": 0}
+    n_notices = 0
+    with open(run_dir / "ivl_hits.csv", "w", newline="", encoding="utf-8") as vf, open(
+        run_dir / "all_notices.csv", "w", newline="", encoding="utf-8"
+    ) as nf:
+        ivl_wr, not_wr = csv.writer(vf), csv.writer(nf)
+        ivl_wr.writerow(["noticeId", "ueiSAM", "cage", "vendorName", "ptype"])
+        not_wr.writerow(
+            [
+                "noticeId",
+                "title",
+                "postedDate",
+                "ptype",
+                "ivl_len",
+                "type",
+                "subTier",
+                "org_code",
+                "solicitationNumber",
+                "responseDeadLine",
+                "naicsCode",
+                "typeOfSetAside",
+                "typeOfSetAsideDescription",
+            ]
+        )
+        written = 0
+        while written < ivl_rows:
+            nid = f"p{rng.getrandbits(124):031x}"
+            roster = min(ivl_rows - written, max(1, int(rng.expovariate(1 / 12))))
+            for _ in range(roster):
+                i = rng.randrange(entities)
+                uei, cage, name = entity_uei(i), entity_cage(i), entity_name(i)
+                r = rng.random()
+                if r < 0.70:
+                    mix["uei"] += 1
+                elif r < 0.90 and cage:
+                    # blank (old rosters) or unknown UEI: only the CAGE can match
+                    uei = "" if r < 0.85 else f"X{rng.getrandbits(40):011d}"[:12]
+                    mix["cage"] += 1
+                else:
+                    uei, cage = f"N{rng.getrandbits(40):011d}"[:12], "ZZZZZ"
+                    mix["none"] += 1
+                ivl_wr.writerow([nid, uei, cage, name, "p"])
+            day = posted - dt.timedelta(days=rng.randint(0, 89))
+            not_wr.writerow(
+                [
+                    nid,
+                    f"Synthetic requirement {n_notices}",
+                    day.isoformat(),
+                    "p",
+                    roster,
+                    "Presolicitation",
+                    "DEFENSE LOGISTICS AGENCY",
+                    "097",
+                    # not drawn from rng, so the IVL rows stay the same per seed
+                    f"SPE4A6{day:%y}R{n_notices % 10**4:04d}",
+                    (day + dt.timedelta(days=30)).isoformat(),
+                    NAICS[n_notices % len(NAICS)],
+                    *(SET_ASIDE if n_notices % 3 else ("", "")),
+                ]
+            )
+            written += roster
+            n_notices += 1
+    return {"notices": n_notices, **mix}
+
+
+# ───────── Entry point ─────────
+
+
+def parse_count(text: str) -> int:
+    """10000, 10k, 2m, 1.5M → int."""
+    text = text.strip().lower().replace("_", "")
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    try:
+        return int(float(text[:-1] if scale > 1 else text) * scale)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a row count: {text!r}") from None
+
+
+def generate(
+    out: Path,
+    rows: int,
+    ivl_rows: int = 0,
+    seed: int = 7,
+    email_rate: float = 0.30,
+    phone_rate: float = 0.45,
+    date_tag: str = "20250701",
+    force: bool = False,
+) -> Dict[str, object]:
+    """
+    Write the extract and IVL under  out  (skipped when already there and
+    force is False).  ivl_rows 0 means rows // 20, capped at 200,000.
+    Returns {"extract", "harvest", "rows", "ivl_rows", "seconds"}.
+    """
+    ivl_rows = ivl_rows or min(max(rows // 20, 1), 200_000)
+    month = date_tag[:6]
+    dat = out / "entity" / month / f"SAM_PUBLIC_UTF-8_MONTHLY_V2_{date_tag}.dat"
+    run_dir = out / "harvests" / month / f"{date_tag}_000000_p_harvest"
+    t0 = time.perf_counter()
+    if force or not dat.exists():
+        print(f"Writing {rows:,}-row extract → {dat}")
+        write_extract(dat, rows, seed, email_rate, phone_rate, date_tag)
+    if force or not (run_dir / "ivl_hits.csv").exists():
+        posted = dt.datetime.strptime(date_tag, "%Y%m%d").date()
+        mix = write_harvest(run_dir, rows, ivl_rows, seed, posted)
+        print(f"Wrote {ivl_rows:,} IVL rows over {mix['notices']:,} notices → {run_dir}")
+    return {
+        "extract": dat,
+        "harvest": run_dir,
+        "rows": rows,
+        "ivl_rows": ivl_rows,
+        "seconds": time.perf_counter() - t0,
+    }
+
+
+def add_generator_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument(
+        "--email-rate", type=float, default=0.30, help="Share of rows with an e-mail (0.30)"
+    )
+    parser.add_argument(
+        "--phone-rate", type=float, default=0.45, help="Share of rows with a phone (0.45)"
+    )
+    parser.add_argument("--date", default="20250701", help="Extract date tag YYYYMMDD")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write a synthetic SAM extract and IVL run.")
+    parser.add_argument("--rows", type=parse_count, default=100_000, help="e.g. 10k, 2m")
+    parser.add_argument(
+        "--ivl-rows",
+        type=parse_count,
+        default=0,
+        help="IVL rows (default rows/20, at most 200k)",
+    )
+    parser.add_argument(
+        "--out", type=Path, required=True, help="Root to write entity/ and harvests/ under"
+    )
+    parser.add_argument("--force", action="store_true", help="Overwrite existing files")
+    add_generator_args(parser)
+    args = parser.parse_args()
+    res = generate(
+        args.out,
+        args.rows,
+        args.ivl_rows,
+        args.seed,
+        args.email_rate,
+        args.phone_rate,
+        args.date,
+        args.force,
+    )
+    size = res["extract"].stat().st_size / 1024**2
+    print(f"{res['rows']:,} rows ({size:,.0f} MB), {res['ivl_rows']:,} IVL rows "
+          f"in {res['seconds']:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+"""
+Step 3 — cross-run IVL warehouse.
+
+Kept for existing habits and cron entries; same as   python -m usdlf warehouse ...
+(the code lives in the usdlf package).
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from usdlf.cli import main  # noqa: E402
+
+if __name__ == "__main__":
+    sys.exit(main(["warehouse", *sys.argv[1:]]))
@@ -0,0 +1,16 @@
+#!/usr/bin/env python3
+"""
+Step 4 — sync the curated IVL vendors to iContact.
+
+Same as   python -m usdlf icontact ...   (the code lives in the usdlf package).
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from usdlf.cli import main  # noqa: E402
+
+if __name__ == "__main__":
+    sys.exit(main(["icontact", *sys.argv[1:]]))
@@ -0,0 +1,16 @@
+#!/usr/bin/env python3
+"""
+Step 5 — ingest Eventbrite attendees and match them to SAM entities.
+
+Same as   python -m usdlf eventbrite ...   (the code lives in the usdlf package).
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from usdlf.cli import main  # noqa: E402
+
+if __name__ == "__main__":
+    sys.exit(main(["eventbrite", *sys.argv[1:]]))
@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+"""
+Run steps 0→1→2→3, skipping stages that are up to date.
+
+Kept for existing habits and cron entries; same as   python -m usdlf pipeline ...
+(the code lives in the usdlf package).
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from usdlf.cli import main  # noqa: E402
+
+if __name__ == "__main__":
+    sys.exit(main(["pipeline", *sys.argv[1:]]))
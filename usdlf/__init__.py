@@ -0,0 +1,38 @@
+"""
+SAM entity and IVL contact harvesting workflow.
+
+    from usdlf import parse_extract, harvest, merge, run_pipeline
+
+    parse_extract(workers=0)                  # step 0 → formatted_entities_*.parquet/.sqlite
+    summary = harvest(targets=[...])          # step 1 → data/harvests/YYYYMM/*_harvest/
+    merge(entities=store)                     # step 2 → *_curated_ivl_contacts.xlsx
+
+The step functions are resolved on first use, so  import usdlf  stays cheap
+(pandas, pyarrow and requests load with the step that needs them) and a
+long-running worker can call them repeatedly in one process.  The command
+line is
+python -m usdlf <format|harvest|merge|warehouse|pipeline|icontact|eventbrite> .
+"""
+
+from importlib import import_module
+
+_EXPORTS = {
+    "parse_extract": ".extract",
+    "harvest": ".harvester",
+    "merge": ".merge_ivl",
+    "run_pipeline": ".pipeline",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name in _EXPORTS:
+        value = getattr(import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value  # resolve once
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,338 @@
+"""
+Match Eventbrite attendees (eventbrite_ingest.py) to SAM entities from
+step 0, and to their IVL history in the step 3 warehouse.
+
+An attendee matches an entity by
+
+  1. Domain — the domain of the attendee's e-mail equals a domain in the
+     entity's e-mail addresses or website (free-mail domains never match);
+  2. Name   — otherwise, the normalised company name equals the entity's
+     normalised legal business name (upper case, "&" → AND, punctuation
+     dropped, trailing LLC / INC / CORP / … removed).
+
+The two lookups — domain → entity and name key → entity, first entity in
+store order, with how many entities share the key — are built once per
+entity store and kept beside the attendee store as
+entity_keys_<YYYYMMDD>.parquet  (rebuilt when the store is newer).  The
+attendees are then matched in one vectorised pass per key (pyarrow
+index_in, as in entity_match.py), so tens of thousands take well under a
+second once the lookup exists.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from .entity_match import key_positions
+from .instrument import RunRecorder
+from .paths import (
+    ENTITY_ROOT,
+    ENTITY_STORE_RE,
+    EVENTBRITE_DB,
+    WAREHOUSE,
+    InputError,
+    display_path,
+    newest_entity_store,
+)
+from .xlsx_export import write_workbook
+
+FREE_MAIL = {
+    "gmail.com",
+    "googlemail.com",
+    "yahoo.com",
+    "hotmail.com",
+    "outlook.com",
+    "live.com",
+    "msn.com",
+    "aol.com",
+    "icloud.com",
+    "me.com",
+    "mac.com",
+    "comcast.net",
+    "verizon.net",
+    "att.net",
+    "sbcglobal.net",
+    "cox.net",
+    "proton.me",
+    "protonmail.com",
+    "ymail.com",
+    "mail.com",
+    "gmx.com",
+}
+# trailing legal-form words; removed repeatedly ("… CO INC" → "…")
+SUFFIX_RE = (
+    r"(?:\s+(?:LLC|INC|INCORPORATED|CORP|CORPORATION|CO|COMPANY"
+    r"|LTD|LIMITED|LP|LLP|PLLC|PC|PLC))+$"
+)
+ENTITY_COLUMNS = ["UEI", "CAGE", "Business Name", "Email Addresses", "Website or Email"]
+LOOKUP_COLUMNS = ["key", "UEI", "CAGE", "Business Name", "candidates"]
+
+
+# ───────── Keys ─────────
+
+
+def normalize_names(names: pd.Series) -> pd.Series:
+    """Company names → match keys ("" when nothing is left)."""
+    s = names.fillna("").astype(str).str.upper()
+    s = s.str.replace("&", " AND ", regex=False)
+    s = s.str.replace(r"[-/]", " ", regex=True)
+    s = s.str.replace(r"[^A-Z0-9 ]", "", regex=True)
+    s = s.str.replace(r"\s+", " ", regex=True).str.strip()
+    s = s.str.replace(r"^THE ", "", regex=True)
+    return s.str.replace(SUFFIX_RE, "", regex=True)
+
+
+def email_domains(emails: pd.Series) -> pd.Series:
+    """Lower-case domain of each address; "" for free mail or no address."""
+    dom = emails.fillna("").astype(str).str.strip().str.lower().str.extract(r"@([^@\s]+)$")[0]
+    dom = dom.fillna("")
+    return dom.where(~dom.isin(FREE_MAIL), "")
+
+
+def website_domains(sites: pd.Series) -> pd.Series:
+    """www.example.com/x, https://example.com → example.com."""
+    s = sites.fillna("").astype(str).str.strip().str.lower()
+    s = s.str.replace(r"^[a-z]+://", "", regex=True).str.replace(r"^www\.", "", regex=True)
+    s = s.str.split("/", n=1).str[0].str.split("@").str[-1]
+    return s.where(s.str.contains(".", regex=False) & ~s.isin(FREE_MAIL), "")
+
+
+# ───────── Entity lookup ─────────
+
+
+def read_entities(store: Path) -> pd.DataFrame:
+    """The columns the lookups need, in store order."""
+    if store.suffix == ".sqlite":
+        con = sqlite3.connect(f"file:{store}?mode=ro", uri=True)
+        try:
+            have = {r[1] for r in con.execute("PRAGMA table_info(entities)")}
+            cols = ", ".join(f'"{c}"' for c in ENTITY_COLUMNS if c in have)
+            ent = pd.read_sql_query(f"SELECT {cols} FROM entities ORDER BY rowid", con, dtype=str)
+        finally:
+            con.close()
+    elif store.suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        have = set(pq.read_schema(store).names)
+        ent = pd.read_parquet(store, columns=[c for c in ENTITY_COLUMNS if c in have])
+    else:
+        sheets = pd.read_excel(store, dtype=str, sheet_name=None)
+        ent = pd.concat(sheets.values(), ignore_index=True)
+    return ent.reindex(columns=ENTITY_COLUMNS).astype(object)
+
+
+def _keyed(ent: pd.DataFrame, keys: pd.Series) -> pd.DataFrame:
+    """One row per distinct key: the first entity with it + how many share it."""
+    df = ent.loc[keys.index, ["UEI", "CAGE", "Business Name"]].assign(key=keys.to_numpy())
+    df = df[df["key"] != ""].drop_duplicates(["key", "UEI"])
+    counts = df.groupby("key", sort=False)["UEI"].size()
+    first = df.drop_duplicates("key")
+    return first.assign(candidates=first["key"].map(counts).to_numpy())[LOOKUP_COLUMNS]
+
+
+def build_lookups(ent: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """{"domain": …, "name": …} lookup frames (LOOKUP_COLUMNS)."""
+    ent = ent.reset_index(drop=True)
+    emails = ent["Email Addresses"].fillna("").str.split(";").explode()
+    doms = pd.concat([email_domains(emails), website_domains(ent["Website or Email"])])
+    doms = doms.sort_index(kind="stable")  # keep store order across both sources
+    return {
+        "domain": _keyed(ent, doms),
+        "name": _keyed(ent, normalize_names(ent["Business Name"])),
+    }
+
+
+def load_lookups(store: Path, cache_dir: Path) -> Dict[str, pd.DataFrame]:
+    """Lookups for  store , from  cache_dir/entity_keys_<date>.parquet  when it
+    is newer than the store, else built and saved there."""
+    m = ENTITY_STORE_RE.search(store.name)
+    if not m:
+        raise InputError(f"Not a formatted_entities_* store: {store}")
+    cache = cache_dir / f"entity_keys_{m.group(1)}.parquet"
+    if cache.exists() and cache.stat().st_mtime >= store.stat().st_mtime:
+        keys = pd.read_parquet(cache)
+        return {
+            kind: keys[keys["kind"] == kind].drop(columns="kind").reset_index(drop=True)
+            for kind in ("domain", "name")
+        }
+    lookups = build_lookups(read_entities(store))
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    both = pd.concat([df.assign(kind=kind) for kind, df in lookups.items()], ignore_index=True)
+    both.to_parquet(cache, index=False)
+    return lookups
+
+
+# ───────── Match ─────────
+
+
+def match_attendees(att: pd.DataFrame, lookups: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """att + UEI, CAGE, Business Name, candidates and Match Key ("Domain",
+    "Name" or "" when neither matched); one row per attendee, same order."""
+    att = att.reset_index(drop=True)
+    probes = {
+        "domain": email_domains(att["email"]),
+        "name": normalize_names(att["company"]),
+    }
+    pos = np.full(len(att), -1, dtype=np.int64)
+    which = np.full(len(att), -1, dtype=np.int64)
+    match_key = np.full(len(att), "", dtype=object)
+    for i, (kind, label) in enumerate((("domain", "Domain"), ("name", "Name"))):
+        todo = pos < 0
+        if not todo.any():
+            break
+        probe = probes[kind][todo]
+        if not (probe != "").any():  # free mail / no company: nothing to look up
+            continue
+        found = key_positions(lookups[kind]["key"], probe)
+        hit = np.flatnonzero(todo)[found >= 0]
+        pos[hit] = found[found >= 0]
+        which[hit] = i
+        match_key[hit] = label
+
+    cols = ["UEI", "CAGE", "Business Name", "candidates"]
+    out = pd.DataFrame(index=att.index, columns=cols, dtype=object)
+    for i, kind in enumerate(("domain", "name")):
+        rows = np.flatnonzero(which == i)
+        if len(rows):
+            out.iloc[rows] = lookups[kind][cols].iloc[pos[rows]].to_numpy()
+    merged = pd.concat([att, out], axis=1)
+    merged["Match Key"] = match_key
+    return merged
+
+
+def ivl_history(warehouse: Optional[Path], ueis: pd.Series) -> pd.DataFrame:
+    """Per UEI: distinct notices whose IVL it joined and the last run seen."""
+    empty = pd.DataFrame(columns=["UEI", "ivls_joined", "last_ivl_run"])
+    if warehouse is None or not warehouse.exists():
+        return empty
+    keys = sorted({u for u in ueis.dropna() if u})
+    con = sqlite3.connect(f"file:{warehouse}?mode=ro", uri=True)
+    frames = []
+    try:
+        for i in range(0, len(keys), 500):
+            batch = keys[i : i + 500]
+            marks = ", ".join("?" * len(batch))
+            frames.append(
+                pd.read_sql_query(
+                    f"""SELECT uei AS UEI, COUNT(DISTINCT noticeId) AS ivls_joined,
+                               MAX(last_run) AS last_ivl_run
+                        FROM ivl WHERE uei IN ({marks}) GROUP BY uei""",
+                    con,
+                    params=batch,
+                )
+            )
+    finally:
+        con.close()
+    return pd.concat(frames, ignore_index=True) if frames else empty
+
+
+# ───────── Entry point ─────────
+
+# output column → curated name
+OUTPUT = {
+    "event_name": "Event",
+    "start_utc": "Event Start",
+    "first_name": "First Name",
+    "last_name": "Last Name",
+    "email": "Email",
+    "company": "Company",
+    "job_title": "Job Title",
+    "status": "Attendee Status",
+    "checked_in": "Checked In",
+    "Match Key": "Match Key",
+    "UEI": "UEI",
+    "CAGE": "CAGE",
+    "Business Name": "Legal Business Name",
+    "candidates": "Entities With Key",
+    "ivls_joined": "IVLs Joined",
+    "last_ivl_run": "Last IVL Run",
+}
+
+
+def match(
+    db: Path = EVENTBRITE_DB,
+    entities: Optional[Path] = None,
+    entity_root: Path = ENTITY_ROOT,
+    warehouse: Optional[Path] = WAREHOUSE,
+    excel: bool = False,
+    rec: Optional[RunRecorder] = None,
+    ingested: Optional[Dict[str, object]] = None,
+) -> Dict[str, object]:
+    """
+    Match every stored attendee against  entities  (default: the newest
+    step 0 store) and write the result to the  attendee_matches  table and
+    attendee_matches.csv  (+ .xlsx with excel=True) beside  db ; the run
+    report (with  ingested , ingest()'s counts) goes to
+    eventbrite_report.json  there too.
+    """
+    rec = rec or RunRecorder("eventbrite")
+    if entities is not None:
+        store = Path(entities).expanduser().resolve()
+        if not (store.is_file() and ENTITY_STORE_RE.search(store.name)):
+            raise InputError("Provided --entities path is not a formatted_entities_* store.")
+    else:
+        store = newest_entity_store(entity_root)
+        if store is None:
+            raise FileNotFoundError(
+                "No formatted_entities_*.sqlite/.parquet/.xlsx found under data/entity/*/"
+            )
+    if not db.exists():
+        raise FileNotFoundError(f"No attendee store at {db} — run the ingest first.")
+    print("Entity store         :", display_path(store))
+
+    with rec.stage("lookups") as st:
+        lookups = load_lookups(store, db.parent)
+        st.rows = sum(len(df) for df in lookups.values())
+    con = sqlite3.connect(str(db))
+    try:
+        with rec.stage("load_attendees") as st:
+            att = pd.read_sql_query(
+                """SELECT a.*, e.name AS event_name, e.start_utc
+                   FROM attendees a LEFT JOIN events e USING (event_id)
+                   ORDER BY e.start_utc, a.event_id, a.attendee_id""",
+                con,
+                dtype={"email": object, "company": object},
+            )
+            st.rows = len(att)
+        with rec.stage("match", rows=len(att)):
+            merged = match_attendees(att, lookups)
+        with rec.stage("ivl_history", rows=len(merged)):
+            hist = ivl_history(warehouse, merged["UEI"])
+            merged = merged.merge(hist, on="UEI", how="left")
+        final = merged[list(OUTPUT)].rename(columns=OUTPUT)
+        with rec.stage("save", rows=len(final)):
+            final.assign(attendee_id=merged["attendee_id"]).to_sql(
+                "attendee_matches", con, if_exists="replace", index=False
+            )
+            csv_out = db.parent / "attendee_matches.csv"
+            final.to_csv(csv_out, index=False)
+        if excel:
+            with rec.stage("excel", rows=len(final)):
+                write_workbook(final, db.parent / "attendee_matches.xlsx", "Attendee Matches")
+    finally:
+        con.close()
+
+    by_key = merged["Match Key"].value_counts()
+    counts = {
+        "attendees": len(merged),
+        "matched_domain": int(by_key.get("Domain", 0)),
+        "matched_name": int(by_key.get("Name", 0)),
+        "with_ivl_history": int((merged["ivls_joined"].fillna(0).astype(int) > 0).sum()),
+    }
+    print(
+        f"Matched              : {counts['matched_domain'] + counts['matched_name']} / "
+        f"{len(merged)} attendees (domain {counts['matched_domain']}, "
+        f"name {counts['matched_name']}); {counts['with_ivl_history']} with IVL history"
+    )
+    print("Saved →", display_path(csv_out))
+    rec.sections.update(
+        entities=str(display_path(store)), ingest=ingested or {}, match=counts
+    )
+    report = rec.write(db.parent / "eventbrite_report.json")
+    print(rec.table())
+    return report
@@ -0,0 +1,539 @@
+"""
+usdlf command line — one subcommand per step:
+
+    python -m usdlf format     [--workers N] [--excel] [--delta] [--batch-size ROWS]
+    python -m usdlf harvest    [--workers N] [--target p:097] [--resume RUN_DIR] …
+    python -m usdlf merge      [--harvest RUN_DIR] [--entities STORE]
+    python -m usdlf warehouse  [ingest|vendors|notices|naics] [--since …] [--csv …]
+    python -m usdlf pipeline   [--harvest] [--force STAGE] …
+    python -m usdlf icontact   [WORKBOOK …] [--list-id ID] [--dry-run] …
+    python -m usdlf eventbrite [--org ID] [--event ID] [--full] [--no-ingest] …
+
+Only the standard library is imported until a subcommand runs; each handler
+imports its step module (and with it pandas / pyarrow / requests) on demand,
+so  --help  and argument errors come back immediately.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from .paths import (
+    ENTITY_ROOT,
+    EVENTBRITE_DB,
+    HARVEST_ROOT,
+    ICONTACT_STATE,
+    WAREHOUSE,
+    InputError,
+    display_path,
+    newest_entity_store,
+)
+from .sam_cache import DEFAULT_MAX_BYTES, parse_age
+from .settings import (
+    API_BASE,
+    DAILY_CALL_CAP,
+    EVENTBRITE_BASE,
+    EVENTBRITE_RATE_PER_SEC,
+    EVENTBRITE_RETRIES,
+    EVENTBRITE_WORKERS,
+    ICONTACT_BASE,
+    ICONTACT_BATCH,
+    ICONTACT_RATE_PER_SEC,
+    ICONTACT_RETRIES,
+    ICONTACT_WORKERS,
+    LOOKBACK_DAYS,
+    ORG_CODE,
+    PTYPE,
+    RATE_PER_SEC,
+    RECHECK_EVERY_DAYS,
+    SEARCH_OVERLAP_DAYS,
+)
+from .targets import load_targets, parse_target
+
+STAGES = ("format", "harvest", "merge", "warehouse")
+
+
+# ───────── Handlers ─────────
+
+
+def cmd_format(args: argparse.Namespace) -> None:
+    from .extract import parse_extract
+
+    parse_extract(
+        source=args.source,
+        workers=args.workers,
+        excel=args.excel,
+        delta=args.delta,
+        batch_size=args.batch_size,
+    )
+
+
+def cmd_harvest(args: argparse.Namespace) -> None:
+    from .harvester import harvest
+
+    targets = list(args.target or [])
+    if args.targets_file:
+        targets += load_targets(args.targets_file)
+    harvest(
+        targets=targets,
+        workers=args.workers,
+        rate=args.rate,
+        max_calls=args.max_calls,
+        resume=args.resume,
+        refresh_older_than=args.refresh_older_than,
+        cache_max_mb=args.cache_max_mb,
+        use_cache=not args.no_cache,
+        base_url=args.base_url,
+        output_root=args.output_root,
+        plan=not args.no_plan,
+        full_window=args.full_window,
+        overlap_days=args.overlap_days,
+        recheck=args.recheck,
+        search_first=args.search_first,
+    )
+
+
+def cmd_merge(args: argparse.Namespace) -> None:
+    from .merge_ivl import merge
+
+    merge(harvest_dir=args.harvest, entities=args.entities, warehouse=args.warehouse)
+
+
+def cmd_warehouse(args: argparse.Namespace) -> None:
+    import pandas as pd
+
+    from .ivl_warehouse import connect, ingest_all, naics_rollup, notice_rollup, vendor_rollup
+
+    con = connect(args.db)
+    try:
+        # ───────── Ingest ─────────
+        done = ingest_all(con, args.harvest_root, force=args.force)
+        for run, n_notices, n_ivl in done:
+            print(f"Ingested {run}: {n_notices} notices, {n_ivl} IVL rows")
+        totals = con.execute(
+            "SELECT (SELECT COUNT(*) FROM runs), (SELECT COUNT(*) FROM notices), "
+            "(SELECT COUNT(*) FROM ivl), (SELECT COUNT(DISTINCT vendor_key) FROM ivl)"
+        ).fetchone()
+        print(
+            f"Warehouse: {totals[0]} runs, {totals[1]} notices, {totals[2]} IVL rows, "
+            f"{totals[3]} vendors ({len(done)} run(s) ingested now)"
+        )
+        if args.query == "ingest":
+            return
+
+        # ───────── Rollups ─────────
+        if args.query == "vendors":
+            df = vendor_rollup(con, args.since, args.top)
+        elif args.query == "notices":
+            df = notice_rollup(con, args.since, args.top)
+        else:
+            index = args.entities or newest_entity_store(ENTITY_ROOT, suffixes=("sqlite",))
+            if index is None:
+                raise FileNotFoundError(
+                    "No formatted_entities_*.sqlite under data/entity/*/ — run step 0 first."
+                )
+            print("Entity index:", display_path(index))
+            df = naics_rollup(con, index, args.since, args.top)
+    finally:
+        con.close()
+
+    with pd.option_context("display.width", 200, "display.max_colwidth", 40):
+        print(df.to_string(index=False) if not df.empty else "(no rows)")
+    if args.csv:
+        df.to_csv(args.csv, index=False)
+        print("Saved →", args.csv)
+
+
+def cmd_pipeline(args: argparse.Namespace) -> None:
+    from .pipeline import run_pipeline
+
+    run_pipeline(
+        harvest=args.harvest,
+        warehouse=not args.no_warehouse,
+        force=args.force,
+        step0_args=args.step0_args,
+        step1_args=args.step1_args,
+        step2_args=args.step2_args,
+    )
+
+
+def cmd_icontact(args: argparse.Namespace) -> None:
+    from .icontact_sync import sync
+
+    sync(
+        workbooks=args.workbooks,
+        list_id=args.list_id,
+        state_path=args.state,
+        harvest_root=args.harvest_root,
+        base_url=args.base_url,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        rate=args.rate,
+        retries=args.retries,
+        force=args.force,
+        dry_run=args.dry_run,
+    )
+
+
+def cmd_eventbrite(args: argparse.Namespace) -> None:
+    from .attendee_match import match
+    from .eventbrite_ingest import ingest
+    from .instrument import RunRecorder
+
+    rec = RunRecorder("eventbrite")
+    counts = None
+    if not args.no_ingest:
+        counts = ingest(
+            db=args.db,
+            org_id=args.org,
+            event_ids=args.event,
+            since=args.since,
+            base_url=args.base_url,
+            workers=args.workers,
+            rate=args.rate,
+            retries=args.retries,
+            full=args.full,
+            rec=rec,
+        )
+    match(
+        db=args.db,
+        entities=args.entities,
+        warehouse=args.warehouse,
+        excel=args.excel,
+        rec=rec,
+        ingested=counts,
+    )
+
+
+# ───────── Parser ─────────
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="usdlf", description="SAM entity and IVL contact harvesting workflow."
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        metavar="FILE",
+        help="cProfile the command and save the stats to FILE (pstats format)",
+    )
+    sub = parser.add_subparsers(dest="command", required=True, metavar="COMMAND")
+
+    # ───────── Step 0 ─────────
+    p = sub.add_parser("format", help="Step 0: format the monthly SAM extract")
+    p.add_argument(
+        "source",
+        nargs="?",
+        type=Path,
+        help="Extract .dat/.zip to format (default: newest under data/entity/*/)",
+    )
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Parser processes (1 = serial, 0 = all cores)",
+    )
+    p.add_argument(
+        "--excel",
+        action="store_true",
+        help="Also export formatted_entities_<date>.xlsx (streamed; split into "
+        "several sheets past Excel's row limit)",
+    )
+    p.add_argument(
+        "--delta",
+        action="store_true",
+        help="Reuse unchanged records from the previous month and write a changes report",
+    )
+    p.add_argument(
+        "--batch-size",
+        type=int,
+        default=0,
+        metavar="ROWS",
+        help="Stream records to the store in batches of ROWS (bounded memory; "
+        "peak use is roughly 4×ROWS records, plus two chunks per worker)",
+    )
+    p.set_defaults(func=cmd_format)
+
+    # ───────── Step 1 ─────────
+    p = sub.add_parser("harvest", help="Step 1: harvest DoD IVL rosters from SAM.gov")
+    p.add_argument("--workers", type=int, default=1, help="Concurrent IVL requests (default 1)")
+    p.add_argument(
+        "--rate",
+        type=float,
+        default=RATE_PER_SEC,
+        help=f"Max API calls per second across all workers (default {RATE_PER_SEC})",
+    )
+    p.add_argument(
+        "--max-calls",
+        type=int,
+        default=DAILY_CALL_CAP,
+        help=f"Hard cap on API calls for this run (default {DAILY_CALL_CAP})",
+    )
+    p.add_argument(
+        "--resume",
+        type=Path,
+        metavar="RUN_DIR",
+        help="Continue a stopped *_harvest run from its checkpoint.json "
+        "(its targets are reused)",
+    )
+    p.add_argument(
+        "--target",
+        type=parse_target,
+        action="append",
+        metavar="PTYPE[:ORG[:WEIGHT]]",
+        help=f"Notice type / org to harvest, repeatable (default {PTYPE}:{ORG_CODE})",
+    )
+    p.add_argument(
+        "--targets-file",
+        type=Path,
+        help='JSON list of targets, e.g. ["p:097", {"ptype": "r", "weight": 2}]',
+    )
+    p.add_argument(
+        "--refresh-older-than",
+        type=parse_age,
+        metavar="AGE",
+        help="Re-fetch cached responses older than AGE (e.g. 12h, 3d)",
+    )
+    p.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=DEFAULT_MAX_BYTES // 1024**2,
+        help=f"Evict least-recently-used cache entries above this size "
+        f"(default {DEFAULT_MAX_BYTES // 1024**2})",
+    )
+    p.add_argument("--no-cache", action="store_true", help="Always hit the API")
+    p.add_argument(
+        "--base-url",
+        default=API_BASE,
+        help=f"Opportunities API root (default {API_BASE}; "
+        "point at bench/mock_sam_api.py for offline runs)",
+    )
+    p.add_argument(
+        "--output-root",
+        type=Path,
+        default=HARVEST_ROOT,
+        help="Folder that holds the YYYYMM/*_harvest runs (default data/harvests)",
+    )
+    p.add_argument(
+        "--no-plan",
+        action="store_true",
+        help="Fetch IVLs in search order instead of by expected yield",
+    )
+    p.add_argument(
+        "--search-first",
+        action="store_true",
+        help="Search the whole window before the first IVL (plans across all pages "
+        "instead of overlapping search with IVL fetches)",
+    )
+    p.add_argument(
+        "--full-window",
+        action="store_true",
+        help=f"Search the whole {LOOKBACK_DAYS}-day look-back instead of from the "
+        "last high-water mark",
+    )
+    p.add_argument(
+        "--overlap-days",
+        type=int,
+        default=SEARCH_OVERLAP_DAYS,
+        help=f"Days before the high-water mark searched again for late postings "
+        f"(default {SEARCH_OVERLAP_DAYS})",
+    )
+    p.add_argument(
+        "--recheck",
+        choices=["auto", "always", "never"],
+        default="auto",
+        help=f"Re-fetch IVLs of still-open notices (auto = every {RECHECK_EVERY_DAYS} days)",
+    )
+    p.set_defaults(func=cmd_harvest)
+
+    # ───────── Step 2 ─────────
+    p = sub.add_parser("merge", help="Step 2: merge an IVL roster with SAM entity data")
+    p.add_argument("--harvest", type=Path, help="Path to a specific *_harvest dir (optional)")
+    p.add_argument(
+        "--entities",
+        type=Path,
+        help="Specific formatted_entities_*.sqlite/.parquet/.xlsx store (optional)",
+    )
+    p.add_argument(
+        "--warehouse",
+        type=Path,
+        default=WAREHOUSE,
+        help="Warehouse consulted for notices missing from the run's all_notices.csv "
+        "(default data/warehouse/ivl_warehouse.sqlite; skipped if absent)",
+    )
+    p.set_defaults(func=cmd_merge)
+
+    # ───────── Step 3 ─────────
+    p = sub.add_parser("warehouse", help="Step 3: cross-run IVL warehouse")
+    p.add_argument(
+        "query",
+        nargs="?",
+        default="ingest",
+        choices=["ingest", "vendors", "notices", "naics"],
+    )
+    p.add_argument("--db", type=Path, default=WAREHOUSE, help="Warehouse file")
+    p.add_argument(
+        "--harvest-root", type=Path, default=HARVEST_ROOT, help="Where *_harvest runs live"
+    )
+    p.add_argument("--force", action="store_true", help="Re-ingest every run")
+    p.add_argument("--since", help="Only notices posted on/after YYYY-MM-DD")
+    p.add_argument("--top", type=int, default=50, help="Rows to show (default 50)")
+    p.add_argument("--entities", type=Path, help="Entity .sqlite for the NAICS rollup")
+    p.add_argument("--csv", type=Path, help="Also write the rollup to this CSV")
+    p.set_defaults(func=cmd_warehouse)
+
+    # ───────── Pipeline ─────────
+    p = sub.add_parser("pipeline", help="Run steps 0→1→2→3, skipping what is up to date")
+    p.add_argument("--harvest", action="store_true", help="Run a new IVL harvest (step 1) too")
+    p.add_argument(
+        "--no-warehouse", action="store_true", help="Skip the step 3 warehouse ingest"
+    )
+    p.add_argument(
+        "--force",
+        action="append",
+        default=[],
+        choices=[*STAGES, "all"],
+        help="Re-run a stage even if it is up to date (repeatable)",
+    )
+    p.add_argument("--step0-args", default="", help='Extra format args, e.g. "--workers 0"')
+    p.add_argument("--step1-args", default="", help="Extra harvest args")
+    p.add_argument("--step2-args", default="", help="Extra merge args")
+    p.set_defaults(func=cmd_pipeline)
+
+    # ───────── Step 4 ─────────
+    p = sub.add_parser("icontact", help="Step 4: sync curated vendors to iContact")
+    p.add_argument(
+        "workbooks",
+        nargs="*",
+        type=Path,
+        metavar="WORKBOOK",
+        help="Curated *_curated_ivl_contacts.xlsx to sync (default: the newest run's)",
+    )
+    p.add_argument(
+        "--list-id",
+        default=os.environ.get("ICONTACT_LIST_ID"),
+        help="iContact list to subscribe the contacts to (default $ICONTACT_LIST_ID; "
+        "none = contacts only)",
+    )
+    p.add_argument(
+        "--state", type=Path, default=ICONTACT_STATE, help="Contact-hash state file"
+    )
+    p.add_argument(
+        "--harvest-root", type=Path, default=HARVEST_ROOT, help="Where *_harvest runs live"
+    )
+    p.add_argument(
+        "--base-url",
+        default=ICONTACT_BASE,
+        help=f"iContact API root (default {ICONTACT_BASE}; "
+        "point at bench/mock_icontact_api.py for offline runs)",
+    )
+    p.add_argument(
+        "--batch-size",
+        type=int,
+        default=ICONTACT_BATCH,
+        help=f"Contacts / subscriptions per call (default {ICONTACT_BATCH})",
+    )
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=ICONTACT_WORKERS,
+        help=f"Batches in flight at once (default {ICONTACT_WORKERS})",
+    )
+    p.add_argument(
+        "--rate",
+        type=float,
+        default=ICONTACT_RATE_PER_SEC,
+        help=f"Max calls per second across all workers (default {ICONTACT_RATE_PER_SEC})",
+    )
+    p.add_argument(
+        "--retries",
+        type=int,
+        default=ICONTACT_RETRIES,
+        help=f"Retries per batch on 429 / 5xx / connection errors (default {ICONTACT_RETRIES})",
+    )
+    p.add_argument(
+        "--force", action="store_true", help="Send every contact, changed or not"
+    )
+    p.add_argument(
+        "--dry-run", action="store_true", help="Only count new / changed contacts"
+    )
+    p.set_defaults(func=cmd_icontact)
+
+    # ───────── Step 5 ─────────
+    p = sub.add_parser(
+        "eventbrite", help="Step 5: ingest Eventbrite attendees and match them to entities"
+    )
+    p.add_argument(
+        "--org", help="Eventbrite organization ID (default $EVENTBRITE_ORG_ID, else the first)"
+    )
+    p.add_argument(
+        "--event",
+        action="append",
+        metavar="ID",
+        help="Only sync this event (repeatable; default: all of the organization's)",
+    )
+    p.add_argument("--since", metavar="YYYY-MM-DD", help="Only events starting on or after")
+    p.add_argument(
+        "--db", type=Path, default=EVENTBRITE_DB, help="Attendee store (SQLite)"
+    )
+    p.add_argument(
+        "--base-url",
+        default=EVENTBRITE_BASE,
+        help=f"Eventbrite API root (default {EVENTBRITE_BASE}; "
+        "point at bench/mock_eventbrite_api.py for offline runs)",
+    )
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=EVENTBRITE_WORKERS,
+        help=f"Events paged at once (default {EVENTBRITE_WORKERS})",
+    )
+    p.add_argument(
+        "--rate",
+        type=float,
+        default=EVENTBRITE_RATE_PER_SEC,
+        help=f"Max calls per second across all workers (default {EVENTBRITE_RATE_PER_SEC})",
+    )
+    p.add_argument(
+        "--retries",
+        type=int,
+        default=EVENTBRITE_RETRIES,
+        help=f"Retries per page on 429 / 5xx / connection errors (default {EVENTBRITE_RETRIES})",
+    )
+    p.add_argument(
+        "--full", action="store_true", help="Re-fetch every attendee, changed or not"
+    )
+    p.add_argument(
+        "--no-ingest", action="store_true", help="Only re-match the stored attendees"
+    )
+    p.add_argument(
+        "--entities",
+        type=Path,
+        help="formatted_entities_* store (default: newest under data/entity/*/)",
+    )
+    p.add_argument(
+        "--warehouse", type=Path, default=WAREHOUSE, help="IVL warehouse for IVL history"
+    )
+    p.add_argument(
+        "--excel", action="store_true", help="Also write attendee_matches.xlsx"
+    )
+    p.set_defaults(func=cmd_eventbrite)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    from .instrument import profiled
+
+    try:
+        with profiled(args.profile):
+            args.func(args)
+    except (InputError, FileNotFoundError) as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    return 0
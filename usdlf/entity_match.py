@@ -0,0 +1,59 @@
+"""
+Resolve IVL vendor rows to SAM entity rows: UEI first, CAGE as fallback.
+
+For each key, the distinct IVL keys are hashed once and the entity column
+is probed against them (pyarrow  index_in ), which maps all IVL rows to
+entity positions at once; the entity columns are then gathered a single
+time.  The result has exactly one row per IVL row, in IVL order, plus a
+Match Key  column ("UEI", "CAGE" or "" when neither matched).
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+MATCH_KEYS = (("UEI", "ueiSAM"), ("CAGE", "cage"))
+
+
+def key_positions(ent_keys: pd.Series, lookups: pd.Series) -> np.ndarray:
+    """
+    Entity row position for every lookup value (-1 = not found); the first
+    entity row wins when a key repeats.  The hash table is built over the
+    distinct lookup keys (an IVL is small next to the extract) and the
+    entity column is probed against it once.
+    """
+    wanted = pa.array(lookups.dropna().unique(), type=pa.string())
+    wanted = pc.filter(wanted, pc.not_equal(wanted, ""))
+    if len(wanted) == 0:  # only blank lookups: nothing can match
+        return np.full(len(lookups), -1, dtype=np.int64)
+    # entity row → slot in wanted (-1 = not an IVL key)
+    slot = pc.index_in(pa.array(ent_keys, type=pa.string()), value_set=wanted)
+    slot = pc.fill_null(slot, -1).to_numpy(zero_copy_only=False)
+    rows = np.flatnonzero(slot >= 0)
+    keys, first_at = np.unique(slot[rows], return_index=True)  # rows are sorted
+    first = np.full(len(wanted), -1, dtype=np.int64)
+    first[keys] = rows[first_at]
+    ask = pc.index_in(pa.array(lookups, type=pa.string()), value_set=wanted)
+    ask = pc.fill_null(ask, -1).to_numpy(zero_copy_only=False)
+    return np.where(ask >= 0, first[np.maximum(ask, 0)], -1)
+
+
+def match_entities(ivl: pd.DataFrame, ent: pd.DataFrame) -> pd.DataFrame:
+    """IVL columns + entity columns + Match Key; unmatched rows get NaN."""
+    pos = np.full(len(ivl), -1, dtype=np.int64)
+    match_key = np.full(len(ivl), "", dtype=object)
+    for ent_col, ivl_col in MATCH_KEYS:
+        todo = pos < 0
+        if not todo.any():
+            break
+        found = key_positions(ent[ent_col], ivl.loc[todo, ivl_col])
+        pos[todo] = found
+        match_key[np.flatnonzero(todo)[found >= 0]] = ent_col
+
+    gathered = ent.reset_index(drop=True).reindex(pos).reset_index(drop=True)
+    merged = pd.concat([ivl.reset_index(drop=True), gathered], axis=1)
+    merged["Match Key"] = match_key
+    return merged
@@ -0,0 +1,381 @@
+"""
+Step 5 — pull Eventbrite events and attendees into a local SQLite store
+(data/eventbrite/eventbrite.sqlite) for matching against SAM entities
+(attendee_match.py).
+
+    events          one row per event of the organization
+    attendees       one row per attendee (profile e-mail, company, status…)
+    event_sync      per event: the latest attendee  changed  time seen, when
+                    it was synced, pages and attendees fetched
+
+ingest() lists the organization's events (continuation-token pages), then
+pages through the attendees of several events at once (--workers) over one
+pooled session and token-bucket rate (--rate calls/s).  Each event's pages
+follow its own continuation token, so they are fetched in order; the
+events run side by side.  A later sync asks only for attendees
+changed_since  the event's last  changed  time, and skips events that had
+ended more than EVENTBRITE_SETTLE_DAYS (late check-ins, refunds) before
+they were last synced (full=True fetches everything).
+Rows are upserted, so overlapping pages are harmless; an event whose pages
+fail is retried on the next sync from its old  changed_since .  429 / 5xx
+are retried with back-off (http_retry.py); 401 stops the sync.
+
+The token comes from  $EVENTBRITE_TOKEN  (.env is honoured), as in
+eventbrite/test.py; bench/mock_eventbrite_api.py stands in offline.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import requests
+
+from .http_retry import Retrying, TokenBucket
+from .instrument import HttpStats, RunRecorder
+from .paths import EVENTBRITE_DB, InputError, display_path
+from .settings import (
+    EVENTBRITE_BASE,
+    EVENTBRITE_RATE_PER_SEC,
+    EVENTBRITE_RETRIES,
+    EVENTBRITE_SETTLE_DAYS,
+    EVENTBRITE_WORKERS,
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    event_id     TEXT PRIMARY KEY,
+    org_id       TEXT,
+    name         TEXT,
+    start_utc    TEXT,
+    end_utc      TEXT,
+    status       TEXT,
+    changed      TEXT,
+    url          TEXT
+);
+CREATE TABLE IF NOT EXISTS attendees (
+    attendee_id  TEXT PRIMARY KEY,
+    event_id     TEXT NOT NULL,
+    order_id     TEXT,
+    email        TEXT,
+    first_name   TEXT,
+    last_name    TEXT,
+    company      TEXT,
+    job_title    TEXT,
+    phone        TEXT,
+    ticket_class TEXT,
+    status       TEXT,
+    cancelled    INTEGER,
+    refunded     INTEGER,
+    checked_in   INTEGER,
+    created      TEXT,
+    changed      TEXT
+);
+CREATE TABLE IF NOT EXISTS event_sync (
+    event_id      TEXT PRIMARY KEY,
+    changed_since TEXT,
+    synced_at     TEXT NOT NULL,
+    pages         INTEGER NOT NULL,
+    attendees     INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_attendees_event ON attendees(event_id);
+CREATE INDEX IF NOT EXISTS idx_attendees_email ON attendees(email);
+"""
+
+EVENT_COLUMNS = [
+    "event_id",
+    "org_id",
+    "name",
+    "start_utc",
+    "end_utc",
+    "status",
+    "changed",
+    "url",
+]
+ATTENDEE_COLUMNS = [
+    "attendee_id",
+    "event_id",
+    "order_id",
+    "email",
+    "first_name",
+    "last_name",
+    "company",
+    "job_title",
+    "phone",
+    "ticket_class",
+    "status",
+    "cancelled",
+    "refunded",
+    "checked_in",
+    "created",
+    "changed",
+]
+
+
+def _upsert(table: str, columns: List[str]) -> str:
+    return (
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+        f"ON CONFLICT({columns[0]}) DO UPDATE SET "
+        + ", ".join(f"{c} = excluded.{c}" for c in columns[1:])
+    )
+
+
+UPSERT_EVENT = _upsert("events", EVENT_COLUMNS)
+UPSERT_ATTENDEE = _upsert("attendees", ATTENDEE_COLUMNS)
+
+
+def connect(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    con = sqlite3.connect(str(path))
+    con.execute("PRAGMA journal_mode=WAL")
+    con.executescript(SCHEMA)
+    return con
+
+
+def utc_stamp(t: dt.datetime) -> str:
+    return t.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def utc_now() -> str:
+    return utc_stamp(dt.datetime.now(dt.timezone.utc))
+
+
+def settled_before(synced_at: str) -> str:
+    """Events ending before this had settled when  synced_at  ran."""
+    t = dt.datetime.strptime(synced_at, "%Y-%m-%dT%H:%M:%SZ")
+    return utc_stamp(t - dt.timedelta(days=EVENTBRITE_SETTLE_DAYS))
+
+
+# ───────── API rows → store rows ─────────
+
+
+def event_row(e: Dict, org_id: str) -> Tuple:
+    return (
+        str(e["id"]),
+        org_id,
+        (e.get("name") or {}).get("text"),
+        (e.get("start") or {}).get("utc"),
+        (e.get("end") or {}).get("utc"),
+        e.get("status"),
+        e.get("changed"),
+        e.get("url"),
+    )
+
+
+def attendee_row(a: Dict, event_id: str) -> Tuple:
+    p = a.get("profile") or {}
+    email = (p.get("email") or "").strip().lower() or None
+    return (
+        str(a["id"]),
+        str(a.get("event_id") or event_id),
+        a.get("order_id"),
+        email,
+        p.get("first_name"),
+        p.get("last_name"),
+        p.get("company"),
+        p.get("job_title"),
+        p.get("work_phone") or p.get("cell_phone"),
+        a.get("ticket_class_name"),
+        a.get("status"),
+        int(bool(a.get("cancelled"))),
+        int(bool(a.get("refunded"))),
+        int(bool(a.get("checked_in"))),
+        a.get("created"),
+        a.get("changed"),
+    )
+
+
+# ───────── HTTP ─────────
+
+
+class EventbriteClient:
+    """Pooled session with the bearer token, shared rate limiter and retries."""
+
+    def __init__(self, base: str, token: str, workers: int, rate: float, retries: int):
+        self.base = base.rstrip("/")
+        self.session = requests.Session()
+        self.session.headers["Authorization"] = f"Bearer {token}"
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=max(workers, 4))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.http = HttpStats()
+        self.retrying = Retrying(TokenBucket(rate), self.http, retries)
+
+    def get(self, path: str, endpoint: str, params: Optional[Dict] = None) -> Dict:
+        resp = self.retrying.send(
+            self.session, "GET", f"{self.base}/{path}", endpoint, params=params, timeout=60
+        )
+        if resp.status_code == 401:
+            raise InputError("Eventbrite refused the token (401) — check EVENTBRITE_TOKEN.")
+        resp.raise_for_status()
+        return resp.json()
+
+    def pages(
+        self, path: str, key: str, endpoint: str, params: Optional[Dict] = None
+    ) -> Iterator[List[Dict]]:
+        """Items of every page, following the continuation token."""
+        params = dict(params or {})
+        while True:
+            body = self.get(path, endpoint, params)
+            yield body.get(key, [])
+            page = body.get("pagination") or {}
+            if not page.get("has_more_items") or not page.get("continuation"):
+                return
+            params["continuation"] = page["continuation"]
+
+
+def fetch_attendees(
+    client: EventbriteClient, event_id: str, changed_since: Optional[str]
+) -> Tuple[List[Tuple], int, Optional[str]]:
+    """(attendee rows, pages, latest  changed ) for one event."""
+    params = {"changed_since": changed_since} if changed_since else {}
+    rows: List[Tuple] = []
+    pages = 0
+    latest = changed_since
+    for items in client.pages(f"events/{event_id}/attendees/", "attendees", "attendees", params):
+        pages += 1
+        for a in items:
+            row = attendee_row(a, event_id)
+            rows.append(row)
+            if row[-1] and (latest is None or row[-1] > latest):
+                latest = row[-1]
+    return rows, pages, latest
+
+
+# ───────── Entry point ─────────
+
+
+def token_from_env() -> str:
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    token = os.getenv("EVENTBRITE_TOKEN")
+    if not token:
+        raise InputError("Set EVENTBRITE_TOKEN (env or .env) for Eventbrite.")
+    return token
+
+
+def ingest(
+    db: Path = EVENTBRITE_DB,
+    org_id: Optional[str] = None,
+    event_ids: Optional[Sequence[str]] = None,
+    since: Optional[str] = None,
+    base_url: str = EVENTBRITE_BASE,
+    workers: int = EVENTBRITE_WORKERS,
+    rate: float = EVENTBRITE_RATE_PER_SEC,
+    retries: int = EVENTBRITE_RETRIES,
+    full: bool = False,
+    token: Optional[str] = None,
+    rec: Optional[RunRecorder] = None,
+) -> Dict[str, object]:
+    """
+    Sync the organization's events (org_id default: $EVENTBRITE_ORG_ID, else
+    the token's first organization) and their attendees into  db .
+    event_ids  limits the sync to those events, since (YYYY-MM-DD) to events
+    starting on or after it.  Returns counts and the HTTP stats.
+    """
+    token = token or token_from_env()
+    rec = rec or RunRecorder("eventbrite")
+    client = EventbriteClient(base_url, token, workers, rate, retries)
+    org_id = org_id or os.getenv("EVENTBRITE_ORG_ID")
+    if not org_id:
+        orgs = client.get("users/me/organizations/", "organizations").get("organizations", [])
+        if not orgs:
+            raise InputError("The Eventbrite token has no organization; pass --org.")
+        org_id = str(orgs[0]["id"])
+    print("Organization         :", org_id)
+
+    con = connect(db)
+    try:
+        # ───────── Events ─────────
+        with rec.stage("events") as st:
+            events = [
+                e
+                for page in client.pages(
+                    f"organizations/{org_id}/events/", "events", "events", {"status": "all"}
+                )
+                for e in page
+            ]
+            with con:
+                con.executemany(UPSERT_EVENT, [event_row(e, org_id) for e in events])
+            st.rows = len(events)
+        wanted = {str(e) for e in event_ids or []}
+        events = [
+            e
+            for e in events
+            if (not wanted or str(e["id"]) in wanted)
+            and (not since or ((e.get("start") or {}).get("utc") or "") >= since)
+        ]
+        synced = {
+            eid: (changed_since, synced_at)
+            for eid, changed_since, synced_at in con.execute(
+                "SELECT event_id, changed_since, synced_at FROM event_sync"
+            )
+        }
+        todo, closed = [], 0
+        for e in events:
+            eid = str(e["id"])
+            changed_since, synced_at = synced.get(eid, (None, None))
+            end = (e.get("end") or {}).get("utc")
+            if not full and synced_at and end and end < settled_before(synced_at):
+                closed += 1  # settled before the last sync: its list is final
+                continue
+            todo.append((eid, None if full else changed_since))
+        print(
+            f"Events               : {len(events)} selected, {len(todo)} to sync, "
+            f"{closed} settled at their last sync"
+        )
+
+        # ───────── Attendees ─────────
+        attendees = pages = failed = 0
+        with rec.stage("attendees") as st, ThreadPoolExecutor(max_workers=workers) as pool:
+            started = utc_now()
+            futures = {
+                pool.submit(fetch_attendees, client, eid, since_): eid for eid, since_ in todo
+            }
+            for fut in as_completed(futures):
+                eid = futures[fut]
+                try:
+                    rows, n_pages, latest = fut.result()
+                except requests.RequestException as exc:
+                    failed += 1
+                    print(f"  event {eid} failed: {exc}")
+                    continue
+                except InputError:
+                    for other in futures:
+                        other.cancel()
+                    raise
+                with con:  # one transaction per event
+                    con.executemany(UPSERT_ATTENDEE, rows)
+                    con.execute(
+                        "INSERT OR REPLACE INTO event_sync VALUES (?, ?, ?, ?, ?)",
+                        (eid, latest, started, n_pages, len(rows)),
+                    )
+                attendees += len(rows)
+                pages += n_pages
+            st.rows = attendees
+            st.extra.update(events=len(todo), pages=pages, failed_events=failed)
+        total = con.execute("SELECT COUNT(*) FROM attendees").fetchone()[0]
+    finally:
+        con.close()
+    print(
+        f"Attendees            : {attendees} new or changed over {pages} pages "
+        f"({failed} event(s) failed, retried calls {client.retrying.retried}); "
+        f"{total} in {display_path(db)}"
+    )
+    return {
+        "org_id": org_id,
+        "events": len(events),
+        "events_synced": len(todo) - failed,
+        "events_closed": closed,
+        "events_failed": failed,
+        "attendees_fetched": attendees,
+        "attendees_total": total,
+        "pages": pages,
+        "retried_calls": client.retrying.retried,
+        "http": client.http.report(),
+    }
@@ -0,0 +1,759 @@
+"""
+Step 0 — format the monthly SAM public extract.
+
+parse_extract() reads the newest extract in  data/entity/<YYYYMM>/  (a  .zip
+is stream-decompressed straight into the parser — nothing is extracted to
+disk) and produces  formatted_entities_<YYYYMMDD>.parquet  in that same
+folder (plus a streamed  .xlsx  with  excel=True), together with
+formatted_entities_<YYYYMMDD>.sqlite  — a UEI/CAGE-indexed copy that step 2
+queries for just the vendors it needs.
+
+workers=N  parses the .dat in N processes (0 = all cores).  The file is split
+into byte ranges aligned to record boundaries and the parsed chunks are
+merged back in file order, so the output matches the serial run.
+
+delta=True  diffs against the previous month's Parquet store: records are
+keyed by UEI with a per-row content hash, unchanged rows reuse last month's
+formatted record (no contact re-extraction), and  entity_changes_<YYYYMMDD>.csv
+lists added, expired and changed-contact entities.
+"""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import io
+import os
+import re
+import sqlite3
+import sys
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .paths import ENTITY_ROOT, EXTRACT_RE, InputError, display_path, newest_extract
+from .instrument import RunRecorder
+from .sam_contacts import extract_contacts
+from .xlsx_export import describe, write_workbook
+
+# Parallel parsing: target bytes per chunk (a few chunks per worker keeps the
+# pool busy when some ranges are denser than others)
+CHUNK_BYTES = 32 * 1024 * 1024
+# Zip streaming: read-ahead buffer over the decompressor, and rows per batch
+# handed to the pool when --workers > 1
+ZIP_BUFFER_BYTES = 16 * 1024 * 1024
+ZIP_BATCH_ROWS = 20_000
+
+# Low-cardinality columns stored dictionary-encoded in the Parquet store
+CATEGORY_COLUMNS = ["Status", "STATE", "ENTITY_STRUCTURE", "Has Email", "Has Phone"]
+
+# ───────── Increase CSV field limit ─────────
+csv.field_size_limit(sys.maxsize)
+
+# Column map
+COLUMN_MAPPINGS = {
+    0: "UEI",
+    3: "CAGE_CODE",
+    5: "SAM_STATUS",
+    6: "PURPOSE_OF_REG",
+    11: "LEGAL_NAME",
+    12: "DBA_NAME",
+    15: "STREET_ADDRESS",
+    17: "CITY",
+    18: "STATE",
+    19: "ZIP_CODE",
+    21: "COUNTRY",
+    22: "CONGRESSIONAL_DISTRICT",
+    26: "WEBSITE_OR_EMAIL",
+    27: "ENTITY_STRUCTURE",
+    30: "BUSINESS_TYPE_COUNTER",
+    31: "BUSINESS_TYPE_CODES",
+    32: "PRIMARY_NAICS",
+    33: "NAICS_CODE_COUNTER",
+    34: "NAICS_CODE_STRING",
+    37: "CREDIT_CARD_USAGE",
+    39: "MAILING_ADDRESS",
+    41: "MAILING_CITY",
+    42: "MAILING_ZIP",
+    45: "MAILING_STATE",
+    46: "GOVT_POC_FIRST_NAME",
+    47: "GOVT_POC_MIDDLE",
+    48: "GOVT_POC_LAST_NAME",
+    57: "ALT_POC_FIRST_NAME",
+    58: "ALT_POC_MIDDLE",
+    59: "ALT_POC_LAST_NAME",
+    112: "NAICS_EXCEPTION_COUNTER",
+    113: "NAICS_EXCEPTION_STRING",
+}
+
+# Output column order and display names
+OUTPUT_ORDER = [
+    "UEI",
+    "CAGE_CODE",
+    "BUSINESS_NAME",
+    "STATUS",
+    "WEBSITE_OR_EMAIL",
+    "HAS_EMAIL",
+    "EMAIL_COUNT",
+    "HAS_PHONE",
+    "PHONE_COUNT",
+    "ALL_EMAILS",
+    "ALL_PHONES",
+    "GOVT_POC_FULL_NAME",
+    "ALT_POC_FULL_NAME",
+    "STREET_ADDRESS",
+    "CITY",
+    "STATE",
+    "ZIP_CODE",
+    "PRIMARY_NAICS",
+    "BUSINESS_TYPE_CODES",
+    "ENTITY_STRUCTURE",
+    "SAM_STATUS",
+    "PURPOSE_OF_REG",
+    "ROW_HASH",
+]
+OUTPUT_RENAME = {
+    "CAGE_CODE": "CAGE",
+    "BUSINESS_NAME": "Business Name",
+    "STATUS": "Status",
+    "WEBSITE_OR_EMAIL": "Website or Email",
+    "HAS_EMAIL": "Has Email",
+    "HAS_PHONE": "Has Phone",
+    "ALL_EMAILS": "Email Addresses",
+    "ALL_PHONES": "Phone Numbers",
+    "GOVT_POC_FULL_NAME": "Government POC Name",
+    "ALT_POC_FULL_NAME": "Alternate POC Name",
+    "ZIP_CODE": "ZIP",
+    "ROW_HASH": "Row Hash",
+}
+
+# ───────── Delta mode ─────────
+# UEI → row hash of the previous month's store; rows whose hash is unchanged
+# are not re-parsed and their formatted record is reused.
+_PREV_HASHES: Dict[str, str] = {}
+# seconds spent in extract_contacts() by this process since the last reset;
+# pool workers reset it per job and hand it back with their records
+_CONTACT_SECONDS = [0.0]
+
+
+def row_hash(row: List[str]) -> str:
+    return hashlib.blake2b("|".join(row).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def set_prev_hashes(hashes: Dict[str, str]) -> None:
+    global _PREV_HASHES
+    _PREV_HASHES = hashes
+
+
+def process_row(row: List[str]) -> Dict[str, object]:
+    """parse_row() plus the row hash; unchanged rows come back as a stub."""
+    h = row_hash(row)
+    uei = row[0].strip() if row else ""
+    if _PREV_HASHES and _PREV_HASHES.get(uei) == h:
+        return {"UEI": uei, "ROW_HASH": h, "_REUSE": True}
+    rec = parse_row(row)
+    rec["ROW_HASH"] = h
+    return rec
+
+
+def load_previous(
+    current_tag: str, entity_root: Path = ENTITY_ROOT
+) -> Tuple[Path | None, Dict[str, Dict[str, object]]]:
+    """Newest formatted store older than current_tag, as UEI → record."""
+    prev_pat = re.compile(r"formatted_entities_(\d{8})\.parquet$")
+    stores = [
+        (m.group(1), p)
+        for p in entity_root.glob("*/formatted_entities_*.parquet")
+        if (m := prev_pat.search(p.name)) and m.group(1) < current_tag
+    ]
+    if not stores:
+        return None, {}
+    _, path = max(stores)
+    prev = pd.read_parquet(path)
+    for col in prev.select_dtypes("category").columns:
+        prev[col] = prev[col].astype(object)
+    prev = prev.rename(columns={v: k for k, v in OUTPUT_RENAME.items()})
+    if "ROW_HASH" not in prev.columns:
+        prev["ROW_HASH"] = ""  # pre-delta store: everything counts as changed
+    records = {rec["UEI"]: rec for rec in prev.to_dict("records")}
+    return path, records
+
+
+REPORT_COLUMNS = [
+    "Change",
+    "UEI",
+    "CAGE",
+    "Business Name",
+    "Status",
+    "Has Email",
+    "Email Addresses",
+    "Has Phone",
+    "Phone Numbers",
+    "Previous Email Addresses",
+    "Previous Phone Numbers",
+]
+
+
+class ChangeTracker:
+    """
+    Swaps unchanged-row stubs for last month's records and collects added,
+    expired and changed-contact entities as the records stream past.
+    """
+
+    def __init__(self, prev: Dict[str, Dict[str, object]]):
+        self.prev = prev
+        self.rows: List[Dict[str, object]] = []
+        self.seen: set = set()
+        self.reused = 0
+
+    def _row(self, change, rec, old=None):
+        old = old or {}
+        self.rows.append(
+            dict(
+                zip(
+                    REPORT_COLUMNS,
+                    [
+                        change,
+                        rec.get("UEI", ""),
+                        rec.get("CAGE_CODE", ""),
+                        rec.get("BUSINESS_NAME", ""),
+                        rec.get("STATUS", ""),
+                        rec.get("HAS_EMAIL", ""),
+                        rec.get("ALL_EMAILS", ""),
+                        rec.get("HAS_PHONE", ""),
+                        rec.get("ALL_PHONES", ""),
+                        old.get("ALL_EMAILS", ""),
+                        old.get("ALL_PHONES", ""),
+                    ],
+                )
+            )
+        )
+
+    def resolve(self, rec: Dict[str, object]) -> Dict[str, object]:
+        uei = rec["UEI"]
+        self.seen.add(uei)
+        if rec.get("_REUSE"):
+            self.reused += 1
+            return self.prev[uei]
+        old = self.prev.get(uei)
+        if old is None:
+            self._row("added", rec)
+        elif rec["ROW_HASH"] != old["ROW_HASH"]:
+            if rec["STATUS"] == "Expired" and old["STATUS"] != "Expired":
+                self._row("expired", rec, old)
+            if (rec["ALL_EMAILS"], rec["ALL_PHONES"]) != (
+                old["ALL_EMAILS"],
+                old["ALL_PHONES"],
+            ):
+                self._row("changed_contact", rec, old)
+        return rec
+
+    def report(self) -> pd.DataFrame:
+        for uei, old in self.prev.items():
+            if uei not in self.seen:
+                self._row("expired", {**old, "STATUS": "Removed"}, old)
+        return pd.DataFrame(self.rows, columns=REPORT_COLUMNS)
+
+
+def parse_row(row: List[str]) -> Dict[str, object]:
+    """Map one raw pipe-delimited row to a formatted entity record."""
+    rec = {
+        name: (row[idx].strip() if idx < len(row) else "")
+        for idx, name in COLUMN_MAPPINGS.items()
+    }
+    rec["BUSINESS_NAME"] = rec["LEGAL_NAME"]
+    rec["BUSINESS_TYPE_CODES"] = (
+        rec["BUSINESS_TYPE_CODES"].replace("~", ", ")
+        if rec["BUSINESS_TYPE_CODES"]
+        else ""
+    )
+    rec["STATUS"] = {"A": "Active", "E": "Expired"}.get(
+        rec["SAM_STATUS"], rec["SAM_STATUS"]
+    )
+    # POC full names
+    rec["GOVT_POC_FULL_NAME"] = " ".join(
+        filter(
+            None,
+            [
+                rec.pop("GOVT_POC_FIRST_NAME"),
+                rec.pop("GOVT_POC_MIDDLE"),
+                rec.pop("GOVT_POC_LAST_NAME"),
+            ],
+        )
+    ).strip()
+    rec["ALT_POC_FULL_NAME"] = " ".join(
+        filter(
+            None,
+            [
+                rec.pop("ALT_POC_FIRST_NAME"),
+                rec.pop("ALT_POC_MIDDLE"),
+                rec.pop("ALT_POC_LAST_NAME"),
+            ],
+        )
+    ).strip()
+    # emails, phones
+    t0 = time.perf_counter()
+    ems, phs = extract_contacts(row)
+    _CONTACT_SECONDS[0] += time.perf_counter() - t0
+    rec.update(
+        {
+            "ALL_EMAILS": "; ".join(ems),
+            "EMAIL_COUNT": len(ems),
+            "HAS_EMAIL": "Yes" if ems else "No",
+            "ALL_PHONES": "; ".join(phs),
+            "PHONE_COUNT": len(phs),
+            "HAS_PHONE": "Yes" if phs else "No",
+        }
+    )
+    return rec
+
+
+# ───────── Serial / parallel parsing ─────────
+
+
+@contextmanager
+def open_extract(source: Path) -> Iterator[TextIO]:
+    """Text stream over a .dat, or over the .dat member of a .zip."""
+    if source.suffix != ".zip":
+        with open(source, "r", encoding="utf-8") as fh:
+            yield fh
+        return
+    with zipfile.ZipFile(source, "r") as zf:
+        member = [m for m in zf.namelist() if m.endswith(".dat")][0]
+        with zf.open(member) as raw:
+            buffered = io.BufferedReader(raw, buffer_size=ZIP_BUFFER_BYTES)
+            yield io.TextIOWrapper(buffered, encoding="utf-8")
+
+
+def iter_serial(source: Path) -> Iterator[Dict[str, object]]:
+    with open_extract(source) as fh:
+        reader = csv.reader(fh, delimiter="|")
+        next(reader)  # skip header
+        for i, row in enumerate(reader):
+            yield process_row(row)
+            if i % 10000 == 0:
+                print(f"  processed {i:,} rows …", end="\r", flush=True)
+    print()
+
+
+def chunk_bounds(dat_path: Path, n_chunks: int) -> List[Tuple[int, int]]:
+    """
+    Split the file body (everything after the header line) into roughly equal
+    byte ranges.  Every boundary sits just after a newline, so each range
+    holds whole records — the extract is one unquoted record per line.
+    """
+    size = dat_path.stat().st_size
+    bounds: List[Tuple[int, int]] = []
+    with open(dat_path, "rb") as fh:
+        fh.readline()  # skip header
+        pos = fh.tell()
+        step = max((size - pos) // max(n_chunks, 1), 1)
+        while pos < size:
+            target = pos + step
+            if target >= size:
+                end = size
+            else:
+                # back up one byte so a boundary landing exactly on a line
+                # start does not swallow that whole line
+                fh.seek(target - 1)
+                fh.readline()
+                end = fh.tell()
+            bounds.append((pos, end))
+            pos = end
+    return bounds
+
+
+def parse_chunk(job: Tuple[str, int, int]) -> Tuple[List[Dict[str, object]], float]:
+    _CONTACT_SECONDS[0] = 0.0
+    path, start, end = job
+    with open(path, "rb") as fh:
+        fh.seek(start)
+        data = fh.read(end - start)
+    # same universal-newline decoding as the serial text-mode reader
+    text = io.TextIOWrapper(io.BytesIO(data), encoding="utf-8")
+    records = [process_row(row) for row in csv.reader(text, delimiter="|")]
+    return records, _CONTACT_SECONDS[0]
+
+
+def parse_lines(lines: List[str]) -> Tuple[List[Dict[str, object]], float]:
+    _CONTACT_SECONDS[0] = 0.0
+    records = [process_row(row) for row in csv.reader(lines, delimiter="|")]
+    return records, _CONTACT_SECONDS[0]
+
+
+def iter_pool(fn, jobs: Iterable, workers: int) -> Iterator[Dict[str, object]]:
+    """
+    Run fn over jobs in a process pool and yield the records in job order.
+    At most two jobs per worker are in flight, so results never pile up
+    faster than the caller consumes them.  fn returns (records, seconds in
+    contact extraction); the seconds are added to this process's total.
+    """
+    pending: deque = deque()
+    done = 0
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=set_prev_hashes, initargs=(_PREV_HASHES,)
+    ) as pool:
+        for job in jobs:
+            pending.append(pool.submit(fn, job))
+            if len(pending) >= workers * 2:
+                chunk, contact_s = pending.popleft().result()
+                _CONTACT_SECONDS[0] += contact_s
+                done += len(chunk)
+                print(f"  processed {done:,} rows …", end="\r", flush=True)
+                yield from chunk
+        while pending:
+            chunk, contact_s = pending.popleft().result()
+            _CONTACT_SECONDS[0] += contact_s
+            done += len(chunk)
+            print(f"  processed {done:,} rows …", end="\r", flush=True)
+            yield from chunk
+    print()
+
+
+def zip_line_batches(source: Path) -> Iterator[List[str]]:
+    """
+    A compressed member cannot be split by byte offset, so the main process
+    decompresses and hands out batches of lines while the pool parses them.
+    """
+    with open_extract(source) as fh:
+        fh.readline()  # skip header
+        while True:
+            batch = [line for _, line in zip(range(ZIP_BATCH_ROWS), fh)]
+            if not batch:
+                return
+            yield batch
+
+
+def iter_records(source: Path, workers: int) -> Iterator[Dict[str, object]]:
+    """Formatted records in file order — serial, or across a process pool."""
+    if workers <= 1:
+        return iter_serial(source)
+    if source.suffix == ".zip":
+        return iter_pool(parse_lines, zip_line_batches(source), workers)
+    n_chunks = max(workers * 4, source.stat().st_size // CHUNK_BYTES)
+    jobs = [(str(source), s, e) for s, e in chunk_bounds(source, n_chunks)]
+    print(f"  {len(jobs)} chunks across {workers} workers")
+    return iter_pool(parse_chunk, jobs, workers)
+
+
+# ───────── UEI/CAGE lookup index ─────────
+
+
+def build_index(df: pd.DataFrame, path: Path) -> None:
+    """Write df to an SQLite table with UEI and CAGE indexes (atomic replace)."""
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.unlink(missing_ok=True)
+    con = sqlite3.connect(tmp)
+    try:
+        df.to_sql("entities", con, index=False, chunksize=50_000)
+        con.execute('CREATE INDEX idx_entities_uei ON entities ("UEI")')
+        con.execute('CREATE INDEX idx_entities_cage ON entities ("CAGE")')
+        con.commit()
+    finally:
+        con.close()
+    tmp.replace(path)
+
+
+# ───────── Streaming store (--batch-size) ─────────
+# Email-first order without a global sort: records go to one of four
+# Has Email / Has Phone buckets as they arrive, each bucket is spilled to its
+# own temporary Parquet file a batch at a time, and the buckets are then
+# copied into the final store (and index) in bucket order.
+BUCKETS = [("Yes", "Yes"), ("Yes", "No"), ("No", "Yes"), ("No", "No")]
+
+
+def to_frame(records: List[Dict[str, object]]) -> pd.DataFrame:
+    """Records → store frame: output columns, display names and dtypes."""
+    df = pd.DataFrame.from_records(records, columns=OUTPUT_ORDER)
+    df = df.rename(columns=OUTPUT_RENAME)
+    df["Has Email"] = df["Has Email"].fillna("No")
+    for col in ("EMAIL_COUNT", "PHONE_COUNT"):
+        df[col] = df[col].astype("int32")
+    for col in CATEGORY_COLUMNS:
+        df[col] = df[col].astype("category")
+    return df
+
+
+def store_schema() -> pa.Schema:
+    fields = []
+    for col in to_frame([]).columns:
+        if col in CATEGORY_COLUMNS:
+            fields.append(pa.field(col, pa.dictionary(pa.int32(), pa.string())))
+        elif col in ("EMAIL_COUNT", "PHONE_COUNT"):
+            fields.append(pa.field(col, pa.int32()))
+        else:
+            fields.append(pa.field(col, pa.string()))
+    return pa.schema(fields)
+
+
+class BucketedStoreWriter:
+    """Bounded-memory writer for the Parquet store and SQLite index."""
+
+    def __init__(self, out_path: Path, index_path: Path, batch_size: int):
+        self.out_path = out_path
+        self.index_path = index_path
+        self.batch_size = batch_size
+        self.schema = store_schema()
+        self.buffers: Dict[tuple, List[Dict[str, object]]] = {b: [] for b in BUCKETS}
+        self.parts = {
+            b: out_path.with_name(f"{out_path.stem}.bucket{i}.parquet.tmp")
+            for i, b in enumerate(BUCKETS)
+        }
+        self.writers: Dict[tuple, pq.ParquetWriter] = {}
+        self.rows = 0
+
+    def add(self, rec: Dict[str, object]) -> None:
+        key = (rec["HAS_EMAIL"] or "No", rec["HAS_PHONE"])
+        buf = self.buffers[key]
+        buf.append(rec)
+        self.rows += 1
+        if len(buf) >= self.batch_size:
+            self._spill(key)
+
+    def _spill(self, key: tuple) -> None:
+        buf = self.buffers[key]
+        if not buf:
+            return
+        table = pa.Table.from_pandas(to_frame(buf), schema=self.schema, preserve_index=False)
+        if key not in self.writers:
+            self.writers[key] = pq.ParquetWriter(
+                self.parts[key], table.schema, compression="zstd"
+            )
+        self.writers[key].write_table(table)
+        buf.clear()
+
+    def close(self) -> int:
+        """Flush the buckets, concatenate them into the store, return rows."""
+        for key in BUCKETS:
+            self._spill(key)
+            if key in self.writers:
+                self.writers.pop(key).close()
+
+        tmp_store = self.out_path.with_name(self.out_path.name + ".tmp")
+        tmp_index = self.index_path.with_name(self.index_path.name + ".tmp")
+        tmp_index.unlink(missing_ok=True)
+        con = sqlite3.connect(tmp_index)
+        writer = None
+        try:
+            for key in BUCKETS:
+                part = self.parts[key]
+                if not part.exists():
+                    continue
+                for batch in pq.ParquetFile(part).iter_batches(self.batch_size):
+                    table = pa.Table.from_batches([batch])
+                    if writer is None:
+                        writer = pq.ParquetWriter(tmp_store, table.schema, compression="zstd")
+                    writer.write_table(table)
+                    batch_df = table.to_pandas()
+                    batch_df.to_sql("entities", con, index=False, if_exists="append")
+                part.unlink()
+            if writer is None:  # empty extract
+                writer = pq.ParquetWriter(tmp_store, self.schema, compression="zstd")
+                to_frame([]).to_sql("entities", con, index=False)
+            con.execute('CREATE INDEX idx_entities_uei ON entities ("UEI")')
+            con.execute('CREATE INDEX idx_entities_cage ON entities ("CAGE")')
+            con.commit()
+        finally:
+            if writer is not None:
+                writer.close()
+            con.close()
+        tmp_store.replace(self.out_path)
+        tmp_index.replace(self.index_path)
+        return self.rows
+
+
+# ───────── Locate input ─────────
+
+
+def locate_extract(entity_root: Path = ENTITY_ROOT) -> Path:
+    """The file to parse for the newest extract — the .dat when one exists
+    next to the .zip, otherwise the .zip itself (streamed, never extracted)."""
+    if not entity_root.exists():
+        raise FileNotFoundError(f"{entity_root} not found — expected data/entity/")
+    latest_file = newest_extract(entity_root)
+    if latest_file is None:
+        raise FileNotFoundError(
+            "No SAM_PUBLIC_UTF-8_MONTHLY_V2_*.dat or .zip found in data/entity/*/"
+        )
+    print("Found latest extract:", display_path(latest_file))
+    if latest_file.suffix == ".zip":
+        dat_path = latest_file.with_suffix(".dat")
+        if dat_path.exists():
+            print(".dat already present, reading it instead of the zip")
+            return dat_path
+    return latest_file
+
+
+# ───────── Entry point ─────────
+
+
+def parse_extract(
+    source: Optional[Path] = None,
+    workers: int = 1,
+    excel: bool = False,
+    delta: bool = False,
+    batch_size: int = 0,
+    entity_root: Path = ENTITY_ROOT,
+) -> Dict[str, object]:
+    """
+    Format one extract (default: the newest under  entity_root ) and write
+    the Parquet store and SQLite index next to it.
+
+    workers     parser processes (1 = serial, 0 = all cores)
+    excel       also export formatted_entities_<date>.xlsx (streamed; split
+                into several sheets past Excel's row limit)
+    delta       reuse unchanged records from the previous month and write a
+                changes report; the previous store is looked for in the
+                month folders beside the extract's (entity_root when the
+                extract is not given)
+    batch_size  stream records to the store in batches of this many rows
+                (bounded memory; peak use is roughly 4× batch_size records,
+                plus two chunks per worker); 0 builds one DataFrame
+
+    Returns the paths written plus "rows", "reused" and "seconds".
+    """
+    workers = workers if workers > 0 else (os.cpu_count() or 1)
+    dat_path = Path(source) if source is not None else locate_extract(entity_root)
+    m = EXTRACT_RE.match(dat_path.name)
+    if m is None:
+        raise InputError(f"{dat_path.name} is not a SAM_PUBLIC_UTF-8_MONTHLY_V2_* file")
+    folder = dat_path.parent
+    if dat_path.suffix == ".zip":
+        print("Streaming .dat from:", dat_path.name)
+    else:
+        print("Using .dat:", dat_path.name)
+    date_tag = m.group(1)  # YYYYMMDD
+    output_file = folder / f"formatted_entities_{date_tag}.parquet"
+    excel_file = folder / f"formatted_entities_{date_tag}.xlsx"
+    index_file = folder / f"formatted_entities_{date_tag}.sqlite"
+    changes_file = folder / f"entity_changes_{date_tag}.csv"
+    print("Formatted store will be:", display_path(output_file))
+
+    prev_path = None
+    prev_records: Dict[str, Dict[str, object]] = {}
+    if delta:
+        prev_root = entity_root if source is None else dat_path.resolve().parent.parent
+        prev_path, prev_records = load_previous(date_tag, prev_root)
+        if prev_path is None:
+            print(
+                f"WARNING: --delta found no formatted_entities_*.parquet older than "
+                f"{date_tag} under {display_path(prev_root)}/*/ — full run, no changes report",
+                file=sys.stderr,
+            )
+        else:
+            print("Previous store      :", display_path(prev_path))
+            set_prev_hashes({u: r["ROW_HASH"] for u, r in prev_records.items()})
+
+    print("\nProcessing entities …")
+    start_total = time.time()
+    rec = RunRecorder("format")
+    rec.sections["extract"] = str(display_path(dat_path))
+    rec.sections["options"] = {
+        "workers": workers,
+        "excel": excel,
+        "delta": delta,
+        "batch_size": batch_size,
+    }
+    _CONTACT_SECONDS[0] = 0.0
+    try:
+        records: Iterable[Dict[str, object]] = iter_records(dat_path, workers)
+        tracker = None
+        if prev_path is not None:
+            tracker = ChangeTracker(prev_records)
+            records = map(tracker.resolve, records)
+
+        if batch_size:
+            # streaming: bounded memory, no DataFrame of the whole extract
+            store = BucketedStoreWriter(output_file, index_file, batch_size)
+            with rec.stage("parse") as st:
+                for r in records:
+                    store.add(r)
+                st.rows = store.rows
+                st.extra["contact_extraction_s"] = round(_CONTACT_SECONDS[0], 3)
+            print("Writing bucketed store …")
+            with rec.stage("store", rows=store.rows):
+                total = store.close()
+            print("✓ Saved", display_path(output_file))
+            print("✓ Saved", display_path(index_file))
+            if excel:
+                print("Saving Excel …")
+                with rec.stage("excel", rows=total):
+                    columns = [c for c in pq.read_schema(output_file).names if c != "Row Hash"]
+                    batches = pq.ParquetFile(output_file).iter_batches(
+                        batch_size, columns=columns
+                    )
+                    stats = write_workbook(
+                        (b.to_pandas() for b in batches), excel_file, sheet_name="Entities"
+                    )
+                print("✓ Saved", display_path(excel_file), f"({describe(stats)})")
+        else:
+            with rec.stage("parse") as st:
+                all_records = list(records)
+                st.rows = len(all_records)
+                st.extra["contact_extraction_s"] = round(_CONTACT_SECONDS[0], 3)
+            total = len(all_records)
+
+            # DataFrame & export
+            print("Creating DataFrame …")
+            with rec.stage("dataframe", rows=total):
+                df = to_frame(all_records)
+                del all_records
+            with rec.stage("sort", rows=total):
+                df.sort_values(["Has Email", "Has Phone"], ascending=[False, False], inplace=True)
+
+            print("Building UEI/CAGE index …")
+            with rec.stage("index", rows=total):
+                build_index(df, index_file)
+            print("✓ Saved", display_path(index_file))
+
+            print("Saving Parquet …")
+            with rec.stage("parquet", rows=total):
+                df.to_parquet(output_file, index=False, compression="zstd")
+            print("✓ Saved", display_path(output_file))
+            if excel:
+                print("Saving Excel …")
+                with rec.stage("excel", rows=total):
+                    stats = write_workbook(
+                        df.drop(columns="Row Hash"), excel_file, sheet_name="Entities"
+                    )
+                print("✓ Saved", display_path(excel_file), f"({describe(stats)})")
+    finally:
+        set_prev_hashes({})  # a long-running caller must not inherit last month's hashes
+
+    reused = 0
+    if tracker is not None:
+        reused = tracker.reused
+        print(f"Reused {reused:,} unchanged records, parsed {total - reused:,}")
+        with rec.stage("changes") as st:
+            report = tracker.report()
+            report.to_csv(changes_file, index=False)
+            st.rows = len(report)
+        counts = report["Change"].value_counts().to_dict() if len(report) else {}
+        print("✓ Saved", display_path(changes_file), counts)
+        rec.sections["delta"] = {"reused": reused, "changes": counts}
+    seconds = time.time() - start_total
+    rec.sections["rows"] = total
+    report_file = folder / f"format_report_{date_tag}.json"
+    rec.write(report_file)
+    print(rec.table())
+    print("✓ Saved", display_path(report_file))
+    print(f"Total rows: {total:,}  |  Execution time: {seconds:.1f} s")
+    return {
+        "extract": dat_path,
+        "store": output_file,
+        "index": index_file,
+        "excel": excel_file if excel else None,
+        "changes": changes_file if tracker is not None else None,
+        "report": report_file,
+        "rows": total,
+        "reused": reused,
+        "seconds": seconds,
+    }
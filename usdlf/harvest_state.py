@@ -0,0 +1,162 @@
+"""
+Incremental search windows and the open-notice re-check list, kept across
+harvest runs in  data/harvests/harvest_state.json .
+
+Per (ptype, org) target the state holds
+
+  * high_water     the latest postedDate a finished search has seen
+  * recent         noticeIds seen at or after  high_water − overlap  (they
+                   show up again in the next run's overlap and are skipped)
+  * backlog        notices found but not fetched before the budget ran out;
+                   the next run queues them first
+  * open           fetched notices whose deadline has not passed — the
+                   re-check pass fetches their IVLs again to catch growth
+  * last_recheck   when the re-check pass last ran to completion
+
+A run searches  [high_water − overlap, today]  instead of the whole
+look-back window (the first run of a target, or  full_window=True , still
+uses LOOKBACK_DAYS), so search and IVL calls scale with new notices.  The
+state is only advanced for targets whose search finished.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+STATE_FILE = "harvest_state.json"
+# what the re-check pass needs to queue (and write) a notice again
+OPEN_FIELDS = (
+    "noticeId",
+    "title",
+    "postedDate",
+    "responseDeadLine",
+    "type",
+    "subTier",
+    "solicitationNumber",
+    "naicsCode",
+    "typeOfSetAside",
+    "typeOfSetAsideDescription",
+)
+
+
+def posted_day(value: Optional[str]) -> Optional[str]:
+    """'2025-06-20', '2025-06-20T…' or '06/20/2025' → '2025-06-20' (None if unparsable)."""
+    value = (value or "").strip()
+    for fmt, width in (("%Y-%m-%d", 10), ("%m/%d/%Y", 10)):
+        try:
+            return dt.datetime.strptime(value[:width], fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def is_open(n: Dict, today: dt.date, final_age_days: int) -> bool:
+    """Deadline not passed (or, without one, posted recently enough)."""
+    deadline = posted_day(n.get("responseDeadLine"))
+    if deadline:
+        return deadline >= today.isoformat()
+    posted = posted_day(n.get("postedDate"))
+    return bool(posted) and (today - dt.date.fromisoformat(posted)).days <= final_age_days
+
+
+def trim_recent(hits: Dict[str, str], overlap_days: int) -> Dict[str, str]:
+    """Only the hits posted within overlap_days of the newest one."""
+    days = [d for d in hits.values() if d]
+    if not days:
+        return {}
+    cutoff = (dt.date.fromisoformat(max(days)) - dt.timedelta(days=overlap_days)).isoformat()
+    return {nid: d for nid, d in hits.items() if d and d >= cutoff}
+
+
+class HarvestState:
+    def __init__(self, path: Path):
+        self.path = path
+        self.targets: Dict[str, Dict] = {}
+        if path.exists():
+            self.targets = json.loads(path.read_text(encoding="utf-8")).get("targets", {})
+
+    def target(self, key: str) -> Dict:
+        return self.targets.setdefault(
+            key,
+            {"high_water": None, "recent": {}, "backlog": [], "open": {}, "last_recheck": None},
+        )
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        body = {
+            "updated": dt.datetime.now().isoformat(timespec="seconds"),
+            "targets": self.targets,
+        }
+        tmp.write_text(json.dumps(body, indent=2), encoding="utf-8")
+        tmp.replace(self.path)
+
+    # ───────── Start of a run ─────────
+
+    def window_start(
+        self, key: str, today: dt.date, lookback_days: int, overlap_days: int, full: bool
+    ) -> dt.date:
+        """postedFrom for this target's search."""
+        earliest = today - dt.timedelta(days=lookback_days)
+        hw = self.targets.get(key, {}).get("high_water")
+        if full or not hw:
+            return earliest
+        return max(earliest, dt.date.fromisoformat(hw) - dt.timedelta(days=overlap_days))
+
+    def known(self, key: str) -> List[str]:
+        """noticeIds the search should not queue again (recent + backlog)."""
+        t = self.targets.get(key, {})
+        return [*t.get("recent", {}), *(n["noticeId"] for n in t.get("backlog", []))]
+
+    def backlog(self, key: str) -> List[Dict]:
+        return list(self.targets.get(key, {}).get("backlog", []))
+
+    def recheck_due(self, key: str, today: dt.date, every_days: int) -> bool:
+        last = self.targets.get(key, {}).get("last_recheck")
+        return last is None or (today - dt.date.fromisoformat(last)).days >= every_days
+
+    def open_notices(self, key: str, today: dt.date, final_age_days: int) -> List[Dict]:
+        t = self.targets.get(key, {})
+        return [n for n in t.get("open", {}).values() if is_open(n, today, final_age_days)]
+
+    # ───────── End of a run ─────────
+
+    def record_search(self, key: str, hits: Dict[str, str], overlap_days: int) -> None:
+        """Advance the high-water mark over a finished search; hits: noticeId → day."""
+        t = self.target(key)
+        t["recent"] = trim_recent({**t["recent"], **hits}, overlap_days)
+        days = [*t["recent"].values(), t["high_water"] or ""]
+        t["high_water"] = max(days) or None
+
+    def record_partial(self, key: str, fetched: Dict[str, str]) -> None:
+        """An unfinished search keeps its high-water mark; remember what it
+        fetched so the repeat of the window does not queue it again."""
+        self.target(key)["recent"].update(fetched)
+
+    def record_fetched(
+        self, key: str, notices: Iterable[Dict], today: dt.date, final_age_days: int
+    ) -> None:
+        """Keep fetched, still-open notices for the re-check pass; drop closed ones."""
+        t = self.target(key)
+        for n in notices:
+            if is_open(n, today, final_age_days):
+                t["open"][n["noticeId"]] = {k: n.get(k) for k in OPEN_FIELDS}
+            else:
+                t["open"].pop(n["noticeId"], None)
+        t["open"] = {
+            nid: n for nid, n in t["open"].items() if is_open(n, today, final_age_days)
+        }
+
+    def set_backlog(self, key: str, pending: List[Dict], done: Iterable[str]) -> None:
+        """Backlog = what is still pending here, plus older backlog not done since."""
+        t = self.target(key)
+        done = set(done)
+        ids = {n["noticeId"] for n in pending}
+        older = [n for n in t["backlog"] if n["noticeId"] not in done | ids]
+        t["backlog"] = older + pending
+
+    def finish_recheck(self, key: str, today: dt.date) -> None:
+        self.target(key)["last_recheck"] = today.isoformat()
@@ -0,0 +1,883 @@
+"""
+Step 1 — harvest DoD presolicitation (PTYPE="p") or sources‑sought (PTYPE="r")
+notices from SAM.gov and dump IVL rosters to
+data/harvests/<YYYYMM>/<run-tag>_harvest/ .  harvest() takes the same options
+as the  harvest  subcommand (keyword names in parentheses below).
+
+Run‑tag:  <YYYYMMDD_HHMMSS>_<ptypes>_harvest  (e.g. 20250801_093215_p_harvest)
+Any missing month folders are created automatically.
+
+One run can cover several (ptype, org) targets:  --target p:097 --target r:097
+(targets=), or --targets-file targets.json.  They share one budget and one connection
+pool; the IVL queue interleaves targets by weight (--target r:097:2 gets twice
+the share of r), and the combined CSVs carry ptype / org_code columns.
+
+Only the first run of a target searches the whole LOOKBACK_DAYS window;
+later runs search from the latest postedDate already seen minus
+SEARCH_OVERLAP_DAYS, skip notices they already have and queue the previous
+run's unfetched backlog first (--full-window, full_window=, searches and
+fetches the whole window again, as every run used to).  Every
+RECHECK_EVERY_DAYS the IVLs of notices that are still open are fetched again,
+after the new ones, to catch late joiners (--recheck always|never, recheck=).
+See harvest_state.py.
+
+Search and IVL fetching overlap: a producer thread pages through the search
+(one call per 1 000 notices) and feeds a bounded queue, page by page, while
+the IVL workers drain it.  A page is only requested while the calls left
+exceed the IVLs already queued, so the search never runs ahead of the budget.
+The IVL queue is ordered by expected roster size learned from earlier
+all_notices.csv files (see ivl_planner.py) — within each search page, or
+across the whole window with --search-first (search_first=), which searches
+everything before the first IVL.  Notices that came back empty twice are
+skipped.  --no-plan (plan=False) keeps plain search order.
+
+IVL calls can run concurrently (--workers N, workers=).  All calls share one
+token-bucket rate limiter (--rate calls/s) and a hard cap on the number of
+calls for the run (--max-calls, the daily quota).  The first 429 stops the
+producer and every worker; rows fetched so far are written in queue order and
+the CSVs, checkpoint and summary are finalised as usual.
+
+Progress is checkpointed to  checkpoint.json  in the run folder (search
+offset, completed, skipped and pending notice IDs).  After a 429 stop, run
+again with  --resume <run_dir>  (resume=) to continue in the same folder: the search
+picks up at the saved offset, pending IVLs are re-planned, rows are appended
+to the same CSVs, and notices already completed are never fetched twice.
+
+Responses are cached on disk (data/cache/sam_http.sqlite, see sam_cache.py).
+Search pages are reused for a few hours, IVLs of open notices for a day and
+IVLs of closed or old notices for a month.  Cache hits cost no quota and are
+not counted in  api_calls;  --refresh-older-than AGE  forces a re-fetch of
+anything cached longer ago than AGE, --no-cache bypasses the cache entirely.
+"""
+
+from __future__ import annotations
+
+import csv
+import datetime as dt
+import json
+import os
+import queue as queue_mod
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import requests
+
+from .harvest_state import STATE_FILE, HarvestState, posted_day, trim_recent
+from .http_retry import TokenBucket
+from .instrument import HttpStats, RunRecorder
+from .ivl_planner import IvlPlanner
+from .paths import CACHE_PATH, HARVEST_ROOT, InputError, display_path
+from .sam_cache import DEFAULT_MAX_BYTES, ResponseCache, cache_key
+from .settings import (
+    API_BASE,
+    DAILY_CALL_CAP,
+    IVL_FINAL_AGE_DAYS,
+    IVL_TTL_CLOSED,
+    IVL_TTL_OPEN,
+    LOOKBACK_DAYS,
+    ORG_CODE,
+    PAGE_SIZE,
+    PTYPE,
+    RATE_PER_SEC,
+    RECHECK_EVERY_DAYS,
+    SEARCH_OVERLAP_DAYS,
+    SEARCH_TTL,
+)
+from .targets import interleave, target_key
+
+# search pages' worth of notices the producer may queue ahead of the IVL workers
+QUEUE_PAGES = 2
+
+# ───────── CSV helpers ─────────
+
+# all_notices.csv; columns past org_code are appended so older readers keep working
+NOTICE_HEADER = [
+    "noticeId",
+    "title",
+    "postedDate",
+    "ptype",
+    "ivl_len",
+    "type",
+    "subTier",
+    "org_code",
+    "solicitationNumber",
+    "responseDeadLine",
+    "naicsCode",
+    "typeOfSetAside",
+    "typeOfSetAsideDescription",
+]
+IVL_HEADER = ["noticeId", "ueiSAM", "cage", "vendorName", "ptype"]
+
+
+def csv_writer(path: Path, header: List[str]):
+    """Dict writer appending to path; a file resumed from an older run keeps
+    its own header (columns it lacks are dropped from the new rows)."""
+    if path.exists() and path.stat().st_size:
+        with path.open(newline="", encoding="utf-8") as f:
+            header = next(csv.reader(f), header)
+        f = path.open("a", newline="", encoding="utf-8")
+        return csv.DictWriter(f, header, extrasaction="ignore"), f
+    f = path.open("a", newline="", encoding="utf-8")
+    w = csv.DictWriter(f, header, extrasaction="ignore")
+    w.writeheader()
+    return w, f
+
+
+# ───────── Checkpoint ─────────
+
+
+def load_checkpoint(path: Path) -> Dict:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def upgrade_checkpoint(ckpt: Dict) -> Dict:
+    """Single-target checkpoints (ptype / org_code / offset) → targets list."""
+    if "targets" not in ckpt:
+        t = {
+            "ptype": ckpt.pop("ptype"),
+            "org_code": ckpt.pop("org_code"),
+            "weight": 1.0,
+            "offset": ckpt.pop("offset"),
+            "searched": ckpt.pop("searched", False),
+        }
+        ckpt["targets"] = [t]
+        for n in ckpt["pending"]:
+            n.setdefault("ptype", t["ptype"])
+            n.setdefault("org_code", t["org_code"])
+    ckpt.setdefault("skipped", [])
+    return ckpt
+
+
+def save_checkpoint(path: Path, ckpt: Dict) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(ckpt, indent=2), encoding="utf-8")
+    tmp.replace(path)
+
+
+def notice_fields(n: Dict) -> Dict:
+    """The parts of a search hit we keep for pending (not yet fetched) work."""
+    sub_tier = n.get("subTier")
+    if not sub_tier:
+        # v2 only carries the path: "DEPT OF DEFENSE.DEPT OF THE ARMY.AMC"
+        parts = (n.get("fullParentPathName") or "").split(".")
+        sub_tier = parts[1] if len(parts) > 1 else None
+    return {
+        "noticeId": n["noticeId"],
+        "title": n["title"],
+        "postedDate": n["postedDate"],
+        "responseDeadLine": n.get("responseDeadLine"),
+        "type": n.get("type"),
+        "subTier": sub_tier,
+        # already in the search response — kept for step 2's workbook
+        "solicitationNumber": n.get("solicitationNumber"),
+        "naicsCode": n.get("naicsCode"),
+        "typeOfSetAside": n.get("typeOfSetAside"),
+        "typeOfSetAsideDescription": n.get("typeOfSetAsideDescription"),
+    }
+
+
+def ivl_ttl(n: Dict, today: dt.date) -> float:
+    """Cache lifetime for a notice's IVL: long once the notice is closed or old."""
+    try:
+        deadline = dt.date.fromisoformat((n.get("responseDeadLine") or "")[:10])
+        if deadline < today:
+            return IVL_TTL_CLOSED
+    except ValueError:
+        pass
+    try:
+        posted = dt.date.fromisoformat(n["postedDate"][:10])
+        if (today - posted).days > IVL_FINAL_AGE_DAYS:
+            return IVL_TTL_CLOSED
+    except (KeyError, ValueError):
+        pass
+    return IVL_TTL_OPEN
+
+
+# ───────── SAM client / quota ─────────
+
+
+class SamClient:
+    """
+    One pooled session shared by all workers, plus the run's call budget.
+    Budget is reserved by the caller *before* a call is scheduled, in search
+    order, so a capped run always spends its calls on the first notices.
+    A cache hit hands its reservation back without touching the network.
+    """
+
+    def __init__(
+        self,
+        session: requests.Session,
+        limiter: TokenBucket,
+        max_calls: int,
+        cache: Optional[ResponseCache] = None,
+        base: str = API_BASE,
+        http_stats: Optional[HttpStats] = None,
+    ):
+        self.session = session
+        self.base = base.rstrip("/")
+        self.limiter = limiter
+        self.max_calls = max_calls
+        self.cache = cache
+        self.http = http_stats if http_stats is not None else HttpStats()
+        self.api_calls = 0
+        self.reserved = 0
+        self.quota_hit = False
+        self.stop = threading.Event()
+        self.lock = threading.Lock()
+
+    def reserve(self) -> bool:
+        with self.lock:
+            if self.stop.is_set() or self.api_calls + self.reserved >= self.max_calls:
+                return False
+            self.reserved += 1
+            return True
+
+    def get(
+        self, url: str, params: Optional[Dict] = None, ttl: float = 0
+    ) -> Optional[requests.Response]:
+        """GET with a reserved call; None if the run was stopped meanwhile."""
+        key = cache_key(url, params)
+        endpoint = endpoint_name(url)
+        if self.cache is not None and ttl > 0:
+            hit = self.cache.get(key, ttl)
+            if hit is not None:
+                with self.lock:
+                    self.reserved -= 1
+                self.http.cache_hit(endpoint)
+                return cached_response(url, *hit)
+        if self.stop.is_set():  # don't queue on the limiter after a 429
+            with self.lock:
+                self.reserved -= 1
+            return None
+        self.limiter.acquire()
+        with self.lock:
+            self.reserved -= 1
+            if self.stop.is_set():
+                return None
+            self.api_calls += 1
+        start = time.perf_counter()
+        try:
+            resp = self.session.get(url, params=params, timeout=40)
+        except requests.RequestException as exc:
+            self.http.record(endpoint, type(exc).__name__, time.perf_counter() - start)
+            raise
+        self.http.record(endpoint, resp.status_code, time.perf_counter() - start)
+        if resp.status_code == 429:
+            with self.lock:
+                self.quota_hit = True
+            self.stop.set()
+        elif self.cache is not None:
+            self.cache.put(key, resp.status_code, resp.content)
+        return resp
+
+
+def endpoint_name(url: str) -> str:
+    """'search' / 'ivl' — the last path segment, for per-endpoint stats."""
+    return url.rstrip("/").rsplit("/", 1)[-1]
+
+
+def cached_response(url: str, status: int, body: bytes) -> requests.Response:
+    resp = requests.Response()
+    resp.status_code = status
+    resp._content = body
+    resp.url = url
+    return resp
+
+
+def fetch_ivl(
+    client: SamClient, nid: str, ttl: float = 0
+) -> Optional[Tuple[int, List[Dict]]]:
+    """(ivl_count, roster) for one notice; None if no usable answer (429/stop)."""
+    ivl_resp = client.get(f"{client.base}/opportunities/{nid}/ivl", ttl=ttl)
+    if ivl_resp is None or ivl_resp.status_code == 429:
+        return None
+    roster: List[Dict] = []
+    if ivl_resp.ok and ivl_resp.status_code not in (403, 404):
+        roster = ivl_resp.json().get("ivl", [])
+    return len(roster), roster
+
+
+# ───────── Entry point ─────────
+
+
+def harvest(
+    targets: Optional[Sequence[Dict]] = None,
+    workers: int = 1,
+    rate: float = RATE_PER_SEC,
+    max_calls: int = DAILY_CALL_CAP,
+    resume: Optional[Path] = None,
+    refresh_older_than: Optional[float] = None,
+    cache_max_mb: int = DEFAULT_MAX_BYTES // 1024**2,
+    use_cache: bool = True,
+    base_url: str = API_BASE,
+    output_root: Path = HARVEST_ROOT,
+    plan: bool = True,
+    api_key: Optional[str] = None,
+    cache_path: Path = CACHE_PATH,
+    full_window: bool = False,
+    overlap_days: int = SEARCH_OVERLAP_DAYS,
+    recheck: str = "auto",
+    search_first: bool = False,
+) -> Dict:
+    """
+    Run (or, with  resume=RUN_DIR , continue) one harvest and return the
+    summary that is also written to  harvest_summary.json  (its "run_dir"
+    is the run folder).  targets are  parse_target()  dicts; the default is
+    PTYPE:ORG_CODE.  api_key defaults to  $SAM_API_KEY  (.env is honoured).
+
+    Each target searches from its high-water mark minus overlap_days (see
+    harvest_state.py); full_window=True searches the whole LOOKBACK_DAYS.
+    recheck "auto" re-fetches open notices' IVLs every RECHECK_EVERY_DAYS,
+    "always" on this run, "never" not at all.
+    """
+    if api_key is None:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        api_key = os.getenv("SAM_API_KEY")
+    if not api_key:
+        raise InputError("Set SAM_API_KEY env var (preferred) or pass api_key.")
+
+    now = dt.datetime.now()
+    if resume:
+        # ───────── Resume an earlier run ─────────
+        RUN_DIR = Path(resume).expanduser().resolve()
+        output_root = RUN_DIR.parents[1]  # its state and history, not the default root
+        FN_CKPT = RUN_DIR / "checkpoint.json"
+        if not (RUN_DIR.is_dir() and RUN_DIR.name.endswith("_harvest")):
+            raise InputError("Provided --resume path is not a *_harvest directory.")
+        if not FN_CKPT.exists():
+            raise FileNotFoundError(f"checkpoint.json not found in {RUN_DIR}")
+        ckpt = upgrade_checkpoint(load_checkpoint(FN_CKPT))
+        state = HarvestState(output_root / STATE_FILE)
+        ckpt["resumes"] = ckpt.get("resumes", 0) + 1
+        print("Resuming folder:", display_path(RUN_DIR))
+        for t in ckpt["targets"]:
+            print(f"  {target_key(t)}: offset {t['offset']}")
+        print(
+            f"  {len(ckpt['completed'])} notices done, {len(ckpt['pending'])} pending"
+        )
+    else:
+        state = HarvestState(Path(output_root) / STATE_FILE)
+        targets = list(targets or [])
+        if not targets:
+            targets = [{"ptype": PTYPE, "org_code": ORG_CODE, "weight": 1.0}]
+        unique: Dict[str, Dict] = {}
+        for t in targets:
+            unique.setdefault(target_key(t), dict(t, offset=0, searched=False))
+        targets = list(unique.values())
+
+        # ───────── Prepare output dirs ─────────
+        ptypes = "".join(dict.fromkeys(t["ptype"] for t in targets))
+        month_tag = now.strftime("%Y%m")  # 202508
+        run_tag = now.strftime("%Y%m%d_%H%M%S") + f"_{ptypes}"  # 20250801_093215_pr
+        RUN_DIR = Path(output_root) / month_tag / f"{run_tag}_harvest"
+        RUN_DIR.mkdir(parents=True, exist_ok=True)
+        FN_CKPT = RUN_DIR / "checkpoint.json"
+
+        # ───────── Date range ─────────
+        # fixed for the life of the run so saved offsets stay valid on resume;
+        # each target starts at its high-water mark minus the overlap
+        today = now.date()
+        pending: List[Dict] = []
+        rechecking = []
+        for t in targets:
+            k = target_key(t)
+            start = state.window_start(k, today, LOOKBACK_DAYS, overlap_days, full_window)
+            t["posted_from"] = start.strftime("%m/%d/%Y")
+            t["hits"] = {}
+            backlog = state.backlog(k)
+            queued = {n["noticeId"] for n in backlog}
+            rechecks = []
+            if recheck == "always" or (
+                recheck == "auto" and state.recheck_due(k, today, RECHECK_EVERY_DAYS)
+            ):
+                rechecking.append(k)
+                rechecks = [
+                    dict(n, ptype=t["ptype"], org_code=t["org_code"], recheck=True)
+                    for n in state.open_notices(k, today, IVL_FINAL_AGE_DAYS)
+                    if n["noticeId"] not in queued
+                ]
+            pending += backlog + rechecks
+            hw = state.targets.get(k, {}).get("high_water")
+            since = f" (high-water {hw} − {overlap_days} d)" if hw and not full_window else ""
+            print(
+                f"  {k}: search {t['posted_from']} → today{since}, "
+                f"{len(backlog)} backlog, {len(rechecks)} open to re-check"
+            )
+        ckpt = {
+            "targets": targets,
+            "lookback_days": LOOKBACK_DAYS,
+            "posted_from": min(
+                (t["posted_from"] for t in targets),
+                key=lambda d: dt.datetime.strptime(d, "%m/%d/%Y"),
+            ),
+            "posted_to": today.strftime("%m/%d/%Y"),
+            "overlap_days": overlap_days,
+            "full_window": full_window,
+            "rechecking": rechecking,
+            "completed": [],
+            "pending": pending,
+            "skipped": [],
+            "api_calls_total": 0,
+            "ivl_rows_total": 0,
+            "resumes": 0,
+            "finished": False,
+        }
+        save_checkpoint(FN_CKPT, ckpt)
+        print("Output folder:", display_path(RUN_DIR))
+
+    FN_NOTICES = RUN_DIR / "all_notices.csv"
+    FN_IVL = RUN_DIR / "ivl_hits.csv"
+    FN_JSON = RUN_DIR / "harvest_summary.json"
+
+    not_wr, nf = csv_writer(FN_NOTICES, NOTICE_HEADER)
+    ivl_wr, vf = csv_writer(FN_IVL, IVL_HEADER)
+
+    # ───────── HTTP session ─────────
+    session = requests.Session()
+    session.params = {"api_key": api_key}
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=max(workers, 10))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    cache = None
+    if use_cache:
+        cache = ResponseCache(cache_path, cache_max_mb * 1024**2, refresh_older_than)
+    client = SamClient(session, TokenBucket(rate), max_calls, cache, base=base_url)
+
+    targets = ckpt["targets"]
+    weights = {target_key(t): t["weight"] for t in targets}
+    stats = {
+        target_key(t): {"search_calls": 0, "ivl_fetched": 0, "ivl_rows": 0}
+        for t in targets
+    }
+    completed = set(ckpt["completed"])
+    ivl_rows = 0
+    budget_exhausted = False
+    today = now.date()
+
+    print("Begin harvest…")
+    rec = RunRecorder("harvest")
+
+    # ───────── Plan: best expected yield first, weighted across targets ─────────
+    ckpt_lock = threading.Lock()  # the producer and the writer both update ckpt
+    stage = rec.begin("plan")
+    planner = IvlPlanner.from_harvests(Path(output_root), exclude=RUN_DIR) if plan else None
+    history_seen = planner.total_seen if planner else 0
+    predicted: Dict[str, float] = {}
+    n_skipped = 0
+
+    def plan_batch(notices: List[Dict]) -> List[Dict]:
+        """Order one batch of notices for the IVL queue; re-checks go last."""
+        nonlocal n_skipped
+        queues: Dict[str, List[Dict]] = {k: [] for k in weights}
+        recheck_queues: Dict[str, List[Dict]] = {k: [] for k in weights}
+        for n in notices:
+            (recheck_queues if n.get("recheck") else queues).setdefault(
+                target_key(n), []
+            ).append(n)
+        if planner is not None:
+            for k, q in queues.items():
+                queues[k], skipped, pred = planner.plan(q, today)
+                predicted.update(pred)
+                with ckpt_lock:
+                    ckpt["skipped"].extend(n["noticeId"] for n in skipped)
+                n_skipped += len(skipped)
+        return interleave(queues, weights) + interleave(recheck_queues, weights)
+
+    # what this run already had queued (resume, backlog) goes first; re-checks
+    # of open notices wait until the search has found every new notice
+    carried = [n for n in ckpt["pending"] if not n.get("recheck")]
+    if not search_first:
+        carried = plan_batch(carried)
+    rechecks = [n for n in ckpt["pending"] if n.get("recheck")]
+    ckpt["pending"] = carried + rechecks
+    save_checkpoint(FN_CKPT, ckpt)
+    stage.rows = len(carried)
+    rec.end(stage)
+    if rechecks:
+        print(f"Re-checking {len(rechecks)} open notices after the new ones")
+
+    # ───────── Search producer → bounded queue → IVL consumers ─────────
+    # The producer pages through every target's window (targets take turns
+    # page by page), plans each page and feeds the queue while the workers
+    # fetch IVLs from it.  A page is only requested while the calls left
+    # exceed what is already queued, so no page is prefetched that the budget
+    # cannot use; a full queue blocks the producer.  The first 429 (or the end
+    # of the budget) sets  halt : the producer stops, the workers finish what
+    # they hold, and the rows fetched so far are written and checkpointed.
+    # An unexpected error in either thread halts the run the same way and is
+    # re-raised once the checkpoint is saved.
+    work: "queue_mod.Queue[Optional[Tuple[int, Dict]]]" = queue_mod.Queue(
+        maxsize=max(QUEUE_PAGES * PAGE_SIZE, workers)
+    )
+    results: "queue_mod.Queue[Tuple[int, Dict, Optional[Tuple[int, List[Dict]]]]]" = (
+        queue_mod.Queue()
+    )
+    halt = threading.Event()
+    errors: List[BaseException] = []
+    seq = 0
+    search_stage = rec.begin("search")
+
+    def enqueue(batch: List[Dict]) -> bool:
+        """Hand a planned batch to the workers; False once the run is halting."""
+        nonlocal seq
+        for n in batch:
+            while True:
+                if halt.is_set() or client.stop.is_set():
+                    return False
+                try:
+                    work.put((seq, n), timeout=0.1)
+                    break
+                except queue_mod.Full:
+                    continue
+            seq += 1
+        return True
+
+    def budget_for_page() -> bool:
+        """Wait until one more page can pay off: calls left > IVLs queued."""
+        while not (halt.is_set() or client.stop.is_set()):
+            with client.lock:
+                left = client.max_calls - client.api_calls - client.reserved
+            if left > work.qsize() + 1:
+                return True
+            if work.empty() and left <= 1:
+                return False  # nothing left to drain: the budget is spent
+            time.sleep(0.05)
+        return False
+
+    def search_pages() -> List[Dict]:
+        """Fetch search pages until every window is done; returns the notices
+        found (already queued unless search_first)."""
+        nonlocal budget_exhausted
+        found: List[Dict] = []
+        while True:
+            active = [t for t in targets if not t["searched"]]
+            if not active:
+                return found
+            for t in active:
+                if not budget_for_page() or not client.reserve():
+                    budget_exhausted = not client.stop.is_set()
+                    return found
+                params = {
+                    "limit": PAGE_SIZE,
+                    "offset": t["offset"],
+                    "postedFrom": t.get("posted_from", ckpt["posted_from"]),
+                    "postedTo": ckpt["posted_to"],
+                    "ptype": t["ptype"],
+                    "sortBy": "-postedDate",
+                    "organizationCode": t["org_code"],
+                }
+                resp = client.get(f"{client.base}/search", params=params, ttl=SEARCH_TTL)
+                if resp is None:
+                    return found
+                if resp.status_code == 429:
+                    print("Daily quota hit (search). Stopping.")
+                    return found
+                if not resp.ok:
+                    print("Search failed (status", resp.status_code, ") — fetching what we have.")
+                    return found
+
+                stats[target_key(t)]["search_calls"] += 1
+                notices = resp.json().get("opportunitiesData", [])
+                new: List[Dict] = []
+                with ckpt_lock:
+                    if notices:
+                        t["offset"] += PAGE_SIZE
+                        # the newest postings of this window become the next high-water mark
+                        hits = {n["noticeId"]: posted_day(n.get("postedDate")) for n in notices}
+                        t["hits"] = trim_recent(
+                            {**t.get("hits", {}), **hits},
+                            ckpt.get("overlap_days", SEARCH_OVERLAP_DAYS),
+                        )
+                        known = (
+                            completed
+                            | set(ckpt["skipped"])
+                            | {n["noticeId"] for n in ckpt["pending"]}
+                        )
+                        if not ckpt.get("full_window"):
+                            known |= set(state.known(target_key(t)))
+                        new = [
+                            dict(notice_fields(n), ptype=t["ptype"], org_code=t["org_code"])
+                            for n in notices
+                            if n["noticeId"] not in known
+                        ]
+                        ckpt["pending"].extend(new)
+                    else:
+                        t["searched"] = True
+                    save_checkpoint(FN_CKPT, ckpt)
+                found.extend(new)
+                if new and not search_first and not enqueue(plan_batch(new)):
+                    return found
+
+    def produce() -> None:
+        found: List[Dict] = []
+        try:
+            if not search_first and not enqueue(carried):
+                return
+            found = search_pages()
+            search_stage.rows = len(found)  # new notices
+            rec.end(search_stage)
+            if search_first:
+                # whole window known: one global plan, like the old two-phase run
+                batch = plan_batch(carried + found)
+                with ckpt_lock:
+                    ckpt["pending"] = batch + rechecks
+                if not enqueue(batch):
+                    return
+            enqueue(rechecks)
+        except Exception as exc:
+            errors.append(exc)
+            halt.set()
+        finally:
+            if search_stage.name not in rec.stages:
+                search_stage.rows = len(found)
+                rec.end(search_stage)
+            for _ in range(max(workers, 1)):
+                while True:  # sentinels; consumers may already be gone
+                    try:
+                        work.put(None, timeout=0.1)
+                        break
+                    except queue_mod.Full:
+                        if halt.is_set() or client.stop.is_set():
+                            break
+
+    def consume() -> None:
+        nonlocal budget_exhausted
+        while True:
+            try:
+                item = work.get(timeout=0.1)
+            except queue_mod.Empty:
+                if halt.is_set() or client.stop.is_set():
+                    return
+                continue
+            if item is None:
+                return
+            i, n = item
+            if halt.is_set() or not client.reserve():
+                if not client.stop.is_set():
+                    budget_exhausted = True
+                halt.set()
+                results.put((i, n, None))
+                return
+            res = None
+            try:
+                res = fetch_ivl(client, n["noticeId"], ivl_ttl(n, today))
+            except requests.RequestException as exc:
+                print(f"  IVL {n['noticeId']} failed ({type(exc).__name__}); left pending")
+            except Exception as exc:
+                errors.append(exc)
+                halt.set()
+            finally:
+                results.put((i, n, res))  # every taken item is reported
+
+    # ───────── IVLs: written in queue order as results come in ─────────
+    stage = rec.begin("ivl")
+    predicted_rows = 0.0
+    fetched: Dict[str, List[Dict]] = {k: [] for k in weights}
+    rechecked = 0
+    producer = threading.Thread(target=produce, name="search", daemon=True)
+    consumers = [
+        threading.Thread(target=consume, name=f"ivl-{j}", daemon=True)
+        for j in range(max(workers, 1))
+    ]
+    producer.start()
+    for c in consumers:
+        c.start()
+
+    held: Dict[int, Tuple[Dict, Optional[Tuple[int, List[Dict]]]]] = {}
+    next_seq = 0
+    done: List[str] = []
+    last_save = time.monotonic()
+
+    def write(n: Dict, res: Optional[Tuple[int, List[Dict]]]) -> None:
+        nonlocal ivl_rows, predicted_rows, rechecked
+        if res is None:
+            return  # 429 / stopped / failed: not fetched, stays pending
+        nid = n["noticeId"]
+        ptype = n["ptype"]
+        ivl_count, roster = res
+        for v in roster:
+            ivl_wr.writerow(
+                {
+                    "noticeId": nid,
+                    "ueiSAM": v.get("ueiSAM"),
+                    "cage": v.get("cageNumber"),
+                    "vendorName": v.get("name"),
+                    "ptype": ptype,
+                }
+            )
+            ivl_rows += 1
+        # pending notices from older checkpoints lack the later fields → blank
+        not_wr.writerow(
+            {
+                **{c: n.get(c) for c in NOTICE_HEADER},
+                "title": n["title"].strip(),
+                "ivl_len": ivl_count,
+            }
+        )
+        st = stats.setdefault(
+            target_key(n), {"search_calls": 0, "ivl_fetched": 0, "ivl_rows": 0}
+        )
+        st["ivl_fetched"] += 1
+        st["ivl_rows"] += ivl_count
+        predicted_rows += predicted.get(nid, 0.0)
+        fetched.setdefault(target_key(n), []).append(n)
+        rechecked += bool(n.get("recheck"))
+        done.append(nid)
+
+    def checkpoint() -> None:
+        nf.flush()
+        vf.flush()
+        with ckpt_lock:
+            completed.update(done)
+            ckpt["completed"].extend(done)
+            gone = completed | set(ckpt["skipped"])
+            ckpt["pending"] = [n for n in ckpt["pending"] if n["noticeId"] not in gone]
+            save_checkpoint(FN_CKPT, ckpt)
+        done.clear()
+
+    while True:
+        try:
+            i, n, res = results.get(timeout=0.1)
+        except queue_mod.Empty:
+            if not producer.is_alive() and not any(c.is_alive() for c in consumers):
+                if results.empty():
+                    break
+            continue
+        held[i] = (n, res)
+        while next_seq in held:  # keep CSV rows in queue order
+            write(*held.pop(next_seq))
+            next_seq += 1
+        if done and time.monotonic() - last_save > 1.0:
+            checkpoint()
+            last_save = time.monotonic()
+    for i in sorted(held):  # gaps: items the halted workers never took
+        write(*held[i])
+    checkpoint()
+    producer.join()
+    if errors:
+        print(f"Harvest halted by {type(errors[0]).__name__}: {errors[0]} — checkpoint saved.")
+        nf.close()
+        vf.close()
+        if cache is not None:
+            cache.close()
+        raise errors[0]
+    if client.quota_hit:
+        print("Daily quota hit. Stopping.")
+
+    stage.rows = ivl_rows
+    stage.extra["notices_fetched"] = sum(s["ivl_fetched"] for s in stats.values())
+    stage.extra["rechecked"] = rechecked
+    rec.end(stage)
+    if planner is not None:
+        print(
+            f"Planned IVLs from {history_seen} past observations; "
+            f"skipped {n_skipped} reliably empty"
+        )
+    queue = ckpt["pending"]
+    ckpt["finished"] = all(t["searched"] for t in targets) and not queue
+
+    if budget_exhausted:
+        print(f"Call budget of {max_calls} reached. Stopping.")
+
+    # ───────── Wrap‑up ─────────
+    nf.close()
+    vf.close()
+    if cache is not None:
+        cache.evict()
+        cache.close()
+    ckpt["api_calls_total"] += client.api_calls
+    ckpt["ivl_rows_total"] += ivl_rows
+    save_checkpoint(FN_CKPT, ckpt)
+
+    # ───────── Carry state to the next run ─────────
+    handled = completed | set(ckpt["skipped"])
+    overlap = ckpt.get("overlap_days", SEARCH_OVERLAP_DAYS)
+    for t in targets:
+        k = target_key(t)
+        if t["searched"]:
+            state.record_search(k, t.get("hits", {}), overlap)
+        else:
+            # the same window is searched again next run: skip what was fetched
+            state.record_partial(
+                k,
+                {
+                    n["noticeId"]: posted_day(n["postedDate"])
+                    for n in fetched.get(k, [])
+                    if not n.get("recheck")
+                },
+            )
+        state.record_fetched(k, fetched.get(k, []), today, IVL_FINAL_AGE_DAYS)
+        left = [n for n in queue if target_key(n) == k]
+        state.set_backlog(k, [n for n in left if not n.get("recheck")], handled)
+        if k in ckpt.get("rechecking", []) and not any(n.get("recheck") for n in left):
+            state.finish_recheck(k, today)
+    state.save()
+    meta = {
+        "run_utc": dt.datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "run_dir": str(display_path(RUN_DIR)),
+        "base_url": client.base,
+        "lookback_days": ckpt["lookback_days"],
+        "ptype": "".join(dict.fromkeys(t["ptype"] for t in targets)),
+        "org_code": ",".join(dict.fromkeys(t["org_code"] for t in targets)),
+        "targets": [
+            {
+                "target": target_key(t),
+                "weight": t["weight"],
+                "searched": t["searched"],
+                "posted_from": t.get("posted_from", ckpt["posted_from"]),
+                "high_water": state.target(target_key(t))["high_water"],
+                "backlog": len(state.target(target_key(t))["backlog"]),
+                "open": len(state.target(target_key(t))["open"]),
+                **stats[target_key(t)],
+            }
+            for t in targets
+        ],
+        "api_calls": client.api_calls,
+        "ivl_rows": ivl_rows,
+        "quota_hit": client.quota_hit,
+        "workers": workers,
+        "rate_per_sec": rate,
+        "max_calls": max_calls,
+        "budget_exhausted": budget_exhausted,
+        "resumes": ckpt["resumes"],
+        "api_calls_total": ckpt["api_calls_total"],
+        "ivl_rows_total": ckpt["ivl_rows_total"],
+        "notices_completed": len(ckpt["completed"]),
+        "notices_rechecked": rechecked,
+        "notices_pending": len(ckpt["pending"]),
+        "finished": ckpt["finished"],
+        "cache_hits": cache.hits if cache else 0,
+        "cache_misses": cache.misses if cache else 0,
+        "plan": {
+            "enabled": plan,
+            "history_observations": history_seen,
+            "skipped_empty": len(ckpt["skipped"]),
+            "predicted_ivl_rows": round(predicted_rows, 1),
+            "actual_ivl_rows": ivl_rows,
+        },
+    }
+    report = rec.report()
+    meta["resources"] = {
+        k: report[k] for k in ("wall_s", "cpu_s", "peak_rss_mb")
+    }
+    meta["stages"] = report["stages"]
+    meta["http"] = client.http.report()
+    FN_JSON.write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    print(
+        "Harvest complete —",
+        {k: v for k, v in meta.items() if k not in ("targets", "plan", "stages", "http")},
+    )
+    print(rec.table())
+    for endpoint, h in meta["http"].items():
+        lat = h["latency_ms"]
+        print(
+            f"  {endpoint:<8} {h['calls']} calls {h['by_status']}, {h['cache_hits']} cached, "
+            f"p50 {lat['p50']} ms, p90 {lat['p90']} ms, max {lat['max']} ms"
+        )
+    if not ckpt["finished"]:
+        print("Resume with:  --resume", display_path(RUN_DIR))
+    return meta
@@ -0,0 +1,87 @@
+"""
+Rate limiting and retries for the outbound API clients.
+
+TokenBucket  paces the calls of all of a client's threads (the SAM harvester,
+iContact, Eventbrite).
+
+Retrying.send()  makes one call through the shared rate limiter and retries
+429, 5xx and connection errors with exponential back-off, honouring
+Retry-After; it returns the first response that is not retryable (or the
+last one once the retries are spent) and records every attempt in HttpStats.
+The SAM harvester does not retry: its 429 means the daily quota is gone.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Optional
+
+import requests
+
+from .instrument import HttpStats
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+MAX_BACKOFF_S = 60.0
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, up to `burst`."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class Retrying:
+    def __init__(self, limiter: TokenBucket, http: HttpStats, retries: int):
+        self.limiter = limiter
+        self.http = http
+        self.retries = retries
+        self.retried = 0
+        self.lock = threading.Lock()
+
+    def send(
+        self, session: requests.Session, method: str, url: str, endpoint: str, **kwargs
+    ) -> requests.Response:
+        """The call's response; the last connection error is re-raised once
+        the retries are spent."""
+        for attempt in range(self.retries + 1):
+            self.limiter.acquire()
+            start = time.perf_counter()
+            try:
+                resp = session.request(method, url, **kwargs)
+            except requests.RequestException as exc:
+                self.http.record(endpoint, type(exc).__name__, time.perf_counter() - start)
+                if attempt == self.retries:
+                    raise
+                delay = 2.0**attempt
+            else:
+                self.http.record(endpoint, resp.status_code, time.perf_counter() - start)
+                if resp.status_code not in RETRY_STATUS or attempt == self.retries:
+                    return resp
+                try:
+                    delay = float(resp.headers.get("Retry-After", ""))
+                except ValueError:
+                    delay = 2.0**attempt
+            with self.lock:
+                self.retried += 1
+            time.sleep(min(delay, MAX_BACKOFF_S))
+        raise AssertionError("unreachable")
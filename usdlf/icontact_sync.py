@@ -0,0 +1,432 @@
+"""
+Step 4 — push the curated IVL vendors into iContact (API 2.2).
+
+sync() reads step 2's  *_curated_ivl_contacts.xlsx  (the newest run's, or
+the given workbooks), turns every e-mail address into one iContact contact
+(business name, first phone, address) and sends only what changed since the
+last sync:
+
+  * data/icontact/icontact_state.json  keeps, per account / client folder,
+    a hash of each contact as last sent, its contactId and the lists it is
+    subscribed to.  Unchanged contacts cost no calls; changed ones are sent
+    again with their contactId (an update), new ones without.
+  * Contacts go to  POST …/contacts  and list memberships to
+    POST …/subscriptions  in batches of ICONTACT_BATCH over one pooled
+    session; --workers batches are in flight at once, all under one
+    token-bucket rate (--rate calls/s).
+  * 429, 5xx and connection errors are retried with exponential back-off
+    (Retry-After is honoured); a batch that still fails is left out of the
+    state, so the next sync sends it again.  401 / 403 stop the sync.
+
+The state is saved after every batch, so an interrupted sync resumes where
+it stopped.  Credentials come from the same variables as  icontact/test.py
+(API_APP_ID, API_USERNAME, API_PASSWORD, ACCOUNT_ID, CLIENT_FOLDER_ID; .env
+is honoured).  bench/mock_icontact_api.py stands in for the API offline.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+import requests
+
+from .http_retry import Retrying, TokenBucket
+from .instrument import HttpStats, RunRecorder
+from .paths import HARVEST_ROOT, ICONTACT_STATE, InputError, display_path, harvest_runs
+from .settings import (
+    ICONTACT_BASE,
+    ICONTACT_BATCH,
+    ICONTACT_RATE_PER_SEC,
+    ICONTACT_RETRIES,
+    ICONTACT_WORKERS,
+)
+
+# curated column → iContact contact field
+FIELDS = {
+    "Street": "street",
+    "City": "city",
+    "State": "state",
+    "ZIP": "postalCode",
+}
+
+
+class SyncError(RuntimeError):
+    """A batch iContact answered with a non-retryable error."""
+
+
+# ───────── Curated contacts ─────────
+
+
+def curated_workbooks(harvest_root: Path = HARVEST_ROOT) -> List[Path]:
+    """Every run's curated workbook, oldest run first."""
+    found = []
+    for run in sorted(harvest_runs(harvest_root), key=lambda p: p.name):
+        xlsx = run / f"{run.name.replace('_harvest', '')}_curated_ivl_contacts.xlsx"
+        if xlsx.exists():
+            found.append(xlsx)
+    return found
+
+
+def _cell(row: Dict, col: str) -> str:
+    value = row.get(col)
+    return "" if value is None or pd.isna(value) else str(value).strip()
+
+
+def load_contacts(workbooks: Sequence[Path]) -> Dict[str, Dict[str, str]]:
+    """e-mail (lower case) → iContact contact fields.  A later workbook wins
+    over an earlier one; within a workbook the first row with the address
+    does (rows are e-mail-ready vendors first)."""
+    contacts: Dict[str, Dict[str, str]] = {}
+    for path in workbooks:
+        sheets = pd.read_excel(path, dtype=str, sheet_name=None)
+        seen = set()
+        for df in sheets.values():
+            if "Email Addresses" not in df.columns:
+                continue
+            for row in df[df["Email Addresses"].notna()].to_dict("records"):
+                phones = _cell(row, "Phone Numbers").split(";")
+                contact = {
+                    "business": _cell(row, "Legal Business Name") or _cell(row, "Vendor Name"),
+                    "phone": phones[0].strip(),
+                    **{field: _cell(row, col) for col, field in FIELDS.items()},
+                }
+                contact = {k: v for k, v in contact.items() if v}
+                for email in _cell(row, "Email Addresses").split(";"):
+                    email = email.strip().lower()
+                    if "@" not in email or email in seen:
+                        continue
+                    seen.add(email)
+                    contacts[email] = {"email": email, **contact}
+    return contacts
+
+
+def contact_hash(contact: Dict[str, str]) -> str:
+    return hashlib.sha1(json.dumps(contact, sort_keys=True).encode()).hexdigest()
+
+
+# ───────── State ─────────
+
+
+class SyncState:
+    """Per account / client folder: e-mail → {hash, contactId, lists, synced}."""
+
+    def __init__(self, path: Path, folder: str):
+        self.path = path
+        self.folders: Dict[str, Dict] = {}
+        if path.exists():
+            self.folders = json.loads(path.read_text(encoding="utf-8")).get("folders", {})
+        self.contacts: Dict[str, Dict] = self.folders.setdefault(folder, {})
+        self.lock = threading.Lock()
+
+    def save(self) -> None:
+        with self.lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            body = {
+                "updated": dt.datetime.now().isoformat(timespec="seconds"),
+                "folders": self.folders,
+            }
+            tmp.write_text(json.dumps(body, indent=2), encoding="utf-8")
+            tmp.replace(self.path)
+
+    def changed(self, contacts: Dict[str, Dict[str, str]]) -> List[Dict[str, str]]:
+        """Contacts that are new or differ from what was last sent; a known
+        contactId rides along so iContact updates instead of adding."""
+        out = []
+        for email, c in contacts.items():
+            old = self.contacts.get(email)
+            if old is None or old["hash"] != contact_hash(c):
+                known = old is not None and old.get("contactId")
+                out.append({**c, "contactId": old["contactId"]} if known else c)
+        return out
+
+    def unsubscribed(self, contacts: Iterable[str], list_id: str) -> List[Dict[str, str]]:
+        """Subscriptions still to create for contacts iContact has an id for."""
+        out = []
+        for email in contacts:
+            old = self.contacts.get(email)
+            if old and old.get("contactId") and list_id not in old.get("lists", []):
+                out.append(
+                    {"contactId": old["contactId"], "listId": list_id, "status": "normal"}
+                )
+        return out
+
+    def record_contacts(self, sent: List[Dict[str, str]], body: Dict) -> Tuple[int, int]:
+        """Store what iContact accepted; returns (accepted, rejected)."""
+        ids = {
+            (c.get("email") or "").lower(): str(c["contactId"])
+            for c in body.get("contacts", [])
+            if c.get("contactId")
+        }
+        today = dt.date.today().isoformat()
+        accepted = 0
+        with self.lock:
+            for c in sent:
+                email = c["email"]
+                contact_id = ids.get(email)
+                if contact_id is None:
+                    continue  # rejected (see the response warnings): sent again next time
+                old = self.contacts.get(email, {})
+                fields = {k: v for k, v in c.items() if k != "contactId"}
+                self.contacts[email] = {
+                    "hash": contact_hash(fields),
+                    "contactId": contact_id,
+                    "lists": old.get("lists", []) if old.get("contactId") == contact_id else [],
+                    "synced": today,
+                }
+                accepted += 1
+        return accepted, len(sent) - accepted
+
+    def record_subscriptions(self, sent: List[Dict[str, str]], body: Dict) -> int:
+        done = {
+            (str(s.get("contactId")), str(s.get("listId")))
+            for s in body.get("subscriptions", [])
+        }
+        by_id = {v["contactId"]: v for v in self.contacts.values() if v.get("contactId")}
+        n = 0
+        with self.lock:
+            for s in sent:
+                if (s["contactId"], s["listId"]) in done and s["contactId"] in by_id:
+                    by_id[s["contactId"]].setdefault("lists", []).append(s["listId"])
+                    n += 1
+        return n
+
+
+# ───────── HTTP ─────────
+
+
+class IContactClient:
+    """Pooled session with the iContact headers, a shared rate limiter and
+    retries with back-off."""
+
+    def __init__(
+        self,
+        base: str,
+        account_id: str,
+        folder_id: str,
+        headers: Dict[str, str],
+        workers: int,
+        rate: float,
+        retries: int,
+    ):
+        self.root = f"{base.rstrip('/')}/a/{account_id}/c/{folder_id}"
+        self.session = requests.Session()
+        self.session.headers.update(headers)
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=max(workers, 4))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.http = HttpStats()
+        self.retrying = Retrying(TokenBucket(rate), self.http, retries)
+
+    @property
+    def retried(self) -> int:
+        return self.retrying.retried
+
+    def post(self, endpoint: str, payload: List[Dict]) -> Dict:
+        """POST one batch; the decoded body, or SyncError once retries are spent."""
+        try:
+            resp = self.retrying.send(
+                self.session,
+                "POST",
+                f"{self.root}/{endpoint}",
+                endpoint,
+                json=payload,
+                timeout=120,
+            )
+        except requests.RequestException as exc:
+            raise SyncError(f"{endpoint}: {exc}") from exc
+        if resp.status_code in (401, 403):
+            raise InputError(
+                f"iContact refused the credentials ({resp.status_code}) — "
+                "check API_APP_ID / API_USERNAME / API_PASSWORD."
+            )
+        if not resp.ok:
+            raise SyncError(f"{endpoint}: HTTP {resp.status_code} {resp.text[:200]}")
+        return resp.json()
+
+
+def credentials() -> Tuple[str, str, Dict[str, str]]:
+    """(account id, client folder id, API headers) from the environment."""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    names = ["API_APP_ID", "API_USERNAME", "API_PASSWORD", "ACCOUNT_ID", "CLIENT_FOLDER_ID"]
+    env = {n: os.getenv(n) for n in names}
+    missing = [n for n, v in env.items() if not v]
+    if missing:
+        raise InputError("Set " + ", ".join(missing) + " (env or .env) for iContact.")
+    headers = {
+        "Accept": "application/json",
+        "Content-Type": "application/json",
+        "Api-Version": "2.2",
+        "Api-AppId": env["API_APP_ID"],
+        "Api-Username": env["API_USERNAME"],
+        "Api-Password": env["API_PASSWORD"],
+    }
+    return env["ACCOUNT_ID"], env["CLIENT_FOLDER_ID"], headers
+
+
+def run_batches(
+    client: IContactClient,
+    endpoint: str,
+    items: List[Dict],
+    batch_size: int,
+    workers: int,
+    done,
+) -> int:
+    """POST items in batches, at most `workers` in flight; done(batch, body)
+    records each success (in the calling thread).  Returns failed batches."""
+    batches = [items[i : i + batch_size] for i in range(0, len(items), batch_size)]
+    failed = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        todo = iter(batches)
+        running = {}
+        for batch in todo:
+            running[pool.submit(client.post, endpoint, batch)] = batch
+            if len(running) >= workers:
+                break
+        while running:
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                batch = running.pop(fut)
+                try:
+                    done(batch, fut.result())
+                except SyncError as exc:
+                    failed += 1
+                    print(f"  batch of {len(batch)} failed: {exc}")
+                except InputError:
+                    for other in running:
+                        other.cancel()
+                    raise
+                nxt = next(todo, None)
+                if nxt is not None:
+                    running[pool.submit(client.post, endpoint, nxt)] = nxt
+    return failed
+
+
+# ───────── Entry point ─────────
+
+
+def sync(
+    workbooks: Optional[Sequence[Path]] = None,
+    list_id: Optional[str] = None,
+    state_path: Path = ICONTACT_STATE,
+    harvest_root: Path = HARVEST_ROOT,
+    base_url: str = ICONTACT_BASE,
+    batch_size: int = ICONTACT_BATCH,
+    workers: int = ICONTACT_WORKERS,
+    rate: float = ICONTACT_RATE_PER_SEC,
+    retries: int = ICONTACT_RETRIES,
+    force: bool = False,
+    dry_run: bool = False,
+) -> Dict[str, object]:
+    """
+    Send the new or changed contacts of  workbooks  (default: the newest
+    run's curated workbook) to iContact and subscribe them to  list_id
+    (none = contacts only).  force=True ignores the stored hashes.  Returns
+    the run report, also written next to the state file as
+    icontact_sync_<YYYYMMDD_HHMMSS>.json .
+    """
+    rec = RunRecorder("icontact")
+    if workbooks:
+        books = [Path(p).expanduser().resolve() for p in workbooks]
+        for p in books:
+            if not p.is_file():
+                raise FileNotFoundError(f"Workbook not found: {p}")
+    else:
+        books = curated_workbooks(harvest_root)[-1:]
+        if not books:
+            raise FileNotFoundError(
+                "No *_curated_ivl_contacts.xlsx under data/harvests/ — run step 2 first."
+            )
+    for p in books:
+        print("Curated workbook     :", display_path(p))
+
+    with rec.stage("load") as st:
+        contacts = load_contacts(books)
+        st.rows = len(contacts)
+    print("Contacts (e-mails)   :", len(contacts))
+
+    account_id, folder_id, headers = credentials()
+    state = SyncState(state_path, f"{account_id}/{folder_id}")
+    if force:
+        for v in state.contacts.values():
+            v["hash"] = ""
+    with rec.stage("diff", rows=len(contacts)):
+        changed = state.changed(contacts)
+    new = sum(1 for c in changed if "contactId" not in c)
+    print(
+        f"To send              : {new} new, {len(changed) - new} changed, "
+        f"{len(contacts) - len(changed)} unchanged"
+    )
+
+    result: Dict[str, object] = {
+        "workbooks": [str(display_path(p)) for p in books],
+        "contacts": len(contacts),
+        "new": new,
+        "changed": len(changed) - new,
+        "unchanged": len(contacts) - len(changed),
+        "accepted": 0,
+        "rejected": 0,
+        "subscribed": 0,
+        "failed_batches": 0,
+        "dry_run": dry_run,
+    }
+    if dry_run:
+        print("Dry run — nothing sent.")
+        return result
+
+    client = IContactClient(
+        base_url, account_id, folder_id, headers, workers, rate, retries
+    )
+    totals = {"accepted": 0, "rejected": 0, "subscribed": 0}
+
+    def contacts_done(batch: List[Dict], body: Dict) -> None:
+        accepted, rejected = state.record_contacts(batch, body)
+        totals["accepted"] += accepted
+        totals["rejected"] += rejected
+        state.save()
+
+    def subs_done(batch: List[Dict], body: Dict) -> None:
+        totals["subscribed"] += state.record_subscriptions(batch, body)
+        state.save()
+
+    failed = 0
+    with rec.stage("contacts", rows=len(changed)):
+        failed += run_batches(client, "contacts", changed, batch_size, workers, contacts_done)
+    if list_id:
+        # contacts created just now have their ids only after the first pass
+        subs = state.unsubscribed(contacts, list_id)
+        with rec.stage("subscriptions", rows=len(subs)):
+            failed += run_batches(client, "subscriptions", subs, batch_size, workers, subs_done)
+    else:
+        print("No --list-id: contacts only, no list subscriptions.")
+
+    result.update(totals, failed_batches=failed, retried_calls=client.retried)
+    print(
+        f"Accepted {totals['accepted']}, rejected {totals['rejected']}, "
+        f"subscribed {totals['subscribed']}, failed batches {failed}, "
+        f"retried calls {client.retried}"
+    )
+    rec.sections.update(result, http=client.http.report())
+    stamp = dt.datetime.now().strftime("%Y%m%d_%H%M%S")
+    report_file = state_path.parent / f"icontact_sync_{stamp}.json"
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    report = rec.write(report_file)
+    print(rec.table())
+    for endpoint, h in report["http"].items():
+        lat = h["latency_ms"]
+        print(
+            f"  {endpoint:<13} {h['calls']} calls {h['by_status']}, "
+            f"p50 {lat['p50']} ms, p90 {lat['p90']} ms, max {lat['max']} ms"
+        )
+    print("✓ Saved", display_path(report_file))
+    return report
@@ -0,0 +1,226 @@
+"""
+Per-stage timing, resource and HTTP instrumentation, written as a JSON run
+report next to each step's outputs.
+
+    rec = RunRecorder("format")
+    with rec.stage("parse") as st:
+        records = list(...)
+        st.rows = len(records)
+    rec.write(folder / "format_report_20250701.json")
+
+Each stage records wall time, CPU time (this process plus any child
+processes that finished during the stage — step 0's parser pool), rows and
+rows/s, and the peak RSS of this process and of its children so far.
+HttpStats  counts the harvester's calls by endpoint and status, keeps a
+latency histogram per endpoint and counts cache hits separately.
+
+profiled(path)  is the opt-in profiler hook behind  python -m usdlf
+--profile FILE … : cProfile over the whole command, saved for  pstats /
+snakeviz, with the top functions printed at the end.
+"""
+
+from __future__ import annotations
+
+import bisect
+import cProfile
+import datetime as dt
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# upper bounds of the latency buckets, ms (the last bucket is open-ended)
+LATENCY_BUCKETS_MS = [25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+def _maxrss_mb(who: int) -> float:
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far (0 where unsupported)."""
+    return _maxrss_mb(resource.RUSAGE_SELF) if resource else 0.0
+
+
+def children_peak_rss_mb() -> float:
+    """Largest peak RSS among finished child processes (0 where unsupported)."""
+    return _maxrss_mb(resource.RUSAGE_CHILDREN) if resource else 0.0
+
+
+def _cpu_seconds() -> float:
+    """User + system CPU of this process and its waited-for children."""
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+# ───────── Stages ─────────
+
+
+class Stage:
+    def __init__(self, name: str):
+        self.name = name
+        self.rows: Optional[int] = None
+        self.extra: Dict[str, object] = {}
+        self._wall = time.perf_counter()
+        self._cpu = _cpu_seconds()
+        self.result: Dict[str, object] = {}
+
+    def finish(self) -> Dict[str, object]:
+        wall = time.perf_counter() - self._wall
+        cpu = _cpu_seconds() - self._cpu
+        self.result = {
+            "wall_s": round(wall, 3),
+            "cpu_s": round(cpu, 3),
+            "rows": self.rows,
+            "rows_per_s": round(self.rows / wall, 1) if self.rows and wall > 0 else None,
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+            "children_peak_rss_mb": round(children_peak_rss_mb(), 1),
+            **self.extra,
+        }
+        return self.result
+
+
+class RunRecorder:
+    """Ordered stage timings for one step run, plus free-form sections."""
+
+    def __init__(self, step: str):
+        self.step = step
+        self.started = dt.datetime.utcnow()
+        self._t0 = time.perf_counter()
+        self._cpu0 = _cpu_seconds()
+        self.stages: Dict[str, Dict[str, object]] = {}
+        self.sections: Dict[str, object] = {}
+
+    @contextmanager
+    def stage(self, name: str, rows: Optional[int] = None) -> Iterator[Stage]:
+        st = self.begin(name)
+        st.rows = rows
+        try:
+            yield st
+        finally:
+            self.end(st)
+
+    def begin(self, name: str) -> Stage:
+        """Start a stage that spans a loop with early exits; pair with end()."""
+        return Stage(name)
+
+    def end(self, st: Stage) -> None:
+        self.stages[st.name] = st.finish()
+
+    def report(self) -> Dict[str, object]:
+        return {
+            "step": self.step,
+            "started_utc": self.started.isoformat(timespec="seconds") + "Z",
+            "wall_s": round(time.perf_counter() - self._t0, 3),
+            "cpu_s": round(_cpu_seconds() - self._cpu0, 3),
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+            "children_peak_rss_mb": round(children_peak_rss_mb(), 1),
+            "stages": self.stages,
+            **self.sections,
+        }
+
+    def write(self, path: Path) -> Dict[str, object]:
+        rep = self.report()
+        path.write_text(json.dumps(rep, indent=2), encoding="utf-8")
+        return rep
+
+    def table(self) -> str:
+        """Human-readable stage summary for the end of a run."""
+        lines = [f"{'stage':<16}{'wall s':>9}{'cpu s':>9}{'rows':>12}{'rows/s':>12}{'RSS MB':>9}"]
+        for name, s in self.stages.items():
+            rows = f"{s['rows']:,}" if s["rows"] is not None else "–"
+            rate = f"{s['rows_per_s']:,.0f}" if s["rows_per_s"] else "–"
+            lines.append(
+                f"{name:<16}{s['wall_s']:>9.2f}{s['cpu_s']:>9.2f}{rows:>12}{rate:>12}"
+                f"{s['peak_rss_mb']:>9,.0f}"
+            )
+        return "\n".join(lines)
+
+
+# ───────── HTTP ─────────
+
+
+class HttpStats:
+    """Thread-safe call counts by (endpoint, status) and latency histograms."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls: Dict[str, Dict[str, int]] = {}
+        self.cache_hits: Dict[str, int] = {}
+        self.latencies: Dict[str, List[float]] = {}
+
+    def record(self, endpoint: str, status: object, seconds: float) -> None:
+        with self.lock:
+            by_status = self.calls.setdefault(endpoint, {})
+            by_status[str(status)] = by_status.get(str(status), 0) + 1
+            self.latencies.setdefault(endpoint, []).append(seconds * 1000)
+
+    def cache_hit(self, endpoint: str) -> None:
+        with self.lock:
+            self.cache_hits[endpoint] = self.cache_hits.get(endpoint, 0) + 1
+
+    def report(self) -> Dict[str, object]:
+        out: Dict[str, object] = {}
+        with self.lock:
+            for endpoint in sorted(set(self.calls) | set(self.cache_hits)):
+                lat = sorted(self.latencies.get(endpoint, []))
+                hist = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+                for ms in lat:
+                    hist[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+                labels = [f"<={b}" for b in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}"]
+                out[endpoint] = {
+                    "calls": sum(self.calls.get(endpoint, {}).values()),
+                    "by_status": dict(sorted(self.calls.get(endpoint, {}).items())),
+                    "cache_hits": self.cache_hits.get(endpoint, 0),
+                    "latency_ms": {
+                        "p50": _pct(lat, 0.50),
+                        "p90": _pct(lat, 0.90),
+                        "p99": _pct(lat, 0.99),
+                        "max": round(lat[-1], 1) if lat else None,
+                        "histogram": dict(zip(labels, hist)),
+                    },
+                }
+        return out
+
+
+def _pct(sorted_ms: List[float], q: float) -> Optional[float]:
+    if not sorted_ms:
+        return None
+    return round(sorted_ms[min(len(sorted_ms) - 1, int(q * len(sorted_ms)))], 1)
+
+
+# ───────── Profiling ─────────
+
+
+@contextmanager
+def profiled(path: Optional[Path], top: int = 25) -> Iterator[None]:
+    """cProfile the block and dump stats to  path  (no-op when path is None).
+    Only this process is profiled, not step 0's parser pool."""
+    if path is None:
+        yield
+        return
+    prof = cProfile.Profile()
+    prof.enable()
+    try:
+        yield
+    finally:
+        prof.disable()
+        prof.dump_stats(str(path))
+        buf = io.StringIO()
+        pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(top)
+        print(buf.getvalue())
+        print("Profile saved →", path, "(open with  python -m pstats  or snakeviz)")
@@ -0,0 +1,147 @@
+"""
+Order the IVL queue by expected yield, learned from past harvests.
+
+Every earlier  all_notices.csv  under data/harvests/ is one observation per
+fetched notice (ivl_len = roster size, 0 for empty / 403 / 404).  From those
+the planner keeps smoothed roster-size averages for a handful of features:
+
+  * notice type          (Presolicitation, Sources Sought, …)
+  * agency sub-tier      (DEPT OF THE ARMY, DEFENSE LOGISTICS AGENCY, …)
+  * age bucket           (days between posting and the fetch)
+  * title keywords       (only words seen at least MIN_KEYWORD_SEEN times)
+
+A notice's predicted yield is the mean of the feature estimates it has; if
+the notice itself was fetched before, its last roster size wins (rosters only
+grow).  Notices that came back empty SKIP_AFTER_EMPTY times are skipped.
+With no history every notice scores the same and search order is kept.
+"""
+
+from __future__ import annotations
+
+import csv
+import datetime as dt
+import re
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+PRIOR_WEIGHT = 5  # pseudo-observations pulling sparse features to the mean
+MIN_KEYWORD_SEEN = 3
+SKIP_AFTER_EMPTY = 2
+AGE_BUCKETS = (7, 30, 60)  # days; last bucket is open-ended
+
+_WORD_RE = re.compile(r"[a-z][a-z0-9]{3,}")
+_STOP_WORDS = {
+    "with", "from", "that", "this", "will", "notice", "intent", "request",
+    "sources", "sought", "presolicitation", "solicitation", "synopsis",
+}
+
+
+def age_bucket(posted: str, fetched: dt.date) -> Optional[str]:
+    try:
+        days = (fetched - dt.date.fromisoformat(posted[:10])).days
+    except (TypeError, ValueError):
+        return None
+    for limit in AGE_BUCKETS:
+        if days <= limit:
+            return f"<={limit}d"
+    return f">{AGE_BUCKETS[-1]}d"
+
+
+def title_words(title: str) -> List[str]:
+    words = set(_WORD_RE.findall((title or "").lower()))
+    return [w for w in words if w not in _STOP_WORDS]
+
+
+def notice_features(n: Dict, fetched: dt.date) -> List[str]:
+    feats = []
+    if n.get("type"):
+        feats.append("type:" + n["type"])
+    if n.get("subTier"):
+        feats.append("sub:" + n["subTier"])
+    age = age_bucket(n.get("postedDate", ""), fetched)
+    if age:
+        feats.append("age:" + age)
+    feats.extend("kw:" + w for w in title_words(n.get("title", "")))
+    return feats
+
+
+def run_date(run_dir: Path) -> Optional[dt.date]:
+    """20250801_093215_p_harvest → 2025-08-01"""
+    try:
+        return dt.datetime.strptime(run_dir.name[:8], "%Y%m%d").date()
+    except ValueError:
+        return None
+
+
+class IvlPlanner:
+    def __init__(self):
+        self.rows: Dict[str, float] = defaultdict(float)
+        self.seen: Dict[str, int] = defaultdict(int)
+        self.history: Dict[str, List[Tuple[dt.date, int]]] = defaultdict(list)
+        self.total_rows = 0
+        self.total_seen = 0
+
+    @classmethod
+    def from_harvests(
+        cls, harvest_root: Path, exclude: Optional[Path] = None
+    ) -> "IvlPlanner":
+        planner = cls()
+        for path in sorted(harvest_root.glob("*/*_harvest/all_notices.csv")):
+            fetched = run_date(path.parent)
+            if fetched is None or path.parent == exclude:
+                continue
+            with path.open(newline="", encoding="utf-8") as f:
+                planner.observe(csv.DictReader(f), fetched)
+        return planner
+
+    def observe(self, notices: Iterable[Dict], fetched: dt.date) -> None:
+        for n in notices:
+            try:
+                ivl_len = int(n["ivl_len"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            self.history[n["noticeId"]].append((fetched, ivl_len))
+            self.total_rows += ivl_len
+            self.total_seen += 1
+            for feat in notice_features(n, fetched):
+                self.rows[feat] += ivl_len
+                self.seen[feat] += 1
+
+    @property
+    def mean(self) -> float:
+        return self.total_rows / self.total_seen if self.total_seen else 0.0
+
+    def estimate(self, feat: str) -> Optional[float]:
+        seen = self.seen.get(feat, 0)
+        if not seen or (feat.startswith("kw:") and seen < MIN_KEYWORD_SEEN):
+            return None
+        return (self.rows[feat] + self.mean * PRIOR_WEIGHT) / (seen + PRIOR_WEIGHT)
+
+    def predict(self, n: Dict, today: dt.date) -> float:
+        """Expected IVL rows for one notice (= rows per API call)."""
+        past = self.history.get(n["noticeId"])
+        if past:
+            return float(max(past)[1])
+        feats = notice_features(n, today)
+        estimates = {f: self.estimate(f) for f in feats}
+        parts = [e for f, e in estimates.items() if e is not None and not f.startswith("kw:")]
+        kws = [e for f, e in estimates.items() if e is not None and f.startswith("kw:")]
+        if kws:
+            parts.append(sum(kws) / len(kws))
+        return sum(parts) / len(parts) if parts else self.mean
+
+    def reliably_empty(self, nid: str) -> bool:
+        past = self.history.get(nid, [])
+        return len(past) >= SKIP_AFTER_EMPTY and all(ivl_len == 0 for _, ivl_len in past)
+
+    def plan(
+        self, notices: List[Dict], today: dt.date
+    ) -> Tuple[List[Dict], List[Dict], Dict[str, float]]:
+        """(queue best-first, skipped, predicted rows by noticeId)."""
+        predicted = {n["noticeId"]: self.predict(n, today) for n in notices}
+        skipped = [n for n in notices if self.reliably_empty(n["noticeId"])]
+        skip_ids = {n["noticeId"] for n in skipped}
+        queue = [n for n in notices if n["noticeId"] not in skip_ids]
+        queue.sort(key=lambda n: -predicted[n["noticeId"]])  # stable: ties keep search order
+        return queue, skipped, predicted
@@ -0,0 +1,345 @@
+"""
+Cross-run IVL warehouse: every harvest folder's  all_notices.csv  and
+ivl_hits.csv  folded into one indexed SQLite file
+(data/warehouse/ivl_warehouse.sqlite).
+
+    runs     one row per ingested *_harvest folder + a size signature of its
+             CSVs, so unchanged runs are skipped and resumed runs re-ingested
+    notices  one row per noticeId (latest title/type/solicitation/NAICS/…,
+             largest ivl_len seen, first/last run that saw it)
+    ivl      one row per (noticeId, vendor) — vendor = UEI, or CAGE / name
+             when the roster had no UEI — with first/last run seen
+
+Ingest is idempotent: re-reading a run only refreshes its rows.  The rollup
+functions return DataFrames and back the  usdlf warehouse  subcommand;
+notice_metadata()  is step 2's fallback for notices its run folder lacks.
+"""
+
+from __future__ import annotations
+
+import csv
+import datetime as dt
+import sqlite3
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run          TEXT PRIMARY KEY,
+    run_date     TEXT NOT NULL,
+    signature    TEXT NOT NULL,
+    notices      INTEGER NOT NULL,
+    ivl_rows     INTEGER NOT NULL,
+    ingested_at  TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS notices (
+    noticeId     TEXT PRIMARY KEY,
+    title        TEXT,
+    postedDate   TEXT,
+    ptype        TEXT,
+    type         TEXT,
+    subTier      TEXT,
+    org_code     TEXT,
+    solicitationNumber        TEXT,
+    responseDeadLine          TEXT,
+    naicsCode                 TEXT,
+    typeOfSetAside            TEXT,
+    typeOfSetAsideDescription TEXT,
+    ivl_len      INTEGER,
+    first_run    TEXT NOT NULL,
+    last_run     TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ivl (
+    noticeId     TEXT NOT NULL,
+    vendor_key   TEXT NOT NULL,
+    uei          TEXT,
+    cage         TEXT,
+    vendorName   TEXT,
+    ptype        TEXT,
+    first_run    TEXT NOT NULL,
+    last_run     TEXT NOT NULL,
+    PRIMARY KEY (noticeId, vendor_key)
+);
+CREATE INDEX IF NOT EXISTS idx_ivl_uei ON ivl(uei);
+CREATE INDEX IF NOT EXISTS idx_ivl_cage ON ivl(cage);
+CREATE INDEX IF NOT EXISTS idx_notices_posted ON notices(postedDate);
+CREATE INDEX IF NOT EXISTS idx_notices_ptype ON notices(ptype);
+"""
+
+NOTICE_COLUMNS = [
+    "title",
+    "postedDate",
+    "ptype",
+    "type",
+    "subTier",
+    "org_code",
+    "solicitationNumber",
+    "responseDeadLine",
+    "naicsCode",
+    "typeOfSetAside",
+    "typeOfSetAsideDescription",
+]
+
+UPSERT_NOTICE = f"""
+INSERT INTO notices (noticeId, {", ".join(NOTICE_COLUMNS)}, ivl_len, first_run, last_run)
+VALUES (?, {", ".join("?" * len(NOTICE_COLUMNS))}, ?, ?, ?)
+ON CONFLICT(noticeId) DO UPDATE SET
+    {", ".join(f"{c} = COALESCE(excluded.{c}, {c})" for c in NOTICE_COLUMNS)},
+    ivl_len   = MAX(COALESCE(ivl_len, 0), COALESCE(excluded.ivl_len, 0)),
+    first_run = MIN(first_run, excluded.first_run),
+    last_run  = MAX(last_run, excluded.last_run)
+"""
+
+UPSERT_IVL = """
+INSERT INTO ivl (noticeId, vendor_key, uei, cage, vendorName, ptype, first_run, last_run)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(noticeId, vendor_key) DO UPDATE SET
+    uei        = COALESCE(excluded.uei, uei),
+    cage       = COALESCE(excluded.cage, cage),
+    vendorName = COALESCE(excluded.vendorName, vendorName),
+    ptype      = COALESCE(excluded.ptype, ptype),
+    first_run  = MIN(first_run, excluded.first_run),
+    last_run   = MAX(last_run, excluded.last_run)
+"""
+
+BATCH_ROWS = 10_000
+
+
+def connect(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    con = sqlite3.connect(str(path), uri=True)  # uri: ATTACH …?mode=ro
+    con.execute("PRAGMA journal_mode=WAL")
+    con.executescript(SCHEMA)
+    # warehouses created before a notice column existed get it added (NULL)
+    have = {r[1] for r in con.execute("PRAGMA table_info(notices)")}
+    for col in NOTICE_COLUMNS:
+        if col not in have:
+            con.execute(f"ALTER TABLE notices ADD COLUMN {col} TEXT")
+    return con
+
+
+# ───────── Ingest ─────────
+
+
+def run_signature(run_dir: Path) -> str:
+    """Sizes of the two CSVs — they only ever grow (resume appends)."""
+    parts = []
+    for name in ("all_notices.csv", "ivl_hits.csv"):
+        f = run_dir / name
+        parts.append(f"{name}:{f.stat().st_size if f.exists() else 0}")
+    return ";".join(parts)
+
+
+def find_runs(harvest_root: Path) -> List[Path]:
+    return sorted(
+        p for p in harvest_root.glob("*/*_harvest") if (p / "ivl_hits.csv").exists()
+    )
+
+
+def _clean(value: Optional[str]) -> Optional[str]:
+    value = (value or "").strip()
+    return value or None
+
+
+def _rows(path: Path) -> Iterator[dict]:
+    if not path.exists():
+        return
+    with path.open(newline="", encoding="utf-8") as f:
+        yield from csv.DictReader(f)
+
+
+def _batches(rows: Iterator[tuple]) -> Iterator[List[tuple]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_ROWS:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def vendor_key(uei: Optional[str], cage: Optional[str], name: Optional[str]) -> str:
+    if uei:
+        return uei
+    if cage:
+        return "CAGE:" + cage
+    return "NAME:" + (name or "").upper()
+
+
+def ingest_run(con: sqlite3.Connection, run_dir: Path, run: str) -> Tuple[int, int]:
+    """Upsert one harvest folder; returns (notice rows, IVL rows) read."""
+    run_date = dt.datetime.strptime(run_dir.name[:8], "%Y%m%d").date().isoformat()
+    n_notices = n_ivl = 0
+
+    def notice_rows():
+        nonlocal n_notices
+        for r in _rows(run_dir / "all_notices.csv"):
+            n_notices += 1
+            ivl_len = _clean(r.get("ivl_len"))
+            yield (
+                r["noticeId"],
+                *(_clean(r.get(c)) for c in NOTICE_COLUMNS),
+                int(ivl_len) if ivl_len is not None else None,
+                run,
+                run,
+            )
+
+    def ivl_rows():
+        nonlocal n_ivl
+        for r in _rows(run_dir / "ivl_hits.csv"):
+            n_ivl += 1
+            uei = _clean(r.get("ueiSAM"))
+            cage = _clean(r.get("cage"))
+            cage = cage.upper() if cage else None
+            name = _clean(r.get("vendorName"))
+            yield (
+                r["noticeId"],
+                vendor_key(uei, cage, name),
+                uei,
+                cage,
+                name,
+                _clean(r.get("ptype")),
+                run,
+                run,
+            )
+
+    with con:  # one transaction per run
+        for batch in _batches(notice_rows()):
+            con.executemany(UPSERT_NOTICE, batch)
+        for batch in _batches(ivl_rows()):
+            con.executemany(UPSERT_IVL, batch)
+        con.execute(
+            "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                run,
+                run_date,
+                run_signature(run_dir),
+                n_notices,
+                n_ivl,
+                dt.datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            ),
+        )
+    return n_notices, n_ivl
+
+
+def ingest_all(
+    con: sqlite3.Connection, harvest_root: Path, force: bool = False
+) -> List[Tuple[str, int, int]]:
+    """Ingest every new or grown run under harvest_root."""
+    known = dict(con.execute("SELECT run, signature FROM runs"))
+    done = []
+    for run_dir in find_runs(harvest_root):
+        run = run_dir.relative_to(harvest_root).as_posix()
+        if not force and known.get(run) == run_signature(run_dir):
+            continue
+        done.append((run, *ingest_run(con, run_dir, run)))
+    return done
+
+
+# ───────── Lookups ─────────
+
+
+def notice_metadata(con: sqlite3.Connection, notice_ids: Iterable[str]) -> pd.DataFrame:
+    """noticeId + the NOTICE_COLUMNS this warehouse has, for the given notices
+    (batched to stay under the SQLite parameter limit)."""
+    have = {r[1] for r in con.execute("PRAGMA table_info(notices)")}
+    cols = ", ".join(["noticeId", *(c for c in NOTICE_COLUMNS if c in have)])
+    ids = sorted({n for n in notice_ids if isinstance(n, str) and n})
+    frames = []
+    for i in range(0, len(ids), 500):
+        batch = ids[i : i + 500]
+        marks = ", ".join("?" * len(batch))
+        sql = f"SELECT {cols} FROM notices WHERE noticeId IN ({marks})"
+        frames.append(pd.read_sql_query(sql, con, params=batch, dtype=str))
+    if not frames:
+        return pd.read_sql_query(f"SELECT {cols} FROM notices LIMIT 0", con, dtype=str)
+    return pd.concat(frames, ignore_index=True)
+
+
+# ───────── Rollups ─────────
+
+
+def _since_clause(since: Optional[str], column: str) -> Tuple[str, list]:
+    return (f"AND {column} >= ?", [since]) if since else ("", [])
+
+
+def vendor_rollup(
+    con: sqlite3.Connection, since: Optional[str] = None, limit: int = 50
+) -> pd.DataFrame:
+    """Vendors by number of IVLs joined (notices posted on/after `since`)."""
+    where, params = _since_clause(since, "n.postedDate")
+    sql = f"""
+        SELECT i.vendor_key               AS vendor,
+               MAX(i.vendorName)          AS vendorName,
+               MAX(i.cage)                AS cage,
+               COUNT(*)                   AS ivls_joined,
+               COUNT(DISTINCT n.subTier)  AS sub_tiers,
+               MIN(n.postedDate)          AS first_notice,
+               MAX(n.postedDate)          AS last_notice
+        FROM ivl i LEFT JOIN notices n USING (noticeId)
+        WHERE 1 = 1 {where}
+        GROUP BY i.vendor_key
+        ORDER BY ivls_joined DESC, vendor
+        LIMIT ?
+    """
+    return pd.read_sql_query(sql, con, params=params + [limit])
+
+
+def notice_rollup(
+    con: sqlite3.Connection, since: Optional[str] = None, limit: int = 50
+) -> pd.DataFrame:
+    """Notices by roster size, with how many runs saw them."""
+    where, params = _since_clause(since, "n.postedDate")
+    sql = f"""
+        SELECT n.noticeId, n.title, n.postedDate, n.ptype, n.type, n.subTier,
+               COUNT(i.vendor_key) AS vendors,
+               n.first_run, n.last_run
+        FROM notices n LEFT JOIN ivl i USING (noticeId)
+        WHERE 1 = 1 {where}
+        GROUP BY n.noticeId
+        ORDER BY vendors DESC, n.postedDate DESC
+        LIMIT ?
+    """
+    return pd.read_sql_query(sql, con, params=params + [limit])
+
+
+def naics_rollup(
+    con: sqlite3.Connection,
+    entity_index: Path,
+    since: Optional[str] = None,
+    limit: int = 50,
+) -> pd.DataFrame:
+    """
+    IVL participation by the vendors' primary NAICS, via step 0's .sqlite
+    index.  A UEI can repeat in the extract; like step 2, its first entity
+    row decides the NAICS, so each IVL row is counted once.
+    """
+    con.execute("ATTACH DATABASE ? AS ent", (f"file:{entity_index}?mode=ro",))
+    try:
+        where, params = _since_clause(since, "n.postedDate")
+        sql = f"""
+            SELECT e.PRIMARY_NAICS              AS naics,
+                   COUNT(*)                     AS ivl_rows,
+                   COUNT(DISTINCT i.vendor_key) AS vendors,
+                   COUNT(DISTINCT i.noticeId)   AS notices
+            FROM ivl i
+            LEFT JOIN notices n USING (noticeId)
+            JOIN (
+                SELECT UEI, PRIMARY_NAICS FROM ent.entities
+                WHERE rowid IN (
+                    SELECT MIN(rowid) FROM ent.entities
+                    WHERE UEI IN (SELECT uei FROM ivl)
+                    GROUP BY UEI
+                )
+            ) e ON e.UEI = i.uei
+            WHERE 1 = 1 {where}
+            GROUP BY naics
+            ORDER BY ivl_rows DESC
+            LIMIT ?
+        """
+        return pd.read_sql_query(sql, con, params=params + [limit])
+    finally:
+        con.execute("DETACH DATABASE ent")
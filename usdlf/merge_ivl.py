@@ -0,0 +1,367 @@
+"""
+Step 2 — merge an IVL harvest run with the formatted SAM entity store.
+
+merge() takes the newest IVL harvest run under  data/harvests/*/*_harvest/
+(or a given one) and the newest formatted store under
+data/entity/*/formatted_entities_*  (or a given one) and writes a curated
+contact workbook into the run folder.  The UEI/CAGE-indexed  .sqlite  store
+is preferred (only the harvested vendors are fetched), then  .parquet , then
+the legacy  .xlsx  export.
+
+ivl_hits.csv only names the notice, so each row's title, solicitation
+number, dates, NAICS and set-aside are joined in from the run's own
+all_notices.csv ; notices it lacks (or older runs without those columns)
+come from the cross-run warehouse's notices table when there is one.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+
+from .entity_match import key_positions, match_entities
+from .instrument import RunRecorder
+from .paths import (
+    ENTITY_ROOT,
+    ENTITY_STORE_RE,
+    HARVEST_ROOT,
+    WAREHOUSE,
+    InputError,
+    display_path,
+    newest_entity_store,
+    newest_harvest,
+)
+from .xlsx_export import describe, write_workbook
+
+# ───────── Curated columns ─────────
+colmap = {
+    "noticeId": "Notice ID",
+    "title": "Notice Title",
+    "solicitationNumber": "Solicitation #",
+    "postedDate": "Notice Posted",
+    "responseDeadLine": "Response Deadline",
+    "naicsCode": "Notice NAICS",
+    "typeOfSetAsideDescription": "Set-Aside",
+    "vendorName": "Vendor Name",
+    "ueiSAM": "UEI",
+    "cage": "CAGE",
+    "Match Key": "Match Key",
+    "Business Name": "Legal Business Name",
+    "Status": "Entity Status",
+    "Has Email": "Has Email",
+    "Email Addresses": "Email Addresses",
+    "Has Phone": "Has Phone",
+    "Phone Numbers": "Phone Numbers",
+    "Government POC Name": "Gov POC Name",
+    "Alternate POC Name": "Alt POC Name",
+    "STREET_ADDRESS": "Street",
+    "CITY": "City",
+    "STATE": "State",
+    "ZIP": "ZIP",
+    "PRIMARY_NAICS": "Primary NAICS",
+    "BUSINESS_TYPE_CODES": "Business Type Codes",
+    "ENTITY_STRUCTURE": "Entity Structure",
+}
+
+WANTED = ["UEI", "CAGE"] + [c for c in colmap if c not in ("UEI", "CAGE")]
+# joined onto the IVL rows from all_notices.csv / the warehouse
+NOTICE_FIELDS = [
+    "title",
+    "solicitationNumber",
+    "postedDate",
+    "responseDeadLine",
+    "naicsCode",
+    "typeOfSetAsideDescription",
+]
+
+
+# ───────── Load IVL ─────────
+
+
+def load_ivl(path: Path) -> pd.DataFrame:
+    """ivl_hits.csv with normalised UEI / CAGE columns."""
+    ivl = pd.read_csv(path, dtype=str)
+
+    # normalise headers
+    if "ueiSAM" not in ivl.columns and "uei" in ivl.columns:
+        ivl.rename(columns={"uei": "ueiSAM"}, inplace=True)
+    if "cage" not in ivl.columns and "cageNumber" in ivl.columns:
+        ivl.rename(columns={"cageNumber": "cage"}, inplace=True)
+
+    required_cols = {"ueiSAM", "cage"}
+    if not required_cols.issubset(ivl.columns):
+        raise InputError("IVL file missing UEI/CAGE columns after normalisation.")
+    ivl["ueiSAM"] = ivl["ueiSAM"].str.strip()
+    ivl["cage"] = ivl["cage"].str.upper().str.strip()
+    return ivl
+
+
+# ───────── Notice metadata ─────────
+
+
+def _blank(col: pd.Series) -> pd.Series:
+    return col.fillna("").astype(str).str.strip() == ""
+
+
+def load_notices(
+    run_dir: Path, notice_ids: Iterable[str], warehouse: Optional[Path]
+) -> Tuple[pd.DataFrame, Dict[str, int]]:
+    """
+    One row per noticeId with NOTICE_FIELDS: the run's  all_notices.csv
+    first (last row wins — a resumed run may repeat a notice), then the
+    warehouse for notices — or fields — the run does not have.  Returns
+    (notices, {"run": n, "warehouse": n}).
+    """
+    ids = pd.Series(pd.unique(pd.Series(list(notice_ids), dtype=object).dropna()))
+    wanted = ["noticeId", *NOTICE_FIELDS]
+    fn = run_dir / "all_notices.csv"
+    if fn.exists():
+        run = pd.read_csv(fn, dtype=str, usecols=lambda c: c in wanted)
+        run = run.drop_duplicates("noticeId", keep="last")
+    else:
+        run = pd.DataFrame(columns=["noticeId"], dtype=object)
+    notices = pd.DataFrame({"noticeId": ids}).merge(run, on="noticeId", how="left")
+    notices = notices.reindex(columns=wanted)
+    sources = {"run": int(ids.isin(run["noticeId"]).sum()), "warehouse": 0}
+
+    gaps = notices[NOTICE_FIELDS].apply(_blank).any(axis=1)
+    if gaps.any() and warehouse is not None and warehouse.exists():
+        from .ivl_warehouse import notice_metadata
+
+        con = sqlite3.connect(f"file:{warehouse}?mode=ro", uri=True)
+        try:
+            stored = notice_metadata(con, notices.loc[gaps, "noticeId"])
+        finally:
+            con.close()
+        pos = key_positions(stored["noticeId"], notices["noticeId"])
+        found = stored.reindex(pos).reset_index(drop=True)
+        for col in NOTICE_FIELDS:
+            if col in found.columns:
+                notices[col] = notices[col].where(~_blank(notices[col]), found[col])
+        sources["warehouse"] = int(((pos >= 0) & gaps.to_numpy()).sum())
+    return notices, sources
+
+
+def join_notices(ivl: pd.DataFrame, notices: pd.DataFrame) -> pd.DataFrame:
+    """NOTICE_FIELDS for every IVL row (hashed noticeId lookup, one pass);
+    values already in the IVL file — hand-edited rosters — are kept."""
+    pos = key_positions(notices["noticeId"], ivl["noticeId"])
+    found = notices.reindex(pos).reset_index(drop=True)
+    out = ivl.reset_index(drop=True)
+    for col in NOTICE_FIELDS:
+        if col in out.columns:
+            out[col] = out[col].where(~_blank(out[col]), found[col])
+        else:
+            out[col] = found[col]
+    return out
+
+
+# ───────── Load entities ─────────
+
+
+def lookup_entities(con: sqlite3.Connection, column: str, keys: Iterable) -> pd.DataFrame:
+    """Fetch the rows whose  column  is in keys (batched to stay under the
+    SQLite parameter limit)."""
+    available = [r[1] for r in con.execute("PRAGMA table_info(entities)")]
+    cols = ", ".join(f'"{c}"' for c in WANTED if c in available)
+    keys = sorted({k for k in keys if isinstance(k, str) and k})
+    frames = []
+    for i in range(0, len(keys), 500):
+        batch = keys[i : i + 500]
+        marks = ", ".join("?" * len(batch))
+        sql = f'SELECT rowid AS _rowid, {cols} FROM entities WHERE "{column}" IN ({marks})'
+        frames.append(pd.read_sql_query(sql, con, params=batch, dtype=str))
+    if not frames:
+        return pd.read_sql_query(
+            f"SELECT rowid AS _rowid, {cols} FROM entities LIMIT 0", con, dtype=str
+        )
+    return pd.concat(frames, ignore_index=True)
+
+
+def load_entities(store: Path, ivl: pd.DataFrame) -> pd.DataFrame:
+    """The entity columns step 2 needs — from the .sqlite index only the
+    rows the IVL's UEIs / CAGEs can match."""
+    if store.suffix == ".sqlite":
+        con = sqlite3.connect(f"file:{store}?mode=ro", uri=True)
+        try:
+            ent = pd.concat(
+                [
+                    lookup_entities(con, "UEI", ivl["ueiSAM"]),
+                    lookup_entities(con, "CAGE", ivl["cage"]),
+                ],
+                ignore_index=True,
+            )
+        finally:
+            con.close()
+        # keep store order so duplicate keys resolve exactly as a full load would
+        ent = (
+            ent.drop_duplicates("_rowid")
+            .sort_values("_rowid")
+            .drop(columns="_rowid")
+            .reset_index(drop=True)
+        )
+    elif store.suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        available = set(pq.read_schema(store).names)
+        ent = pd.read_parquet(store, columns=[c for c in WANTED if c in available])
+        # dictionary-encoded columns come back as categoricals; make them plain
+        # strings again like the xlsx path
+        for col in ent.select_dtypes("category").columns:
+            ent[col] = ent[col].astype(object)
+    else:
+        # long exports continue on "Entities (2)", … sheets
+        sheets = pd.read_excel(store, dtype=str, sheet_name=None)
+        ent = pd.concat(sheets.values(), ignore_index=True)
+    ent["UEI"] = ent["UEI"].str.strip()
+    ent["CAGE"] = ent["CAGE"].str.upper().str.strip()
+    return ent
+
+
+# ───────── Curate ─────────
+
+
+def curate(merged: pd.DataFrame) -> pd.DataFrame:
+    """Curated columns / names, e-mail-ready vendors first."""
+    final = merged[[c for c in colmap if c in merged.columns]].rename(columns=colmap)
+    if "Has Email" in final.columns:
+        final["Has Email"] = final["Has Email"].fillna("No")
+        final.sort_values(
+            ["Has Email", "Vendor Name"], ascending=[False, True], inplace=True
+        )
+    return final
+
+
+# ───────── Entry point ─────────
+
+
+def merge(
+    harvest_dir: Optional[Path] = None,
+    entities: Optional[Path] = None,
+    harvest_root: Path = HARVEST_ROOT,
+    entity_root: Path = ENTITY_ROOT,
+    warehouse: Optional[Path] = WAREHOUSE,
+) -> Dict[str, object]:
+    """
+    Merge one harvest run (default: the newest) with one entity store
+    (default: the newest), notice metadata joined from the run's
+    all_notices.csv  or  warehouse  (None = run folder only), and write  <run-tag>_curated_ivl_contacts.xlsx
+    into the run folder, and its stage timings to  <run-tag>_merge_report.json .
+    Returns {"harvest", "entities", "output", "rows", "with_email", "matched",
+    "report"}; "output" is None when the run has no IVL rows.
+    """
+    # ───────── Locate harvest run ─────────
+    if harvest_dir is not None:
+        harv_dir = Path(harvest_dir).expanduser().resolve()
+        if not (harv_dir.is_dir() and harv_dir.name.endswith("_harvest")):
+            raise InputError("Provided --harvest path is not a *_harvest directory.")
+    else:
+        harv_dir = newest_harvest(harvest_root)
+        if harv_dir is None:
+            raise FileNotFoundError("No *_harvest runs found under data/harvests/")
+
+    ivl_file = harv_dir / "ivl_hits.csv"
+    if not ivl_file.exists():
+        raise FileNotFoundError(f"ivl_hits.csv not found in {harv_dir}")
+
+    run_tag = harv_dir.name.replace("_harvest", "")  # 20250801_093215_p
+    out_xlsx = harv_dir / f"{run_tag}_curated_ivl_contacts.xlsx"
+    report_file = harv_dir / f"{run_tag}_merge_report.json"
+    rec = RunRecorder("merge")
+    result: Dict[str, object] = {
+        "harvest": harv_dir,
+        "entities": None,
+        "output": None,
+        "rows": 0,
+        "with_email": 0,
+        "matched": 0,
+        "report": None,
+    }
+
+    with rec.stage("load_ivl") as st:
+        ivl = load_ivl(ivl_file)
+        st.rows = len(ivl)
+    print("Using harvest folder :", display_path(harv_dir))
+    print("IVL rows loaded      :", len(ivl))
+    if ivl.empty:
+        print("No IVL rows, nothing to merge.")
+        return result
+
+    with rec.stage("notices") as st:
+        notices, sources = load_notices(harv_dir, ivl["noticeId"], warehouse)
+        ivl = join_notices(ivl, notices)
+        st.rows = len(notices)
+        st.extra.update(sources)
+    print(
+        "Notice metadata      :",
+        f"{sources['run']} from the run, {sources['warehouse']} from the warehouse",
+        f"/ {len(notices)} notices",
+    )
+
+    # ───────── Locate entity store ─────────
+    if entities is not None:
+        store = Path(entities).expanduser().resolve()
+        if not (store.is_file() and ENTITY_STORE_RE.search(store.name)):
+            raise InputError("Provided --entities path is not a formatted_entities_* store.")
+    else:
+        store = newest_entity_store(entity_root)
+        if store is None:
+            raise FileNotFoundError(
+                "No formatted_entities_*.sqlite/.parquet/.xlsx found under data/entity/*/"
+            )
+    result["entities"] = store
+    print("Entity extract file  :", display_path(store))
+    print("Output Excel        :", display_path(out_xlsx))
+
+    with rec.stage("load_entities") as st:
+        ent = load_entities(store, ivl)
+        st.rows = len(ent)
+        st.extra["store"] = store.suffix[1:]
+    print("Entity records loaded:", len(ent))
+
+    # ───────── Merge ─────────
+    # one row per IVL row: UEI match, else CAGE match (see entity_match.py)
+    with rec.stage("match", rows=len(ivl)):
+        merged = match_entities(ivl, ent)
+    by_key = merged["Match Key"].value_counts()
+    matched = int((merged["Match Key"] != "").sum())
+    print(
+        "Rows with entity data:",
+        matched,
+        "/",
+        len(merged),
+        f"(UEI {by_key.get('UEI', 0)}, CAGE {by_key.get('CAGE', 0)})",
+    )
+
+    # ───────── Save ─────────
+    with rec.stage("curate", rows=len(merged)):
+        final = curate(merged)
+    with rec.stage("excel", rows=len(final)):
+        stats = write_workbook(final, out_xlsx, sheet_name="Curated IVL")
+    print("Curated list saved →", display_path(out_xlsx), f"({describe(stats)})")
+    with_email = int((final["Has Email"] == "Yes").sum()) if "Has Email" in final.columns else 0
+    if "Has Email" in final.columns:
+        print("Total rows:", len(final), "| With e-mail:", with_email)
+    else:
+        print("Total rows:", len(final))
+    rec.sections.update(
+        harvest=str(display_path(harv_dir)),
+        entities=str(display_path(store)),
+        rows=len(final),
+        matched=matched,
+        with_email=with_email,
+    )
+    rec.write(report_file)
+    print(rec.table())
+    print("✓ Saved", display_path(report_file))
+    result.update(
+        output=out_xlsx,
+        rows=len(final),
+        with_email=with_email,
+        matched=matched,
+        report=report_file,
+    )
+    return result
@@ -0,0 +1,86 @@
+"""
+Repository layout and the "newest input" lookups the steps share.
+
+Only the standard library is imported here, so the CLI can resolve defaults
+without loading pandas or requests.
+"""
+
+from __future__ import annotations
+
+import re
+from pathlib import Path
+from typing import List, Optional
+
+
+class InputError(ValueError):
+    """A bad or missing input; the CLI prints the message and exits 1."""
+
+
+# ───────── Paths ─────────
+ROOT_DIR = Path(__file__).resolve().parents[1]  # …/usdlf
+DATA_DIR = ROOT_DIR / "data"
+ENTITY_ROOT = DATA_DIR / "entity"
+HARVEST_ROOT = DATA_DIR / "harvests"
+CACHE_PATH = DATA_DIR / "cache" / "sam_http.sqlite"
+WAREHOUSE = DATA_DIR / "warehouse" / "ivl_warehouse.sqlite"
+PIPELINE_STATE = DATA_DIR / "pipeline_state.json"
+ICONTACT_STATE = DATA_DIR / "icontact" / "icontact_state.json"
+EVENTBRITE_DB = DATA_DIR / "eventbrite" / "eventbrite.sqlite"
+
+EXTRACT_RE = re.compile(r"SAM_PUBLIC_UTF-8_MONTHLY_V2_(\d{8})\.(dat|zip)$")
+HARVEST_RE = re.compile(r"(\d{8}_\d{6})_[a-z]+_harvest$")
+ENTITY_STORE_RE = re.compile(r"formatted_entities_(\d{8})\.(sqlite|parquet|xlsx)$")
+# for the newest extract date prefer the SQLite index, then Parquet; the
+# .xlsx is only read when neither exists
+STORE_RANK = {"xlsx": 0, "parquet": 1, "sqlite": 2}
+
+
+def display_path(path: Path) -> Path:
+    """Repo-relative when possible (outputs may live elsewhere)."""
+    try:
+        return path.relative_to(ROOT_DIR)
+    except ValueError:
+        return path
+
+
+def newest_extract(entity_root: Path = ENTITY_ROOT) -> Optional[Path]:
+    """Newest SAM_PUBLIC_UTF-8_MONTHLY_V2_*.dat/.zip by the date in its name."""
+    found = [
+        p
+        for p in entity_root.glob("*/*SAM_PUBLIC_UTF-8_MONTHLY_V2_*.*")
+        if EXTRACT_RE.match(p.name)
+    ]
+    if not found:
+        return None
+    return max(found, key=lambda p: EXTRACT_RE.match(p.name).group(1))
+
+
+def harvest_runs(harvest_root: Path = HARVEST_ROOT) -> List[Path]:
+    return [p for p in harvest_root.glob("*/**/*_harvest") if HARVEST_RE.search(p.name)]
+
+
+def newest_harvest(harvest_root: Path = HARVEST_ROOT) -> Optional[Path]:
+    runs = harvest_runs(harvest_root)
+    if not runs:
+        return None
+    return max(runs, key=lambda p: HARVEST_RE.search(p.name).group(1))  # by timestamp
+
+
+def newest_entity_store(
+    entity_root: Path = ENTITY_ROOT, suffixes: tuple = ("sqlite", "parquet", "xlsx")
+) -> Optional[Path]:
+    """Newest formatted_entities_* store, preferring .sqlite > .parquet > .xlsx."""
+    found = [
+        p
+        for p in entity_root.glob("*/formatted_entities_*.*")
+        if (m := ENTITY_STORE_RE.search(p.name)) and m.group(2) in suffixes
+    ]
+    if not found:
+        return None
+    return max(
+        found,
+        key=lambda p: (
+            ENTITY_STORE_RE.search(p.name).group(1),
+            STORE_RANK[ENTITY_STORE_RE.search(p.name).group(2)],
+        ),
+    )
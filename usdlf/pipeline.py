@@ -0,0 +1,309 @@
+"""
+Run the workflow as one pipeline of stages with declared inputs / outputs:
+
+    format     step 0   newest SAM extract            → formatted_entities_<date>.parquet/.sqlite
+    harvest    step 1   (only with harvest=True)       → data/harvests/YYYYMM/<run>_harvest/
+    warehouse  step 3   every harvest run              → data/warehouse/ivl_warehouse.sqlite
+    merge      step 2   harvest run + entity store     → <run-tag>_curated_ivl_contacts.xlsx
+                        (+ warehouse notice metadata)
+
+Every stage's inputs are fingerprinted (size, mtime and a BLAKE2 content hash,
+plus the package modules the stage runs); a stage is skipped when the
+fingerprint matches the one recorded in  data/pipeline_state.json  and its
+recorded outputs are still on disk unchanged.  The state file doubles as
+provenance: it says which extract and which harvest run each curated
+workbook was built from.
+
+format and harvest do not depend on each other and run concurrently;
+warehouse follows harvest, and merge waits for format and warehouse (it
+reads notice metadata from the warehouse, so a changed warehouse also
+invalidates it).  Each stage runs as  python -m usdlf
+<stage>  in its own process (step 0 forks a process pool of its own) and its
+output is streamed with a [stage] prefix.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import hashlib
+import json
+import shlex
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+from .paths import (
+    ENTITY_ROOT,
+    EXTRACT_RE,
+    HARVEST_ROOT,
+    PIPELINE_STATE,
+    ROOT_DIR,
+    WAREHOUSE,
+    harvest_runs,
+    newest_extract,
+    newest_harvest,
+)
+
+PACKAGE = Path(__file__).resolve().parent
+HASH_CHUNK = 8 * 1024 * 1024
+STAGES = ("format", "harvest", "merge", "warehouse")
+STAGE_MODULES = {
+    "format": ["extract.py", "sam_contacts.py", "xlsx_export.py"],
+    "merge": ["merge_ivl.py", "entity_match.py", "ivl_warehouse.py", "xlsx_export.py"],
+    "warehouse": ["ivl_warehouse.py"],
+}
+
+print_lock = threading.Lock()
+state_lock = threading.Lock()
+
+
+# ───────── Fingerprints ─────────
+
+
+def rel(path: Path) -> str:
+    try:
+        return path.relative_to(ROOT_DIR).as_posix()
+    except ValueError:
+        return str(path)
+
+
+def file_hash(path: Path, state: Dict) -> str:
+    """BLAKE2b of the file, memoised in the state by (path, size, mtime)."""
+    st = path.stat()
+    memo_key = f"{rel(path)}|{st.st_size}|{st.st_mtime_ns}"
+    memo = state.setdefault("hashes", {})
+    with state_lock:
+        if memo_key in memo:
+            return memo[memo_key]
+    h = hashlib.blake2b(digest_size=16)
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(HASH_CHUNK), b""):
+            h.update(block)
+    with state_lock:
+        memo[memo_key] = h.hexdigest()
+    return memo[memo_key]
+
+
+def prune_hashes(state: Dict) -> None:
+    """Drop memoised hashes of files that are gone or have changed since."""
+    memo = state.get("hashes", {})
+    with state_lock:
+        for memo_key in list(memo):
+            path, size, mtime = memo_key.rsplit("|", 2)
+            try:
+                st = (ROOT_DIR / path).stat()
+            except OSError:
+                del memo[memo_key]
+                continue
+            if (str(st.st_size), str(st.st_mtime_ns)) != (size, mtime):
+                del memo[memo_key]
+
+
+def fingerprint(paths: List[Path], state: Dict) -> Dict[str, str]:
+    return {rel(p): file_hash(p, state) for p in paths if p.exists()}
+
+
+def outputs_stat(paths: List[Path]) -> Dict[str, List[int]]:
+    return {rel(p): [p.stat().st_size, p.stat().st_mtime_ns] for p in paths if p.exists()}
+
+
+# ───────── Locate inputs ─────────
+
+
+def extract_to_parse() -> Optional[Path]:
+    extract = newest_extract(ENTITY_ROOT)
+    if extract is not None and extract.suffix == ".zip" and extract.with_suffix(".dat").exists():
+        return extract.with_suffix(".dat")  # step 0 reads the .dat when it sits next to the zip
+    return extract
+
+
+def entity_outputs(extract: Path) -> List[Path]:
+    date = EXTRACT_RE.search(extract.name).group(1)
+    return [
+        extract.parent / f"formatted_entities_{date}.parquet",
+        extract.parent / f"formatted_entities_{date}.sqlite",
+    ]
+
+
+def curated_output(run_dir: Path) -> Path:
+    return run_dir / f"{run_dir.name.replace('_harvest', '')}_curated_ivl_contacts.xlsx"
+
+
+# ───────── Stage execution ─────────
+
+
+def run_step(stage: str, command: str, args: List[str]) -> None:
+    """python -m usdlf <command> <args>, output prefixed with [stage]."""
+    cmd = [sys.executable, "-u", "-m", "usdlf", command, *args]
+    with print_lock:
+        print(f"[{stage}] $ {' '.join(shlex.quote(c) for c in cmd[3:])}")
+    proc = subprocess.Popen(
+        cmd, cwd=ROOT_DIR, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+    )
+    for line in proc.stdout:
+        with print_lock:
+            print(f"[{stage}] {line.rstrip()}")
+    if proc.wait() != 0:
+        raise RuntimeError(f"{stage}: usdlf {command} exited with status {proc.returncode}")
+
+
+def modules(stage: str) -> List[Path]:
+    return [PACKAGE / name for name in STAGE_MODULES[stage]]
+
+
+class Pipeline:
+    def __init__(self, state: Dict, force: Sequence[str], state_file: Path):
+        self.state = state
+        self.force = set(STAGES) if "all" in force else set(force)
+        self.state_file = state_file
+        self.report: Dict[str, str] = {}
+
+    def save(self) -> None:
+        with state_lock:
+            tmp = self.state_file.with_name(self.state_file.name + ".tmp")
+            tmp.write_text(json.dumps(self.state, indent=2, sort_keys=True), encoding="utf-8")
+            tmp.replace(self.state_file)
+
+    def stage(
+        self,
+        name: str,
+        inputs: List[Path],
+        outputs: List[Path],
+        run: Callable[[], None],
+        extra: Optional[Dict] = None,
+    ) -> None:
+        """Run  run()  unless the inputs' fingerprint and the outputs are unchanged."""
+        fp = {"inputs": fingerprint(inputs, self.state), **(extra or {})}
+        with state_lock:
+            prev = self.state.setdefault("stages", {}).get(name)
+        current = (
+            prev is not None
+            and name.split(":")[0] not in self.force
+            and prev.get("fingerprint") == fp
+            and outputs
+            and all(p.exists() for p in outputs)
+            and prev.get("outputs") == outputs_stat(outputs)
+        )
+        if current:
+            self.report[name] = "up to date"
+            with print_lock:
+                print(f"[{name}] up to date — skipped")
+            return
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        with state_lock:
+            self.state["stages"][name] = {
+                "fingerprint": fp,
+                "outputs": outputs_stat(outputs),
+                "finished_utc": dt.datetime.utcnow().isoformat(timespec="seconds") + "Z",
+                "seconds": round(elapsed, 1),
+            }
+        self.save()
+        self.report[name] = f"ran in {elapsed:.1f} s"
+
+
+# ───────── Entry point ─────────
+
+
+def run_pipeline(
+    harvest: bool = False,
+    warehouse: bool = True,
+    force: Sequence[str] = (),
+    step0_args: str = "",
+    step1_args: str = "",
+    step2_args: str = "",
+    state_file: Path = PIPELINE_STATE,
+) -> Dict[str, str]:
+    """
+    Run every stage that is out of date; returns {stage: outcome}.
+    force  names stages (or "all") to re-run regardless; the  stepN_args
+    strings are extra command-line options for the step's subcommand.
+    """
+    state = json.loads(state_file.read_text(encoding="utf-8")) if state_file.exists() else {}
+    pipe = Pipeline(state, force, state_file)
+    start = time.perf_counter()
+
+    def do_format():
+        extract = extract_to_parse()
+        if extract is None:
+            with print_lock:
+                print("[format] no SAM extract under data/entity/*/ — skipped")
+            return
+        pipe.stage(
+            "format",
+            inputs=[extract, *modules("format")],
+            outputs=entity_outputs(extract),
+            run=lambda: run_step("format", "format", shlex.split(step0_args)),
+            extra={"args": step0_args},
+        )
+
+    def do_harvest():
+        if not harvest:
+            return
+        # a harvest always talks to SAM: never "up to date"
+        before = set(harvest_runs(HARVEST_ROOT))
+        run_step("harvest", "harvest", shlex.split(step1_args))
+        new = sorted(set(harvest_runs(HARVEST_ROOT)) - before)
+        pipe.report["harvest"] = f"new run {rel(new[-1])}" if new else "no new run"
+
+    def do_merge():
+        run_dir = newest_harvest(HARVEST_ROOT)
+        extract = extract_to_parse()
+        if run_dir is None or extract is None:
+            pipe.report["merge"] = "nothing to merge"
+            return
+        store = next((p for p in reversed(entity_outputs(extract)) if p.exists()), None)
+        if store is None:
+            pipe.report["merge"] = "no entity store"
+            return
+        inputs = [
+            run_dir / "ivl_hits.csv",
+            run_dir / "all_notices.csv",
+            store,
+            WAREHOUSE,
+            *modules("merge"),
+        ]
+        step_args = ["--harvest", str(run_dir), "--entities", str(store)]
+        pipe.stage(
+            f"merge:{run_dir.name}",
+            inputs=inputs,
+            outputs=[curated_output(run_dir)],
+            run=lambda: run_step("merge", "merge", step_args + shlex.split(step2_args)),
+            extra={"args": step2_args, "harvest": rel(run_dir), "entities": rel(store)},
+        )
+
+    def do_warehouse():
+        if not warehouse:
+            return
+        csvs = sorted(
+            p / n for p in harvest_runs(HARVEST_ROOT) for n in ("ivl_hits.csv", "all_notices.csv")
+        )
+        pipe.stage(
+            "warehouse",
+            inputs=[*csvs, *modules("warehouse")],
+            outputs=[WAREHOUSE],
+            run=lambda: run_step("warehouse", "warehouse", []),
+        )
+
+    def do_harvest_warehouse():
+        do_harvest()
+        do_warehouse()
+
+    # format ∥ (harvest → warehouse), then merge
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        for fut in [pool.submit(do_format), pool.submit(do_harvest_warehouse)]:
+            fut.result()
+    do_merge()
+
+    prune_hashes(state)
+    pipe.save()
+    print("\nPipeline summary")
+    for name, outcome in pipe.report.items():
+        print(f"  {name:<40} {outcome}")
+    print(f"Total: {time.perf_counter() - start:.1f} s  (state: {rel(state_file)})")
+    return pipe.report
@@ -0,0 +1,129 @@
+"""
+On-disk cache for SAM.gov API responses, shared by harvester runs.
+
+Responses live in a single SQLite file (default  data/cache/sam_http.sqlite)
+keyed by endpoint + query parameters (the API key is never part of the key).
+Each lookup passes its own TTL, so callers decide how long an answer stays
+good: search pages go stale within hours, the IVL of a closed notice is
+effectively final.  The file is kept under a size bound by evicting the
+least-recently-used rows.
+
+Only answers that are stable enough to reuse are stored: 200, 403 and 404.
+429s and server errors always go back to the network.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+CACHEABLE_STATUS = (200, 403, 404)
+DEFAULT_MAX_BYTES = 512 * 1024**2
+
+_AGE_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*$", re.IGNORECASE)
+_AGE_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_age(text: str) -> float:
+    """'90s', '30m', '12h', '7d' (bare numbers are seconds) → seconds."""
+    m = _AGE_RE.match(text)
+    if not m:
+        raise ValueError(f"bad age {text!r} (use e.g. 30m, 12h, 7d)")
+    return float(m.group(1)) * _AGE_UNITS[m.group(2).lower()]
+
+
+def cache_key(url: str, params: Optional[Dict] = None) -> str:
+    params = {k: v for k, v in (params or {}).items() if k != "api_key"}
+    return url + "?" + json.dumps(params, sort_keys=True, default=str)
+
+
+class ResponseCache:
+    """Thread-safe SQLite response store with per-lookup TTL and LRU eviction."""
+
+    def __init__(
+        self,
+        path: Path,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        refresh_older_than: Optional[float] = None,
+    ):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.refresh_older_than = refresh_older_than
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.con = sqlite3.connect(path, check_same_thread=False)
+        self.con.execute("PRAGMA journal_mode=WAL")
+        self.con.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                   key TEXT PRIMARY KEY,
+                   status INTEGER NOT NULL,
+                   body BLOB NOT NULL,
+                   fetched_at REAL NOT NULL,
+                   used_at REAL NOT NULL,
+                   size INTEGER NOT NULL)"""
+        )
+        self.con.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_used ON responses(used_at)"
+        )
+        self.con.commit()
+
+    def get(self, key: str, ttl: float) -> Optional[Tuple[int, bytes]]:
+        """(status, body) if a fresh entry exists, else None (counted as a miss)."""
+        now = time.time()
+        max_age = ttl
+        if self.refresh_older_than is not None:
+            max_age = min(max_age, self.refresh_older_than)
+        with self.lock:
+            row = self.con.execute(
+                "SELECT status, body, fetched_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[2] > max_age:
+                self.misses += 1
+                return None
+            self.con.execute("UPDATE responses SET used_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0], row[1]
+
+    def put(self, key: str, status: int, body: bytes) -> None:
+        if status not in CACHEABLE_STATUS:
+            return
+        now = time.time()
+        with self.lock:
+            self.con.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, status, body, now, now, len(body)),
+            )
+            self.con.commit()
+
+    def evict(self) -> int:
+        """Drop least-recently-used rows until the store fits max_bytes."""
+        with self.lock:
+            total = self.con.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()[0]
+            excess = total - self.max_bytes
+            if excess <= 0:
+                return 0
+            doomed = []
+            for key, size in self.con.execute(
+                "SELECT key, size FROM responses ORDER BY used_at"
+            ):
+                doomed.append((key,))
+                excess -= size
+                if excess <= 0:
+                    break
+            self.con.executemany("DELETE FROM responses WHERE key = ?", doomed)
+            self.con.commit()
+            return len(doomed)
+
+    def close(self) -> None:
+        with self.lock:
+            self.con.commit()
+            self.con.close()
@@ -0,0 +1,351 @@
+"""
+Contact extraction for SAM extract rows (used by step 0, extract.py).
+
+One precompiled pass per row instead of three  re.findall  loops per cell:
+
+* phones — a single alternation covering  ddd-ddd-dddd ,  dddddddddd  and
+  ddd ddd dddd , run once over the whole row; the area code is a captured
+  group checked against US_AREA_CODES with a set lookup.
+* emails — only the columns that can carry one in the V2 public layout:
+  WEBSITE_OR_EMAIL (26) and the six 11-column POC blocks (46–111: Govt,
+  Alt Govt, Past Perf, Alt Past Perf, Elec, Alt Elec).
+
+Results (values, order, de-duplication) match the previous per-cell helpers
+for every row whose e-mails sit in those columns;  bench/bench_contacts.py
+checks this on synthetic rows and reports the speedup.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import List, Sequence, Tuple
+
+US_AREA_CODES = {
+    "907",
+    "205",
+    "251",
+    "256",
+    "334",
+    "479",
+    "501",
+    "870",
+    "480",
+    "520",
+    "602",
+    "623",
+    "928",
+    "209",
+    "213",
+    "310",
+    "323",
+    "408",
+    "415",
+    "510",
+    "530",
+    "559",
+    "562",
+    "619",
+    "626",
+    "650",
+    "661",
+    "707",
+    "714",
+    "760",
+    "805",
+    "818",
+    "831",
+    "858",
+    "909",
+    "916",
+    "925",
+    "949",
+    "951",
+    "303",
+    "719",
+    "970",
+    "203",
+    "860",
+    "202",
+    "302",
+    "239",
+    "305",
+    "321",
+    "352",
+    "386",
+    "407",
+    "561",
+    "727",
+    "772",
+    "813",
+    "850",
+    "863",
+    "904",
+    "941",
+    "954",
+    "229",
+    "404",
+    "478",
+    "706",
+    "770",
+    "912",
+    "808",
+    "319",
+    "515",
+    "563",
+    "641",
+    "712",
+    "208",
+    "217",
+    "309",
+    "312",
+    "618",
+    "630",
+    "708",
+    "773",
+    "815",
+    "847",
+    "219",
+    "260",
+    "317",
+    "574",
+    "765",
+    "812",
+    "316",
+    "620",
+    "785",
+    "913",
+    "270",
+    "502",
+    "606",
+    "859",
+    "225",
+    "318",
+    "337",
+    "504",
+    "985",
+    "413",
+    "508",
+    "617",
+    "781",
+    "978",
+    "301",
+    "410",
+    "207",
+    "231",
+    "248",
+    "269",
+    "313",
+    "517",
+    "586",
+    "616",
+    "734",
+    "810",
+    "906",
+    "989",
+    "218",
+    "320",
+    "507",
+    "612",
+    "651",
+    "763",
+    "952",
+    "314",
+    "417",
+    "573",
+    "636",
+    "660",
+    "816",
+    "228",
+    "601",
+    "662",
+    "406",
+    "252",
+    "336",
+    "704",
+    "828",
+    "910",
+    "919",
+    "701",
+    "308",
+    "402",
+    "603",
+    "201",
+    "551",
+    "609",
+    "732",
+    "848",
+    "856",
+    "908",
+    "973",
+    "505",
+    "575",
+    "702",
+    "725",
+    "775",
+    "212",
+    "315",
+    "347",
+    "516",
+    "518",
+    "585",
+    "607",
+    "631",
+    "646",
+    "680",
+    "716",
+    "718",
+    "845",
+    "914",
+    "917",
+    "929",
+    "934",
+    "216",
+    "234",
+    "330",
+    "419",
+    "440",
+    "513",
+    "567",
+    "614",
+    "740",
+    "937",
+    "405",
+    "539",
+    "580",
+    "918",
+    "503",
+    "541",
+    "971",
+    "215",
+    "267",
+    "272",
+    "412",
+    "445",
+    "570",
+    "582",
+    "610",
+    "717",
+    "724",
+    "814",
+    "835",
+    "401",
+    "803",
+    "839",
+    "843",
+    "854",
+    "864",
+    "605",
+    "423",
+    "615",
+    "629",
+    "731",
+    "865",
+    "901",
+    "931",
+    "210",
+    "214",
+    "254",
+    "281",
+    "325",
+    "346",
+    "361",
+    "409",
+    "430",
+    "432",
+    "469",
+    "512",
+    "682",
+    "713",
+    "737",
+    "806",
+    "817",
+    "830",
+    "832",
+    "903",
+    "915",
+    "936",
+    "940",
+    "956",
+    "972",
+    "979",
+    "276",
+    "434",
+    "540",
+    "571",
+    "703",
+    "757",
+    "804",
+    "802",
+    "206",
+    "253",
+    "360",
+    "425",
+    "509",
+    "262",
+    "274",
+    "414",
+    "534",
+    "608",
+    "715",
+    "920",
+    "304",
+    "681",
+    "307",
+}
+
+# Column indexes (0-based) that may hold an e-mail address
+EMAIL_COLUMNS: Tuple[int, ...] = (26, *range(46, 112))
+_POC_SLICE = slice(46, 112)
+
+# Cells are joined with NUL: it is neither a word nor a space character, so
+# word boundaries and \s behave at cell edges exactly as they did on separate
+# cells.
+CELL_SEP = "\x00"
+
+# One pattern for the three old ones (ddd-ddd-dddd, dddddddddd, ddd ddd dddd).
+# It starts with a plain [0-9]{3} so the engine can skip quickly to digits —
+# an area code outside 0-9 never passed the US_AREA_CODES check anyway — and
+# the lookbehind right after it is the old leading \b.  The group that
+# matched tells which old pattern it was (1 = dashed, 2 = ten digits,
+# 3 = spaced).  Matches of different alternatives never overlap — each one is
+# a run of whole digit words joined by one kind of separator — so one scan
+# finds exactly what the three separate scans found.
+PHONE_RE = re.compile(
+    r"[0-9]{3}(?<!\w[0-9]{3})(?:(-)\d{3}-\d{4}|(\d)\d{6}|(\s)\s*\d{3}\s+\d{4})(?!\w)"
+)
+EMAIL_RE = re.compile(
+    r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b", re.IGNORECASE
+)
+INVALID_EMAIL_PARTS = ("@.", "..", "@-", "-@")
+
+
+def extract_phones(row: Sequence[str]) -> List[str]:
+    # empty cells cannot match, and dropping them keeps the cell order
+    text = CELL_SEP.join(filter(None, row))
+    matches = [m for m in PHONE_RE.finditer(text) if m.group()[:3] in US_AREA_CODES]
+    if len(matches) > 1:
+        # the old helpers walked cell by cell, and within a cell pattern by
+        # pattern — keep that order
+        matches.sort(
+            key=lambda m: (text.count(CELL_SEP, 0, m.start()), m.lastindex, m.start())
+        )
+    return list(dict.fromkeys(m.group() for m in matches))
+
+
+def extract_emails(row: Sequence[str]) -> List[str]:
+    cells = [row[26], *row[_POC_SLICE]] if len(row) > 26 else []
+    if "@" not in CELL_SEP.join(cells):
+        return []
+    emails = []
+    for cell in cells:
+        if "@" in cell:
+            for em in EMAIL_RE.findall(cell):
+                el = em.lower()
+                if not any(inv in el for inv in INVALID_EMAIL_PARTS):
+                    emails.append(el)
+    return list(dict.fromkeys(emails))
+
+
+def extract_contacts(row: Sequence[str]) -> Tuple[List[str], List[str]]:
+    """(emails, phones) for one raw extract row."""
+    return extract_emails(row), extract_phones(row)
@@ -0,0 +1,33 @@
+"""
+Harvester (step 1), iContact and Eventbrite settings.  Kept apart from the
+modules that use them so the CLI can show the defaults without importing
+requests.
+"""
+
+API_BASE = "https://api.sam.gov/opportunities/v2"
+LOOKBACK_DAYS = 90  # first run of a target, or --full-window
+SEARCH_OVERLAP_DAYS = 2  # later runs: high-water mark minus this, for late postings
+RECHECK_EVERY_DAYS = 7  # re-fetch open notices' IVLs to catch roster growth
+ORG_CODE = "097"  # DoD
+PTYPE = "p"  # "p"=Presolicitation
+PAGE_SIZE = 1_000
+RATE_PER_SEC = 5.0  # shared across workers (was a 0.2 s sleep per IVL)
+DAILY_CALL_CAP = 1_000  # SAM quota for an entity-linked key
+SEARCH_TTL = 6 * 3600  # new notices show up through the day
+IVL_TTL_OPEN = 24 * 3600  # vendors still joining the list
+IVL_TTL_CLOSED = 30 * 86400  # deadline passed / notice old: roster is final
+IVL_FINAL_AGE_DAYS = 60
+
+# ───────── iContact sync ─────────
+ICONTACT_BASE = "https://app.icontact.com/icp"  # sandbox: https://app.sandbox.icontact.com/icp
+ICONTACT_BATCH = 1_000  # contacts / subscriptions per POST
+ICONTACT_WORKERS = 2  # batches in flight at once
+ICONTACT_RATE_PER_SEC = 2.0  # shared across workers
+ICONTACT_RETRIES = 4  # per batch, on 429 / 5xx / connection errors
+
+# ───────── Eventbrite attendees ─────────
+EVENTBRITE_BASE = "https://www.eventbriteapi.com/v3"
+EVENTBRITE_WORKERS = 4  # events paged at once
+EVENTBRITE_RATE_PER_SEC = 0.5  # the API allows 2 000 calls/hour per token
+EVENTBRITE_RETRIES = 4
+EVENTBRITE_SETTLE_DAYS = 30  # past events re-synced this long after they end
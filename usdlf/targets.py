@@ -0,0 +1,69 @@
+"""
+Harvest targets — (ptype, org_code, weight) triples — and the weighted merge
+of their IVL queues.  Standard library only; the CLI parses  --target  with
+parse_target  before anything heavy is imported.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Dict, List
+
+from .settings import ORG_CODE
+
+
+def parse_target(text: str) -> Dict:
+    """'p', 'p:097' or 'r:097:2' → {"ptype", "org_code", "weight"}"""
+    parts = text.strip().split(":")
+    if not parts[0] or len(parts) > 3:
+        raise argparse.ArgumentTypeError(
+            f"bad target {text!r} (use PTYPE[:ORG[:WEIGHT]], e.g. r:097:2)"
+        )
+    try:
+        weight = float(parts[2]) if len(parts) > 2 else 1.0
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"bad weight in target {text!r}")
+    if weight <= 0:
+        raise argparse.ArgumentTypeError(f"weight must be > 0 in target {text!r}")
+    org = parts[1] if len(parts) > 1 and parts[1] else ORG_CODE
+    return {"ptype": parts[0], "org_code": org, "weight": weight}
+
+
+def load_targets(path: Path) -> List[Dict]:
+    """JSON list of "p:097" strings or {"ptype", "org_code", "weight"} objects."""
+    targets = []
+    for item in json.loads(path.read_text(encoding="utf-8")):
+        if isinstance(item, str):
+            targets.append(parse_target(item))
+        else:
+            targets.append(
+                parse_target(
+                    f"{item['ptype']}:{item.get('org_code', '')}:{item.get('weight', 1)}"
+                )
+            )
+    return targets
+
+
+def target_key(t: Dict) -> str:
+    return f"{t['ptype']}:{t['org_code']}"
+
+
+def interleave(queues: Dict[str, List[Dict]], weights: Dict[str, float]) -> List[Dict]:
+    """
+    Merge per-target queues so that any prefix of the result (= whatever the
+    budget covers) splits between targets in proportion to their weights.
+    Each queue keeps its own order; a drained target hands its share on.
+    """
+    merged: List[Dict] = []
+    served = {k: 0 for k in queues}
+    pos = {k: 0 for k in queues}
+    while True:
+        live = [k for k in queues if pos[k] < len(queues[k])]
+        if not live:
+            return merged
+        k = min(live, key=lambda k: (served[k] + 1) / weights.get(k, 1.0))
+        merged.append(queues[k][pos[k]])
+        pos[k] += 1
+        served[k] += 1